@@ -0,0 +1,69 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from typing import List, Optional
+from sqlalchemy.orm import Session, sessionmaker
+import uuid
+from app.db.session import get_db
+from app.models.purge_job import PurgeJob
+from app.services import event_bus
+from app.services.document_query import DocumentFilterBody
+from app.services.event_bus import publish_event
+from app.services.purge_service import soft_delete_documents, run_purge_job
+
+router = APIRouter(prefix="/api/v1/documents", tags=["documents"])
+
+# Above this many rows subscribers get one reset instead of an event per document
+MAX_DELETE_EVENTS = 100
+
+
+class BulkDeleteRequest(DocumentFilterBody):
+    """Explicit ids, the list filters, or both (a document must then match both)"""
+    ids: Optional[List[int]] = None
+
+
+def _job_status(job: PurgeJob) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "requested": job.requested,
+        "total": job.total,
+        "purged": job.purged,
+        "files_removed": job.files_removed,
+        "progress": round(job.purged / job.total, 4) if job.total else (1.0 if job.status == "completed" else 0.0),
+        "errors": job.errors or [],
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
+
+
+@router.post("/bulk-delete", status_code=202)
+def bulk_delete(payload: BulkDeleteRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """
+    Soft-delete the matching documents at once, then purge their files in the background.
+    Poll GET /api/v1/documents/bulk-delete/{job_id} for progress.
+    """
+    filters = payload.to_filters()
+    if payload.ids is None and not filters.active:
+        raise HTTPException(status_code=400, detail="Pass ids or at least one filter")
+
+    document_ids = soft_delete_documents(db, payload.ids, filters if filters.active else None)
+    job = PurgeJob(id=uuid.uuid4().hex, status="pending", requested=len(document_ids))
+    db.add(job)
+    db.commit()
+
+    if len(document_ids) > MAX_DELETE_EVENTS:
+        publish_event(event_bus.RESET)
+    else:
+        for document_id in document_ids:
+            publish_event(event_bus.DELETED, document_id)
+
+    # The purge outlives this request's session, so it gets its own on the same database
+    background_tasks.add_task(run_purge_job, job.id, sessionmaker(bind=db.get_bind()))
+    return {**_job_status(job), "deleted": len(document_ids), "status_url": f"/api/v1/documents/bulk-delete/{job.id}"}
+
+
+@router.get("/bulk-delete/{job_id}")
+def get_purge_job(job_id: str, db: Session = Depends(get_db)):
+    job = db.query(PurgeJob).filter(PurgeJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Purge job not found")
+    return _job_status(job)
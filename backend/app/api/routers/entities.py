@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.models.document_entity import normalize_entity
+from app.services import entity_service
+
+router = APIRouter(prefix="/api/v1/entities", tags=["entities"])
+
+
+@router.get("/documents")
+def documents_by_entity(
+    text: str = Query(..., min_length=1),
+    label: Optional[str] = None,
+    prefix: bool = False,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Documents mentioning an entity, from the entity index.
+    Matching is case-insensitive, numeric dates match in any spelling, and prefix=true
+    matches every entity starting with `text`. Pass next_cursor as cursor for the next page.
+    """
+    if not normalize_entity(text):
+        raise HTTPException(status_code=400, detail="Entity text is empty")
+    documents = entity_service.find_documents(db, text, label, prefix, limit, cursor)
+    next_cursor = documents[-1]["document_id"] if len(documents) == limit else None
+    return {"documents": documents, "next_cursor": next_cursor}
+
+
+@router.get("/top")
+def top_entities(label: Optional[str] = None, limit: int = Query(20, ge=1, le=100),
+                 db: Session = Depends(get_db)):
+    """Most widespread entities of each type (or of one `label`), by number of documents"""
+    return {"entities": entity_service.top_entities(db, label, limit)}
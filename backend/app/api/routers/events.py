@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import json
+from app.core.config import settings
+from app.services.event_bus import get_event_bus
+
+router = APIRouter(prefix="/api/v1", tags=["events"])
+
+
+def _format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+@router.get("/events")
+async def document_events(
+    request: Request,
+    document_id: Optional[int] = None,
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-Sent Events feed of document lifecycle events.
+    Browsers resume automatically via the Last-Event-ID header; other clients can pass ?last_event_id=.
+    A `reset` event means the requested history is gone and the client should refetch.
+    """
+    if last_event_id is None and last_event_id_header and last_event_id_header.isdigit():
+        last_event_id = int(last_event_id_header)
+
+    async def stream():
+        # Tell EventSource how long to wait before reconnecting
+        yield f"retry: {settings.EVENT_RETRY_MS}\n\n"
+        async for event in get_event_bus().subscribe(last_event_id, heartbeat=settings.EVENT_HEARTBEAT_SECONDS):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": keep-alive\n\n"
+            elif document_id is None or event["document_id"] in (None, document_id):
+                yield _format_sse(event)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
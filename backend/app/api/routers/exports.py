@@ -0,0 +1,110 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import FileResponse
+from typing import List, Optional
+from datetime import datetime
+from sqlalchemy.orm import Session, sessionmaker
+from pathlib import Path
+import uuid
+from app.db.session import get_db
+from app.models.export_job import ExportJob
+from app.services import export_service
+from app.services.document_query import DocumentFilterBody
+from app.services.export_job_service import (
+    EXPORT_FORMATS, filters_to_params, run_export_job, delete_export_job, purge_expired_exports
+)
+
+router = APIRouter(prefix="/api/v1/exports", tags=["exports"])
+
+
+class ExportJobCreate(DocumentFilterBody):
+    """Export options plus the same filters as GET /api/v1/documents"""
+    format: str = "csv"  # csv, xlsx, parquet, arrow
+    fields: Optional[List[str]] = None  # parquet/arrow column selection
+    include_text: bool = True  # csv/xlsx
+    updated_since: Optional[datetime] = None  # delta export: only documents changed since then
+
+
+def _job_status(job: ExportJob) -> dict:
+    return {
+        "job_id": job.id,
+        "format": job.format,
+        "status": job.status,
+        "updated_since": job.updated_since.isoformat() if job.updated_since else None,
+        "watermark": job.watermark.isoformat() if job.watermark else None,
+        "row_count": job.row_count,
+        "deleted_ids": job.deleted_ids,  # delta exports only
+        "file_size": job.file_size,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+        "download_url": f"/api/v1/exports/{job.id}/download" if job.status == "completed" else None,
+    }
+
+
+def _get_job(db: Session, job_id: str) -> ExportJob:
+    job = db.query(ExportJob).filter(ExportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+
+@router.post("", status_code=202)
+def create_export_job(payload: ExportJobCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """
+    Start a background export. Poll GET /api/v1/exports/{job_id}, then download the file.
+    For incremental syncs pass the previous job's `watermark` as `updated_since`.
+    """
+    if payload.format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format. Available: {', '.join(EXPORT_FORMATS)}")
+    if payload.fields is not None:
+        if payload.format not in ("parquet", "arrow"):
+            raise HTTPException(status_code=400, detail="fields applies to parquet and arrow exports")
+        try:
+            export_service.parse_columnar_fields(",".join(payload.fields))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    purge_expired_exports(db)
+    filters = payload.to_filters()
+    job = ExportJob(
+        id=uuid.uuid4().hex,
+        format=payload.format,
+        params={"filters": filters_to_params(filters), "fields": payload.fields, "include_text": payload.include_text},
+        updated_since=payload.updated_since,
+        status="pending"
+    )
+    db.add(job)
+    db.commit()
+    
+    # The job outlives this request's session, so it gets its own on the same database
+    background_tasks.add_task(run_export_job, job.id, sessionmaker(bind=db.get_bind()))
+    return _job_status(job)
+
+
+@router.get("")
+def list_export_jobs(limit: int = 50, db: Session = Depends(get_db)):
+    jobs = db.query(ExportJob).order_by(ExportJob.created_at.desc()).limit(limit).all()
+    return {"jobs": [_job_status(job) for job in jobs]}
+
+
+@router.get("/{job_id}")
+def get_export_job(job_id: str, db: Session = Depends(get_db)):
+    return _job_status(_get_job(db, job_id))
+
+
+@router.get("/{job_id}/download")
+def download_export(job_id: str, db: Session = Depends(get_db)):
+    job = _get_job(db, job_id)
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Export job is {job.status}")
+    if not job.file_path or not Path(job.file_path).exists():
+        raise HTTPException(status_code=410, detail="Export file has expired")
+    suffix, media_type = EXPORT_FORMATS[job.format]
+    return FileResponse(job.file_path, media_type=media_type, filename=f"documents-{job.id}{suffix}")
+
+
+@router.delete("/{job_id}")
+def delete_export(job_id: str, db: Session = Depends(get_db)):
+    delete_export_job(db, _get_job(db, job_id))
+    db.commit()
+    return {"message": "Export deleted", "job_id": job_id}
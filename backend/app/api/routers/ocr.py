@@ -7,6 +7,7 @@ import logging
 import PyPDF2
 import json
 from datetime import datetime
+from app.core.text_codec import get_text_codec, find_text_file, read_text_file
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/ocr", tags=["OCR"])
@@ -65,10 +66,7 @@ async def process_document(file: UploadFile = File(...)):
         extracted_text, word_count = extract_text_from_pdf(pdf_path)
         
         # Save extracted text
-        txt_filename = f"{file_id}.txt"
-        txt_path = PROCESSED_DIR / txt_filename
-        with open(txt_path, 'w', encoding='utf-8') as f:
-            f.write(extracted_text)
+        txt_path = get_text_codec().write_text_file(PROCESSED_DIR / f"{file_id}.txt", extracted_text)
             
         logger.info(f"Saved text to: {txt_path}, {word_count} words")
         
@@ -112,13 +110,13 @@ async def health_check():
 async def get_document_text(document_id: str):
     """Get extracted text for a document."""
     
-    txt_path = PROCESSED_DIR / f"{document_id}.txt"
+    # Sidecars may be plain or compressed
+    txt_path = find_text_file(PROCESSED_DIR / f"{document_id}.txt")
     
-    if not txt_path.exists():
+    if txt_path is None:
         raise HTTPException(status_code=404, detail="Text file not found")
     
-    with open(txt_path, 'r', encoding='utf-8') as f:
-        text = f.read()
+    text = read_text_file(txt_path)
     
     return {
         "text": text,
@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from sqlalchemy.orm import Session
+import json
+from app.db.session import get_db
+from app.models.document import Document
+from app.core.conditional import make_etag, etag_matches, set_etag, not_modified
+from app.services.page_service import (
+    iter_pages, serialize_page, count_pages, get_char_range, total_chars
+)
+
+router = APIRouter(prefix="/api/v1/documents", tags=["pages"])
+
+MAX_PAGES_PER_REQUEST = 100
+MAX_CHARS_PER_REQUEST = 1_000_000
+
+
+def _get_document(db: Session, document_id: int) -> Document:
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document
+
+
+def _check_etag(request: Request, response: Response, document: Document, kind: str):
+    etag = make_etag(kind, document.id, document.revision, document.updated_at, request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return None
+
+
+@router.get("/{document_id}/pages")
+def get_pages(document_id: int, request: Request, response: Response,
+              start: int = Query(1, ge=1), end: Optional[int] = Query(None, ge=1),
+              db: Session = Depends(get_db)):
+    """Pages start..end (inclusive, 1-based). At most 100 pages per request."""
+    document = _get_document(db, document_id)
+    if end is None:
+        end = start + MAX_PAGES_PER_REQUEST - 1
+    if end < start or end - start + 1 > MAX_PAGES_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"Page range must cover 1-{MAX_PAGES_PER_REQUEST} pages")
+    cached = _check_etag(request, response, document, "pages")
+    if cached:
+        return cached
+    
+    return {
+        "document_id": document_id,
+        "page_count": count_pages(db, document),
+        "start": start,
+        "end": end,
+        "pages": [serialize_page(page) for page in iter_pages(db, document, start, end)],
+    }
+
+
+@router.get("/{document_id}/pages/stream")
+def stream_pages(document_id: int, start: int = Query(1, ge=1), end: Optional[int] = Query(None, ge=1),
+                 db: Session = Depends(get_db)):
+    """Pages as NDJSON, one object per line, fetched from the database in batches"""
+    document = _get_document(db, document_id)
+    
+    def generate():
+        for page in iter_pages(db, document, start, end):
+            yield json.dumps(serialize_page(page)) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.get("/{document_id}/text")
+def get_text_range(document_id: int, request: Request, response: Response,
+                   start: int = Query(0, ge=0), end: Optional[int] = Query(None, ge=0),
+                   db: Session = Depends(get_db)):
+    """Characters [start, end) of the extracted text. At most 1,000,000 characters per request."""
+    document = _get_document(db, document_id)
+    if end is None:
+        end = start + MAX_CHARS_PER_REQUEST
+    if end < start or end - start > MAX_CHARS_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"Character range must cover 0-{MAX_CHARS_PER_REQUEST} characters")
+    cached = _check_etag(request, response, document, "text")
+    if cached:
+        return cached
+    
+    total = total_chars(db, document)
+    text = get_char_range(db, document, start, end)
+    return {
+        "document_id": document_id,
+        "start": start,
+        "end": start + len(text),
+        "total_chars": total,
+        "text": text,
+    }
@@ -4,64 +4,126 @@ from pathlib import Path
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.document import Document
-from app.services.tesseract_ocr_service import get_tesseract_service
+from app.services.extraction_service import extract_document
+from app.services.triage_service import triage_file, apply_triage
 from app.services.document_classifier import get_classifier
 from app.services.ner_service import get_ner_service
+from app.services.entity_service import store_entities
+from app.services.dedup_service import reuse_processed_results
+from app.services.page_service import store_pages
+from app.core.text_codec import get_text_codec
+from app.services import event_bus
+from app.services.event_bus import publish_event
 import json
-from datetime import datetime
+import time
+from contextlib import contextmanager
 
 router = APIRouter(prefix="/api/v1", tags=["process"])
 PROCESSED_DIR = Path("/Users/olawalebadekale/ai-document-platform/data/processed")
 
+@contextmanager
+def timed_stage(durations: dict, stage: str):
+    """Record the wall time of one pipeline stage, in seconds"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        durations[stage] = round(time.perf_counter() - started, 3)
+
+
 @router.post("/process/{document_id}")
-async def process_document(document_id: int, db: Session = Depends(get_db)):
+def process_document(document_id: int, db: Session = Depends(get_db)):
+    # Sync so the OCR work runs in the threadpool instead of blocking the event loop (and the event feed)
     try:
         document = db.query(Document).filter(Document.id == document_id).first()
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
         if document.status == "completed":
             return JSONResponse({"status": "success", "message": "Already processed", "document_id": document_id})
-        document.status = "processing"
-        db.commit()
         if not document.original_path or not Path(document.original_path).exists():
             document.status = "failed"
             db.commit()
+            publish_event(event_bus.FAILED, document_id, reason="file_not_found")
             raise HTTPException(status_code=404, detail="File not found")
         
+        # Documents uploaded before triage existed get triaged now
+        if document.triage_status is None:
+            apply_triage(document, triage_file(document.original_path))
+        if document.triage_status != "ok":
+            document.status = "failed"
+            db.commit()
+            publish_event(event_bus.FAILED, document_id, reason=document.triage_status)
+            raise HTTPException(status_code=422, detail=f"Document cannot be processed: {document.triage_status}")
+        
+        document.status = "processing"
+        db.commit()
+        publish_event(event_bus.PROCESSING, document_id)
+        
+        # Identical content already processed - reuse its results
+        if reuse_processed_results(db, document):
+            db.commit()
+            publish_event(event_bus.COMPLETED, document_id, document_type=document.document_type,
+                          method="deduplicated")
+            return JSONResponse({
+                "status": "success",
+                "document_id": document_id,
+                "confidence": document.confidence_score,
+                "document_type": document.document_type,
+                "duplicate_of": document.duplicate_of,
+                "method": "deduplicated"
+            })
+        
         pdf_path = Path(document.original_path)
+        durations = {}
+        pipeline_started = time.perf_counter()
         
-        # OCR Processing
-        ocr_service = get_tesseract_service()
-        result = ocr_service.process_document(pdf_path)
+        # Text extraction - text layer, OCR, or both, depending on triage
+        publish_event(event_bus.PROGRESS, document_id, stage="extracting_text")
+        with timed_stage(durations, "extract"):
+            result = extract_document(pdf_path, document.mime_type)
         text = result["text"]
         page_count = result["page_count"]
         confidence = result["confidence"]
         word_count = result["word_count"]
         
         # Document Classification
-        classifier = get_classifier()
-        classification = classifier.classify(text)
+        publish_event(event_bus.PROGRESS, document_id, stage="classifying", method=result["method"])
+        with timed_stage(durations, "classify"):
+            classification = get_classifier().classify(text)
         doc_type = classification["category"]
         classification_confidence = classification["confidence"]
         
         # Named Entity Recognition
-        ner_service = get_ner_service()
-        entities = ner_service.extract_entities(text)
+        publish_event(event_bus.PROGRESS, document_id, stage="extracting_entities")
+        with timed_stage(durations, "entities"):
+            ner_service = get_ner_service()
+            entities = ner_service.extract_entities(text)
         
         # Save extracted text
-        PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
-        txt_path = PROCESSED_DIR / f"{pdf_path.stem}.txt"
-        with open(txt_path, "w", encoding="utf-8") as f:
-            f.write(text)
+        publish_event(event_bus.PROGRESS, document_id, stage="saving")
+        with timed_stage(durations, "save"):
+            PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+            txt_path = get_text_codec().write_text_file(PROCESSED_DIR / f"{pdf_path.stem}.txt", text)
         
-        # Update database
+        # Update database - pages and the document commit together
+        store_pages(db, document_id, result)
         document.extracted_text = text
         document.status = "completed"
         document.processed_path = str(txt_path)
         document.confidence_score = confidence
         document.document_type = doc_type
-        document.updated_at = datetime.now()
+        document.classification_confidence = classification_confidence
+        store_entities(document, entities, ner_service.model_version)
+        document.page_count = page_count
+        document.word_count = word_count
+        document.char_count = result["char_count"]
+        document.extraction_method = result["method"]
+        document.stage_durations = durations
+        processing_time = round(time.perf_counter() - pipeline_started, 3)
+        document.processing_time = processing_time
         db.commit()
+        publish_event(event_bus.COMPLETED, document_id, document_type=doc_type, confidence=confidence,
+                      method=result["method"], processing_time=processing_time)
         
         return JSONResponse({
             "status": "success",
@@ -71,7 +133,9 @@ async def process_document(document_id: int, db: Session = Depends(get_db)):
             "confidence": confidence,
             "document_type": doc_type,
             "classification_confidence": classification_confidence,
-            "method": "tesseract"
+            "method": result["method"],
+            "processing_time": processing_time,
+            "stage_durations": durations
         })
     except HTTPException:
         raise
@@ -83,4 +147,5 @@ async def process_document(document_id: int, db: Session = Depends(get_db)):
                 db.commit()
         except:
             pass
+        publish_event(event_bus.FAILED, document_id, reason=str(e))
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,275 @@
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from typing import BinaryIO, Callable, ContextManager, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from contextlib import nullcontext
+from functools import partial
+from pathlib import Path
+import uuid
+import zipfile
+import zlib
+from app.core.config import settings
+from app.db.session import get_db
+from app.models.upload_session import UploadSession
+from app.services.blob_store import get_blob_store
+from app.services.dedup_service import get_dedup_stats, find_completed_duplicates
+from app.services.resumable_upload_service import get_resumable_upload_service, ChunkError
+from app.services.upload_service import build_document, iter_zip_entries, UploadTooLargeError
+from app.services.triage_service import triage_file
+from app.services import event_bus
+from app.services.event_bus import publish_event
+
+router = APIRouter(prefix="/api/v1/uploads", tags=["uploads"])
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    total_size: int
+    sha256: Optional[str] = None
+
+
+def _get_open_session(db: Session, session_id: str) -> UploadSession:
+    session = db.query(UploadSession).filter(UploadSession.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    if session.status != "open":
+        raise HTTPException(status_code=409, detail=f"Upload session is {session.status}")
+    return session
+
+
+def _session_progress(session: UploadSession, ranges=None) -> dict:
+    progress = {
+        "session_id": session.id,
+        "filename": session.filename,
+        "total_size": session.total_size,
+        "received_bytes": session.received_bytes or 0,
+        "status": session.status,
+        "document_id": session.document_id,
+    }
+    if ranges is not None:
+        progress["received_ranges"] = ranges
+    return progress
+
+
+def _store_entries(entries: Iterable[Tuple[str, Callable[[], ContextManager[BinaryIO]]]]) -> List[dict]:
+    """Stream every entry into the blob store, recording a per-file outcome"""
+    blob_store = get_blob_store()
+    results = []
+    for filename, open_entry in entries:
+        try:
+            with open_entry() as stream:
+                stored, _ = blob_store.put_stream(stream, Path(filename).suffix)
+            results.append({"filename": filename, "stored": stored, "triage": triage_file(stored.path)})
+        except UploadTooLargeError:
+            results.append({"filename": filename, "status": "rejected", "error": "File too large"})
+        # Encrypted entries raise RuntimeError, unknown compression methods NotImplementedError
+        except (OSError, EOFError, zlib.error, zipfile.BadZipFile, RuntimeError, NotImplementedError) as e:
+            results.append({"filename": filename, "status": "rejected", "error": str(e)})
+    return results
+
+
+def _insert_batch(db: Session, results: List[dict]) -> dict:
+    """Create all Document rows in a single transaction"""
+    stored_results = [r for r in results if "stored" in r]
+    duplicates = find_completed_duplicates(db, (r["stored"].sha256 for r in stored_results))
+    
+    documents = []
+    for result in stored_results:
+        document, deduplicated = build_document(db, result["filename"], result["stored"], duplicates, result["triage"])
+        result["document"] = document
+        result["deduplicated"] = deduplicated
+        documents.append(document)
+    db.add_all(documents)
+    db.flush()
+    # Read ids/statuses before commit expires them, so there is no per-row refresh
+    saved = {id(document): (document.id, document.status) for document in documents}
+    db.commit()
+    for document_id, status in saved.values():
+        publish_event(event_bus.UPLOADED, document_id, status=status)
+    
+    files = []
+    for result in results:
+        stored = result.pop("stored", None)
+        triage = result.pop("triage", None)
+        document = result.pop("document", None)
+        if document is not None:
+            document_id, status = saved[id(document)]
+            result.update({
+                "status": status,
+                "document_id": document_id,
+                "size": stored.size,
+                "sha256": stored.sha256,
+                "mime_type": triage.mime_type,
+                "triage_status": triage.status,
+            })
+        files.append(result)
+    
+    uploaded = len(stored_results)
+    return {
+        "total": len(files),
+        "uploaded": uploaded,
+        "deduplicated": sum(1 for f in files if f.get("deduplicated")),
+        "rejected": len(files) - uploaded,
+        "files": files,
+    }
+
+
+@router.post("/batch")
+def upload_batch(files: List[UploadFile] = File(...), db: Session = Depends(get_db)):
+    """Upload many files in one multipart request"""
+    if len(files) > settings.MAX_BATCH_FILES:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {settings.MAX_BATCH_FILES} files")
+    results = _store_entries((f.filename, partial(nullcontext, f.file)) for f in files)
+    return _insert_batch(db, results)
+
+
+@router.post("/archive")
+def upload_archive(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Upload a ZIP archive; each entry becomes its own Document"""
+    if not zipfile.is_zipfile(file.file):
+        raise HTTPException(status_code=400, detail="Not a valid ZIP archive")
+    # The central directory gives the entry count without decompressing anything
+    with zipfile.ZipFile(file.file) as archive:
+        entry_count = sum(1 for info in archive.infolist() if not info.is_dir())
+    if entry_count > settings.MAX_BATCH_FILES:
+        raise HTTPException(status_code=413, detail=f"Archive exceeds {settings.MAX_BATCH_FILES} files")
+    file.file.seek(0)
+    results = _store_entries(iter_zip_entries(file.file))
+    return _insert_batch(db, results)
+
+
+@router.get("/dedup-stats")
+def dedup_stats(db: Session = Depends(get_db)):
+    """Deduplication hit rates across all hashed uploads"""
+    return get_dedup_stats(db)
+
+
+@router.post("/sessions", status_code=201)
+def create_upload_session(payload: UploadSessionCreate, db: Session = Depends(get_db)):
+    """Start a resumable upload"""
+    if payload.total_size <= 0:
+        raise HTTPException(status_code=400, detail="total_size must be positive")
+    if payload.total_size > settings.MAX_RESUMABLE_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
+    
+    session = UploadSession(
+        id=uuid.uuid4().hex,
+        filename=Path(payload.filename).name,
+        total_size=payload.total_size,
+        received_bytes=0,
+        expected_sha256=payload.sha256,
+        status="open"
+    )
+    get_resumable_upload_service().create(session.id)
+    db.add(session)
+    db.commit()
+    
+    result = _session_progress(session, ranges=[])
+    result["max_chunk_size"] = settings.MAX_CHUNK_SIZE
+    return result
+
+
+def _record_received(db: Session, session: UploadSession, service) -> dict:
+    ranges = service.received_ranges(session.id)
+    session.received_bytes = sum(end - start for start, end in ranges)
+    db.commit()
+    return _session_progress(session, ranges)
+
+
+@router.put("/sessions/{session_id}/chunks")
+async def upload_chunk(session_id: str, offset: int, request: Request, db: Session = Depends(get_db)):
+    """Store the raw request body as the chunk starting at `offset`. Re-sending a chunk is safe."""
+    # Database and file work runs in the threadpool; only the body streaming stays on the event loop
+    session = await run_in_threadpool(_get_open_session, db, session_id)
+    service = get_resumable_upload_service()
+    
+    try:
+        size = await service.write_chunk(session_id, offset, session.total_size, request.stream())
+    except ChunkError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    result = await run_in_threadpool(_record_received, db, session, service)
+    result["chunk"] = {"offset": offset, "size": size}
+    return result
+
+
+@router.get("/sessions/{session_id}")
+def get_upload_session(session_id: str, db: Session = Depends(get_db)):
+    """Report which byte ranges have arrived so a client knows where to resume"""
+    session = db.query(UploadSession).filter(UploadSession.id == session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    ranges = get_resumable_upload_service().received_ranges(session_id) if session.status == "open" else None
+    return _session_progress(session, ranges)
+
+
+def _claim_session(db: Session, session_id: str, status: str) -> UploadSession:
+    """
+    Move an open session to `status` with a conditional UPDATE, so of several
+    concurrent requests (in any worker) exactly one gets to finish it.
+    """
+    claimed = db.query(UploadSession).filter(
+        UploadSession.id == session_id, UploadSession.status == "open"
+    ).update({UploadSession.status: status}, synchronize_session=False)
+    db.commit()
+    if not claimed:
+        _get_open_session(db, session_id)  # 404, or 409 with the status it moved to
+        raise HTTPException(status_code=409, detail="Upload session is busy")
+    return db.query(UploadSession).filter(UploadSession.id == session_id).first()
+
+
+def _release_session(db: Session, session: UploadSession):
+    """Reopen a session whose completion failed, so missing chunks can still be sent"""
+    db.rollback()
+    session.status = "open"
+    db.commit()
+
+
+@router.post("/sessions/{session_id}/complete")
+def complete_upload_session(session_id: str, db: Session = Depends(get_db)):
+    """Assemble the chunks into a regular Document"""
+    session = _claim_session(db, session_id, "completing")
+    service = get_resumable_upload_service()
+    extension = Path(session.filename).suffix
+    
+    try:
+        stored, is_new_blob = service.assemble(session_id, session.total_size, extension, session.expected_sha256)
+        triage = triage_file(stored.path)
+        document, deduplicated = build_document(db, session.filename, stored, triage=triage)
+        db.add(document)
+        db.flush()
+        session.status = "completed"
+        session.received_bytes = session.total_size
+        session.document_id = document.id
+        db.commit()
+    except ChunkError as e:
+        _release_session(db, session)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        _release_session(db, session)
+        raise
+    service.discard(session_id)
+    publish_event(event_bus.UPLOADED, document.id, status=document.status, deduplicated=deduplicated)
+    
+    return {
+        "message": "File uploaded successfully",
+        "filename": document.filename,
+        "size": stored.size,
+        "sha256": stored.sha256,
+        "status": document.status,
+        "deduplicated": deduplicated,
+        "mime_type": triage.mime_type,
+        "page_count": triage.page_count,
+        "triage_status": triage.status,
+        "document_id": document.id,
+        "session_id": session_id
+    }
+
+
+@router.delete("/sessions/{session_id}")
+def abort_upload_session(session_id: str, db: Session = Depends(get_db)):
+    """Abandon a resumable upload and free its chunks"""
+    _claim_session(db, session_id, "aborted")
+    get_resumable_upload_service().discard(session_id)
+    return {"message": "Upload session aborted", "session_id": session_id}
@@ -3,6 +3,7 @@ Celery configuration for background task processing.
 This allows us to process documents without blocking the API.
 """
 from celery import Celery
+from celery.signals import worker_init
 from app.core.config import settings
 
 # Create Celery instance
@@ -25,5 +26,12 @@ celery_app.conf.update(
     task_reject_on_worker_lost=True,
 )
 
+
+@worker_init.connect
+def _publish_events_to_redis(**kwargs):
+    # Workers have no SSE clients; the API relays their events (EVENT_RELAY)
+    from app.services.event_bus import RedisEventPublisher, set_event_bus
+    set_event_bus(RedisEventPublisher())
+
 # This is what Celery CLI looks for
 celery = celery_app
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""
+Conditional GET helpers.
+Endpoints compute a strong ETag from a cheap version number, and answer
+a matching If-None-Match with 304 before building the body.
+"""
+
+import hashlib
+from fastapi import Request, Response
+
+# Shared caches and proxies may store responses but must revalidate each time
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Weak comparison, as RFC 9110 specifies for If-None-Match.
+    Proxies that compress responses downgrade ETags to W/"..." - those still match.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
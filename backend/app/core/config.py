@@ -6,8 +6,38 @@ class Settings(BaseSettings):
     APP_VERSION: str = "1.0.0"
     BACKEND_CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:3001", "*"]
     UPLOAD_FOLDER: str = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), "data", "uploads")
+    BLOB_FOLDER: str = ""  # defaults to UPLOAD_FOLDER/blobs
     PROCESSED_FOLDER: str = "/Users/olawalebadekale/ai-document-platform/data/processed"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB streaming copy buffer
+    MAX_BATCH_FILES: int = 1000  # per batch or ZIP upload
+    RESUMABLE_FOLDER: str = ""  # defaults to UPLOAD_FOLDER/resumable
+    MAX_RESUMABLE_UPLOAD_SIZE: int = 2 * 1024 * 1024 * 1024  # 2GB
+    MAX_CHUNK_SIZE: int = 16 * 1024 * 1024  # 16MB per resumable chunk
+    TEXT_LAYER_MIN_CHARS: int = 25  # fewer characters than this means the page needs OCR
+    TRIAGE_SAMPLE_PAGES: int = 20  # pages checked for a text layer at upload
+    EVENT_BUFFER_SIZE: int = 1000  # events kept for Last-Event-ID replay
+    EVENT_QUEUE_SIZE: int = 500  # per-subscriber backlog before it is told to refetch
+    EVENT_HEARTBEAT_SECONDS: float = 15.0
+    EVENT_RETRY_MS: int = 3000
+    EVENT_RELAY: bool = False  # relay Celery worker events from Redis to this API's SSE clients
+    REDIS_URL: str = "redis://localhost:6379/0"  # Celery broker and worker event channel
+    TEXT_COMPRESSION: str = "auto"  # zstd, zlib or none; auto picks zstd when installed
+    TEXT_COMPRESSION_LEVEL: int = 6
+    TEXT_COMPRESSION_MIN_BYTES: int = 256  # shorter texts are stored as-is
+    TEXT_DICT_FOLDER: str = ""  # defaults to UPLOAD_FOLDER/text_dicts
+    TEXT_COMPRESSION_DICT_ID: int = 0  # shared dictionary for new DB values; 0 = none
+    EXPORT_FOLDER: str = ""  # defaults to UPLOAD_FOLDER/exports
+    EXPORT_RETENTION_HOURS: int = 24  # finished export files are removed after this
+    NER_MODEL: str = "en_core_web_sm"
+    NER_BATCH_SIZE: int = 32  # texts per nlp.pipe batch
+    NER_N_PROCESS: int = 1  # worker processes for batch NER
+    NER_WINDOW_CHARS: int = 10000  # long texts are recognized in windows of at most this size
+    NER_WINDOW_OVERLAP: int = 200  # characters shared by neighbouring windows
+    CLASSIFIER_FOLDER: str = ""  # trained classifier artifacts; defaults to UPLOAD_FOLDER/classifiers
+    CLASSIFIER_ARTIFACT_KEY: str = ""  # pin an artifact; defaults to the key of the bundled training data
+    CLASSIFIER_TRAIN_IF_MISSING: bool = True  # train a missing artifact once; otherwise it is an error
+    CLASSIFIER_LOAD_AT_STARTUP: bool = True  # load before serving, not on the first request
     DATABASE_URL: str = "sqlite:///./doc_intelligence.db"
 
 settings = Settings()
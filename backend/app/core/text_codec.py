@@ -0,0 +1,186 @@
+"""
+Compressed text storage.
+Extracted text is stored compressed in the database and in `.txt` sidecars.
+Database values carry a small header naming the codec and the shared
+dictionary they were written with, so settings can change without
+rewriting old rows; values without a header are read as plain UTF-8.
+Sidecars use standard formats (.txt.zst / .txt.gz) so zstdcat/zcat work.
+"""
+
+import gzip
+import logging
+import os
+import struct
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+from app.core.config import settings
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# NUL never starts extracted text, so the header cannot collide with plain values
+MAGIC = b"\x00TZ"
+HEADER = struct.Struct(">3sBI")  # magic, codec, dictionary id
+CODECS = {"none": 0, "zlib": 1, "zstd": 2}
+CODEC_NAMES = {code: name for name, code in CODECS.items()}
+FILE_SUFFIXES = {"zstd": ".txt.zst", "zlib": ".txt.gz", "none": ".txt"}
+ZLIB_MAX_DICT = 32 * 1024
+
+
+class TextCodec:
+    def __init__(self, codec: str = None, level: int = None, dict_id: int = None, dict_folder: str = None):
+        codec = codec or settings.TEXT_COMPRESSION
+        if codec == "auto":
+            codec = "zstd" if ZSTD_AVAILABLE else "zlib"
+        if codec not in CODECS:
+            raise ValueError(f"Unknown text compression: {codec}")
+        if codec == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("zstandard is not installed; compressing text with zlib")
+            codec = "zlib"
+        self.codec = codec
+        self.level = level if level is not None else settings.TEXT_COMPRESSION_LEVEL
+        self.dict_id = dict_id if dict_id is not None else settings.TEXT_COMPRESSION_DICT_ID
+        self.min_bytes = settings.TEXT_COMPRESSION_MIN_BYTES
+        self.dict_folder = Path(dict_folder or settings.TEXT_DICT_FOLDER
+                                or os.path.join(settings.UPLOAD_FOLDER, "text_dicts"))
+        self._dictionaries: Dict[tuple, bytes] = {}
+
+    # Shared dictionaries
+
+    def _dictionary_path(self, codec: str, dict_id: int) -> Path:
+        return self.dict_folder / f"{codec}-{dict_id}.dict"
+
+    def _dictionary(self, codec: str, dict_id: int) -> Optional[bytes]:
+        if not dict_id:
+            return None
+        key = (codec, dict_id)
+        if key not in self._dictionaries:
+            path = self._dictionary_path(codec, dict_id)
+            if not path.exists():
+                raise FileNotFoundError(f"Text compression dictionary {path} is missing")
+            self._dictionaries[key] = path.read_bytes()
+        return self._dictionaries[key]
+
+    def train_dictionary(self, samples: Iterable[str], size: int = 110 * 1024) -> int:
+        """Build a shared dictionary from sample texts, save it, and return its id"""
+        samples = [s.encode("utf-8") for s in samples if s]
+        if not samples:
+            raise ValueError("No samples to train a dictionary from")
+        if self.codec == "zstd":
+            data = zstandard.train_dictionary(size, samples).as_bytes()
+            dict_id = zstandard.ZstdCompressionDict(data).dict_id()
+        else:
+            # zlib matches against the dictionary tail, so the most common lines go last
+            lines = Counter(line for sample in samples for line in set(sample.splitlines()) if len(line) > 3)
+            common, total = [], 0
+            for line, count in lines.most_common():
+                if count < 2 or total + len(line) + 1 > min(size, ZLIB_MAX_DICT):
+                    break
+                common.append(line)
+                total += len(line) + 1
+            data = b"\n".join(reversed(common))
+            dict_id = zlib.adler32(data)
+        self.dict_folder.mkdir(parents=True, exist_ok=True)
+        self._dictionary_path(self.codec, dict_id).write_bytes(data)
+        return dict_id
+
+    # Database values
+
+    def compress(self, text: str) -> bytes:
+        raw = text.encode("utf-8")
+        if self.codec == "none" or len(raw) < self.min_bytes:
+            return HEADER.pack(MAGIC, CODECS["none"], 0) + raw if raw.startswith(MAGIC) else raw
+        dictionary = self._dictionary(self.codec, self.dict_id)
+        if self.codec == "zstd":
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            payload = zstandard.ZstdCompressor(level=self.level, dict_data=dict_data).compress(raw)
+        else:
+            compressor = zlib.compressobj(self.level, zdict=dictionary) if dictionary else zlib.compressobj(self.level)
+            payload = compressor.compress(raw) + compressor.flush()
+        return HEADER.pack(MAGIC, CODECS[self.codec], self.dict_id if dictionary else 0) + payload
+
+    def decompress(self, value: Union[bytes, memoryview, str]) -> str:
+        if isinstance(value, str):
+            return value  # written before compression existed
+        value = bytes(value)
+        if not is_compressed(value):
+            return value.decode("utf-8")
+        _, code, dict_id = HEADER.unpack_from(value)
+        codec, payload = CODEC_NAMES[code], value[HEADER.size:]
+        dictionary = self._dictionary(codec, dict_id)
+        if codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstandard is required to read zstd-compressed text")
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            raw = zstandard.ZstdDecompressor(dict_data=dict_data).decompress(payload)
+        elif codec == "zlib":
+            decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+            raw = decompressor.decompress(payload) + decompressor.flush()
+        else:
+            raw = payload
+        return raw.decode("utf-8")
+
+    # Sidecar files
+
+    def write_text_file(self, txt_path: Union[str, Path], text: str) -> Path:
+        """Write a text sidecar next to `txt_path` (name.txt) in the configured format; returns the real path"""
+        txt_path = Path(txt_path)
+        path = txt_path.with_name(txt_path.stem + FILE_SUFFIXES[self.codec])
+        partial = path.with_name(path.name + ".part")
+        raw = text.encode("utf-8")
+        if self.codec == "zstd":
+            data = zstandard.ZstdCompressor(level=self.level).compress(raw)
+        elif self.codec == "zlib":
+            data = gzip.compress(raw, compresslevel=self.level)
+        else:
+            data = raw
+        partial.write_bytes(data)
+        os.replace(partial, path)
+        return path
+
+
+def is_compressed(value: bytes) -> bool:
+    return value[:len(MAGIC)] == MAGIC
+
+
+def text_file_candidates(txt_path: Union[str, Path]):
+    txt_path = Path(txt_path)
+    stem = next((txt_path.name[:-len(suffix)] for suffix in (".txt.zst", ".txt.gz", ".txt")
+                 if txt_path.name.endswith(suffix)), txt_path.stem)
+    return [txt_path.with_name(stem + suffix) for suffix in (".txt", ".txt.zst", ".txt.gz")]
+
+
+def find_text_file(txt_path: Union[str, Path]) -> Optional[Path]:
+    """The sidecar for `name.txt`, whichever format it was written in"""
+    for candidate in text_file_candidates(txt_path):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def read_text_file(path: Union[str, Path]) -> str:
+    path = Path(path)
+    data = path.read_bytes()
+    if path.name.endswith(".zst"):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is required to read .zst text files")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif path.name.endswith(".gz"):
+        data = gzip.decompress(data)
+    return data.decode("utf-8")
+
+
+_text_codec = None
+
+def get_text_codec() -> TextCodec:
+    global _text_codec
+    if _text_codec is None:
+        _text_codec = TextCodec()
+    return _text_codec
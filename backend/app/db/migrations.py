@@ -0,0 +1,58 @@
+"""
+Lightweight additive schema migrations.
+Creates missing tables, then adds any model columns and indexes that an
+existing database is missing. Safe to run on every startup.
+"""
+
+import logging
+from sqlalchemy import inspect, text, String
+from app.db.session import engine as default_engine
+from app.db.types import CompressedText
+from app.models.database import Base
+
+logger = logging.getLogger(__name__)
+
+
+def _column_ddl(column, dialect) -> str:
+    ddl = f"{column.name} {column.type.compile(dialect=dialect)}"
+    if column.server_default is not None and isinstance(column.server_default.arg, str):
+        ddl += f" DEFAULT {column.server_default.arg}"
+    return ddl
+
+
+def run_migrations(engine=None):
+    """Bring the database schema up to date with the ORM models"""
+    # Import models so they register on Base.metadata
+    import app.models.document  # noqa: F401
+    import app.models.counter  # noqa: F401
+    import app.models.document_page  # noqa: F401
+    import app.models.document_entity  # noqa: F401
+    import app.models.document_tombstone  # noqa: F401
+    import app.models.export_job  # noqa: F401
+    import app.models.purge_job  # noqa: F401
+    import app.models.upload_session  # noqa: F401
+    import app.models.user  # noqa: F401
+
+    engine = engine or default_engine
+    Base.metadata.create_all(bind=engine)
+
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing_columns = {c["name"]: c["type"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    logger.info(f"Adding column {table.name}.{column.name}")
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {_column_ddl(column, engine.dialect)}"))
+                elif (engine.dialect.name == "postgresql" and isinstance(column.type, CompressedText)
+                      and isinstance(existing_columns[column.name], String)):
+                    # Text columns that now hold compressed bytes; existing values stay readable as plain UTF-8
+                    logger.info(f"Converting {table.name}.{column.name} to bytea")
+                    conn.execute(text(f"ALTER TABLE {table.name} ALTER COLUMN {column.name} "
+                                      f"TYPE bytea USING convert_to({column.name}, 'UTF8')"))
+
+            existing_indexes = {ix["name"] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    logger.info(f"Creating index {index.name}")
+                    index.create(bind=conn)
@@ -0,0 +1,41 @@
+"""
+Custom column types.
+"""
+
+from datetime import timezone
+from sqlalchemy.types import TypeDecorator, LargeBinary, DateTime, String
+from app.core.text_codec import get_text_codec
+
+
+class CompressedText(TypeDecorator):
+    """Text stored compressed (see core/text_codec.py); reads and writes plain str"""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else get_text_codec().compress(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else get_text_codec().decompress(value)
+
+
+class TimestampBound(TypeDecorator):
+    """
+    Bind type for comparing against timestamp columns.
+    SQLite compares timestamps as strings, and CURRENT_TIMESTAMP defaults store
+    whole seconds without a fraction, so a whole-second bound is sent the same way.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(DateTime(timezone=True))
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name == "sqlite" and value is not None:
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return value.strftime("%Y-%m-%d %H:%M:%S" if not value.microsecond else "%Y-%m-%d %H:%M:%S.%f")
+        return value
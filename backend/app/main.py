@@ -1,14 +1,22 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
+from fastapi.concurrency import run_in_threadpool
 import os
 import json
 from datetime import datetime
+from typing import Optional
 from app.core.config import settings
 from sqlalchemy.orm import Session
 from fastapi import Depends
 from app.db.session import get_db
-from app.api.routers import ocr, process, auth
+from app.api.routers import ocr, process, auth, uploads, events, pages, exports, deletions, entities
+from app.api.v1 import metrics
+from app.db.migrations import run_migrations
+from app.core.conditional import make_etag, etag_matches, set_etag, not_modified
+from app.services import event_bus
+from app.services.event_bus import publish_event
+from app.services.document_query import DocumentFilters, document_filters
 
 app = FastAPI(title=settings.APP_NAME, version=settings.APP_VERSION)
 
@@ -18,11 +26,49 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 app.include_router(ocr.router)
 app.include_router(process.router)
 app.include_router(auth.router, prefix="/api/v1")
+app.include_router(uploads.router)
+app.include_router(events.router)
+app.include_router(pages.router)
+app.include_router(exports.router)
+app.include_router(deletions.router)
+app.include_router(entities.router)
+app.include_router(metrics.router, prefix="/api/v1")
+
+@app.on_event("startup")
+def apply_migrations():
+    from app.db.session import SessionLocal
+    from app.services.counter_service import ensure_aggregates
+    
+    run_migrations()
+    db = SessionLocal()
+    try:
+        ensure_aggregates(db)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def start_event_relay():
+    if settings.EVENT_RELAY:
+        app.state.event_relay = event_bus.EventRelay(event_bus.get_event_bus())
+        app.state.event_relay.start()
+
+@app.on_event("shutdown")
+def stop_event_relay():
+    if getattr(app.state, "event_relay", None) is not None:
+        app.state.event_relay.stop()
+
+@app.on_event("startup")
+def load_classifier():
+    if settings.CLASSIFIER_LOAD_AT_STARTUP:
+        from app.services.document_classifier import get_classifier
+        # Refuse to start without a classifier rather than failing every /process call
+        get_classifier()
 
 @app.get("/")
 def read_root():
@@ -34,37 +80,40 @@ def health_check():
 
 @app.post("/api/v1/upload")
 async def upload_document(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    from app.models.document import Document
+    from app.services.upload_service import UploadTooLargeError, build_document
+    from app.services.blob_store import get_blob_store
+    from app.services.triage_service import triage_file
     
-    contents = await file.read()
-    file_size = len(contents)
-    if file_size > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(status_code=413, detail="File too large")
+    extension = os.path.splitext(file.filename)[1]
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_filename = f"{timestamp}_{file.filename}"
-    file_path = os.path.join(settings.UPLOAD_FOLDER, safe_filename)
+    # Stream into the content-addressed store; size limit and hash are enforced in the same pass
+    try:
+        stored, is_new_blob = await run_in_threadpool(get_blob_store().put_stream, file.file, extension)
+    except UploadTooLargeError:
+        raise HTTPException(status_code=413, detail="File too large")
     
-    with open(file_path, "wb") as buffer:
-        buffer.write(contents)
+    # Cheap triage so corrupt files fail here instead of in a worker
+    triage = await run_in_threadpool(triage_file, stored.path)
     
     # Save to database
-    db_document = Document(
-        filename=safe_filename,
-        file_type=os.path.splitext(file.filename)[1].replace(".", ""),
-        file_size=file_size,
-        status="uploaded",
-        original_path=file_path
-    )
+    db_document, deduplicated = build_document(db, file.filename, stored, triage=triage)
     db.add(db_document)
     db.commit()
     db.refresh(db_document)
+    publish_event(event_bus.UPLOADED, db_document.id, status=db_document.status, deduplicated=deduplicated)
     
     return {
         "message": "File uploaded successfully",
-        "filename": safe_filename,
-        "size": file_size,
-        "status": "uploaded",
+        "filename": db_document.filename,
+        "size": stored.size,
+        "sha256": stored.sha256,
+        "status": db_document.status,
+        "deduplicated": deduplicated,
+        "mime_type": triage.mime_type,
+        "page_count": triage.page_count,
+        "text_layer_ratio": triage.text_layer_ratio,
+        "triage_status": triage.status,
+        "triage_error": triage.error,
         "document_id": db_document.id
     }
 
@@ -121,32 +170,52 @@ def get_document_by_id(document_id: int):
         return None
 
 @app.get("/api/v1/documents")
-def list_documents(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """List all documents from database"""
-    from app.models.document import Document
+def list_documents(request: Request, response: Response, skip: int = 0, limit: int = 100,
+                   cursor: Optional[str] = None, fields: Optional[str] = None, sort: Optional[str] = None,
+                   filters: DocumentFilters = Depends(document_filters), db: Session = Depends(get_db)):
+    """
+    List documents, newest first unless `sort` says otherwise (`confidence`, `-confidence`, `filename`, ...).
+    status, document_type and file_type take comma-separated values; created_from/created_to and
+    min_confidence/max_confidence are ranges (created_to is exclusive).
+    Pass `cursor` (the previous page's next_cursor) for keyset paging; `skip` is kept for older clients.
+    `fields` is a comma-separated sparse fieldset; only the columns it needs are selected.
+    Responds 304 to If-None-Match when nothing in the table has changed.
+    """
+    from app.services.counter_service import get_filtered_total, get_documents_version
+    from app.services.document_query import (
+        parse_fields, parse_sort, projected_query, apply_filters, apply_sort,
+        apply_keyset, serialize_row, sort_value, encode_cursor
+    )
     try:
-        # Get documents from database
-        documents = db.query(Document).order_by(Document.created_at.desc()).offset(skip).limit(limit).all()
-        total = db.query(Document).count()
+        # Version is read before the data, so a concurrent change can only make the ETag stale-safe
+        etag = make_etag("documents", get_documents_version(db), request.url.query)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        
+        try:
+            selected_fields = parse_fields(fields)
+            sort_key, descending = parse_sort(sort)
+            query = projected_query(db, selected_fields, sort_key)
+            query = apply_sort(apply_filters(query, filters), sort_key, descending)
+            query = apply_keyset(query, cursor, sort_key, descending) if cursor else query.offset(skip)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        rows = query.limit(limit).all()
+        total = get_filtered_total(db, filters)
+        
+        doc_list = [serialize_row(row, selected_fields) for row in rows]
         
-        # Convert to response format
-        doc_list = []
-        for doc in documents:
-            doc_list.append({
-                "id": doc.id,
-                "filename": doc.filename,
-                "file_type": doc.file_type,
-                "status": doc.status,
-                "document_type": doc.document_type or "Unknown",
-                "created_at": doc.created_at.isoformat() if doc.created_at else None,
-                "uploaded_at": doc.created_at.isoformat() if doc.created_at else None,
-                "confidence": doc.confidence_score
-            })
+        next_cursor = None
+        if len(rows) == limit and rows:
+            next_cursor = encode_cursor(sort_value(rows[-1], sort_key), rows[-1].id, sort_key)
         
-        return {"documents": doc_list, "total": total, "skip": skip, "limit": limit}
+        return {"documents": doc_list, "total": total, "skip": skip, "limit": limit, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error listing documents: {e}")
-        return {"documents": [], "total": 0, "skip": skip, "limit": limit}
+        return {"documents": [], "total": 0, "skip": skip, "limit": limit, "next_cursor": None}
 def list_documents(skip: int = 0, limit: int = 100):
     try:
         all_documents = []
@@ -197,8 +266,12 @@ def list_documents(skip: int = 0, limit: int = 100):
 
 
 @app.get("/api/v1/documents/{document_id}")
-def get_document_details(document_id: int, db: Session = Depends(get_db)):
-    """Get document details including extracted text"""
+def get_document_details(document_id: int, request: Request, response: Response, include_text: bool = True,
+                         db: Session = Depends(get_db)):
+    """
+    Get document details including extracted text. Supports If-None-Match.
+    include_text=false skips the text body; read it page by page from /pages or /text instead.
+    """
     from app.models.document import Document
     import os
     
@@ -208,110 +281,136 @@ def get_document_details(document_id: int, db: Session = Depends(get_db)):
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
         
+        # The text column is deferred, so a 304 never loads it
+        etag = make_etag("document", document.id, document.revision, document.updated_at, include_text)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+        
         # Calculate file size
         file_size = "Unknown"
         if document.original_path and os.path.exists(document.original_path):
             size_bytes = os.path.getsize(document.original_path)
             file_size = f"{size_bytes / (1024*1024):.1f} MB"
         
-        # Get word count
-        word_count = 0
-        if document.extracted_text:
-            word_count = len(document.extracted_text.split())
-        
-        return {
+        # Text statistics and timings are stored at processing time
+        details = {
             "id": document.id,
             "filename": document.filename,
-            "extracted_text": document.extracted_text or "No text extracted yet.",
-            "word_count": word_count,
+            "word_count": document.word_count or 0,
+            "char_count": document.char_count or 0,
             "confidence": document.confidence_score or 0,
-            "processing_time": 2.3,
+            "processing_time": document.processing_time,
+            "stage_durations": document.stage_durations or {},
             "file_size": file_size,
             "metadata": {
                 "document_type": document.document_type or "Unknown",
-                "pages": 0,
+                "pages": document.page_count or 0,
+                "extraction_method": document.extraction_method,
                 "created_at": document.created_at.isoformat() if document.created_at else None
             }
         }
+        if include_text:
+            details["extracted_text"] = document.extracted_text or "No text extracted yet."
+        return details
     except HTTPException:
         raise
     except Exception as e:
         print(f"Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/v1/documents/export/excel")
-def export_documents_excel(db: Session = Depends(get_db)):
-    """Export all documents to Excel"""
-    from app.models.document import Document
-    from app.services.export_service import get_export_service
-    from fastapi.responses import Response
+def temp_file_response(suffix: str, write, media_type: str, filename: str):
+    """Run `write(path)` into a temp file, then stream the file back and remove it"""
+    from fastapi.responses import FileResponse
+    from starlette.background import BackgroundTask
+    import tempfile
     
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
     try:
-        documents = db.query(Document).all()
-        doc_list = []
-        for doc in documents:
-            doc_list.append({
-                "id": doc.id,
-                "filename": doc.filename,
-                "file_type": doc.file_type,
-                "status": doc.status,
-                "confidence": doc.confidence_score,
-                "document_type": doc.document_type or "Unknown",
-                "created_at": doc.created_at.isoformat() if doc.created_at else None,
-                "word_count": len(doc.extracted_text.split()) if doc.extracted_text else 0,
-                "extracted_text": doc.extracted_text or ""
-            })
-        
-        export_service = get_export_service()
-        excel_data = export_service.export_to_excel(doc_list)
-        
-        return Response(
-            content=excel_data,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": "attachment; filename=documents.xlsx"}
-        )
+        write(path)
     except Exception as e:
+        os.remove(path)
         raise HTTPException(status_code=500, detail=str(e))
+    return FileResponse(path, media_type=media_type, filename=filename, background=BackgroundTask(os.remove, path))
 
-@app.get("/api/v1/documents/export/csv")
-def export_documents_csv(db: Session = Depends(get_db)):
-    """Export all documents to CSV"""
-    from app.models.document import Document
-    from app.services.export_service import get_export_service
-    from fastapi.responses import Response
+@app.get("/api/v1/documents/export/excel")
+def export_documents_excel(include_text: bool = True, filters: DocumentFilters = Depends(document_filters),
+                           db: Session = Depends(get_db)):
+    """
+    Export documents to Excel, with the list endpoint's filters. include_text=false gives a metadata-only export.
+    The workbook is written row by row to a temp file, which is streamed back and then removed.
+    """
+    from app.services.export_service import get_export_service, iter_export_rows
     
+    return temp_file_response(
+        ".xlsx",
+        lambda path: get_export_service().write_excel(iter_export_rows(db, filters, include_text), path, include_text),
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "documents.xlsx"
+    )
+
+def columnar_export(db: Session, fields: Optional[str], row_group_size: int, filters: DocumentFilters,
+                    export_format: str):
+    """Parquet/Arrow export into a temp file, one row group per batch read from the database cursor"""
+    from app.services import export_service
+    
+    if not export_service.PYARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Columnar export requires pyarrow")
     try:
-        documents = db.query(Document).all()
-        doc_list = []
-        for doc in documents:
-            doc_list.append({
-                "id": doc.id,
-                "filename": doc.filename,
-                "file_type": doc.file_type,
-                "status": doc.status,
-                "confidence": doc.confidence_score,
-                "document_type": doc.document_type or "Unknown",
-                "created_at": doc.created_at.isoformat() if doc.created_at else None,
-                "word_count": len(doc.extracted_text.split()) if doc.extracted_text else 0,
-                "extracted_text": doc.extracted_text or ""
-            })
-        
-        export_service = get_export_service()
-        csv_data = export_service.export_to_csv(doc_list)
-        
-        return Response(
-            content=csv_data,
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=documents.csv"}
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        selected = export_service.parse_columnar_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    service = export_service.get_export_service()
+    write = service.write_parquet if export_format == "parquet" else service.write_arrow
+    schema = export_service.pa.schema([export_service.columnar_schema().field(f) for f in selected])
+    suffix = ".parquet" if export_format == "parquet" else ".arrow"
+    return temp_file_response(
+        suffix,
+        lambda path: write(export_service.iter_record_batches(db, selected, filters, row_group_size), schema, path),
+        "application/vnd.apache.parquet" if export_format == "parquet" else "application/vnd.apache.arrow.file",
+        f"documents{suffix}"
+    )
+
+@app.get("/api/v1/documents/export/parquet")
+def export_documents_parquet(fields: Optional[str] = None, row_group_size: int = Query(10000, ge=100, le=100000),
+                             filters: DocumentFilters = Depends(document_filters), db: Session = Depends(get_db)):
+    """
+    Export documents as Parquet with a typed schema (zstd, one row group per `row_group_size` rows).
+    `fields` selects columns - extracted_text and entities are opt-in; the list endpoint's filters apply.
+    """
+    return columnar_export(db, fields, row_group_size, filters, "parquet")
+
+@app.get("/api/v1/documents/export/arrow")
+def export_documents_arrow(fields: Optional[str] = None, row_group_size: int = Query(10000, ge=100, le=100000),
+                           filters: DocumentFilters = Depends(document_filters), db: Session = Depends(get_db)):
+    """Export documents as an Arrow IPC file; same schema, fields and filters as the Parquet export."""
+    return columnar_export(db, fields, row_group_size, filters, "arrow")
+
+@app.get("/api/v1/documents/export/csv")
+def export_documents_csv(include_text: bool = True, filters: DocumentFilters = Depends(document_filters),
+                         db: Session = Depends(get_db)):
+    """
+    Stream documents as CSV, with the list endpoint's filters. include_text=false gives a metadata-only export.
+    Rows are read in batches and written as they arrive, so memory stays flat however large the corpus.
+    """
+    from app.services.export_service import get_export_service, iter_export_rows
+    from fastapi.responses import StreamingResponse
+    
+    rows = iter_export_rows(db, filters, include_text)
+    return StreamingResponse(
+        get_export_service().iter_csv(rows, include_text),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=documents.csv"}
+    )
 
 @app.delete("/api/v1/documents/{document_id}")
 def delete_document(document_id: int, db: Session = Depends(get_db)):
     """Delete a document"""
     from app.models.document import Document
-    import os
+    from app.services.page_service import delete_pages
+    from app.services.purge_service import remove_document_files, delete_vectors
     
     try:
         document = db.query(Document).filter(Document.id == document_id).first()
@@ -319,16 +418,15 @@ def delete_document(document_id: int, db: Session = Depends(get_db)):
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
         
-        # Delete physical files if they exist
-        if document.original_path and os.path.exists(document.original_path):
-            os.remove(document.original_path)
-        
-        if document.processed_path and os.path.exists(document.processed_path):
-            os.remove(document.processed_path)
+        # Delete physical files and sidecars if no duplicate still uses them
+        remove_document_files(db, document)
+        delete_vectors([document.id])
         
         # Delete from database
+        delete_pages(db, document.id)
         db.delete(document)
         db.commit()
+        publish_event(event_bus.DELETED, document_id)
         
         return {"message": "Document deleted successfully", "document_id": document_id}
     except HTTPException:
@@ -337,18 +435,16 @@ def delete_document(document_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/documents/{document_id}/entities")
-def get_document_entities(document_id: int, db: Session = Depends(get_db)):
+def get_document_entities(document_id: int, refresh: bool = False, db: Session = Depends(get_db)):
+    """Entities stored at processing time; NER re-runs only for a new model version or refresh=true"""
     from app.models.document import Document
-    from app.services.ner_service import get_ner_service
+    from app.services import entity_service
     try:
         document = db.query(Document).filter(Document.id == document_id).first()
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
-        if not document.extracted_text:
-            return {"entities": {"persons": [], "organizations": [], "dates": [], "money": [], "locations": []}}
-        ner_service = get_ner_service()
-        entities = ner_service.extract_entities(document.extracted_text)
-        return {"document_id": document_id, "entities": entities}
+        entities = entity_service.get_document_entities(db, document, refresh)
+        return {"document_id": document_id, "entities": entities, "model_version": document.entities_version}
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,149 @@
+"""
+Document counters - aggregate counts kept up to date as documents change,
+so endpoints never need a COUNT(*) or GROUP BY over the whole table.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, String, BigInteger, Integer, Date, event, inspect, insert, update
+from sqlalchemy.orm import Session
+from app.models.database import Base
+
+class DocumentCounter(Base):
+    __tablename__ = "document_counters"
+    
+    # "total", "version", "status:<status>", "type:<document_type>",
+    # "confidence_sum" (hundredths of a percent), "confidence_count"
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+class DailyUploadStat(Base):
+    __tablename__ = "daily_upload_stats"
+    
+    day = Column(Date, primary_key=True)  # UTC
+    uploads = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+
+
+def type_key(document_type) -> str:
+    return f"type:{document_type or 'Unknown'}"
+
+
+def confidence_centi(confidence) -> int:
+    return int(round(confidence * 100)) if confidence is not None else 0
+
+
+def _add(deltas: dict, name: str, delta: int):
+    deltas[name] = deltas.get(name, 0) + delta
+
+
+def _contribute(deltas: dict, status, document_type, confidence, sign: int):
+    """Add (sign=1) or remove (sign=-1) one document's share of every aggregate"""
+    _add(deltas, "total", sign)
+    _add(deltas, f"status:{status}", sign)
+    _add(deltas, type_key(document_type), sign)
+    if confidence is not None:
+        _add(deltas, "confidence_sum", sign * confidence_centi(confidence))
+        _add(deltas, "confidence_count", sign)
+
+
+def _previous(history, current):
+    return history.deleted[0] if history.deleted else current
+
+
+def document_counter_deltas(session: Session):
+    """Net change per counter and per day for the documents in the current flush"""
+    from app.models.document import Document
+    
+    deltas, daily = {}, {}
+    changed = False
+    today = datetime.utcnow().date()
+    
+    for obj in session.new:
+        if isinstance(obj, Document):
+            _contribute(deltas, obj.status or "pending", obj.document_type, obj.confidence_score, 1)
+            _add(daily, "uploads", 1)
+            if obj.status in ("completed", "failed"):
+                _add(daily, obj.status, 1)
+            changed = True
+    for obj in session.deleted:
+        # Soft-deleted rows left the aggregates when deleted_at was set
+        if isinstance(obj, Document) and obj.deleted_at is None:
+            _contribute(deltas, obj.status, obj.document_type, obj.confidence_score, -1)
+            changed = True
+    for obj in session.dirty:
+        if not isinstance(obj, Document) or not session.is_modified(obj):
+            continue
+        changed = True
+        attrs = inspect(obj).attrs
+        if attrs.deleted_at.history.has_changes():
+            if obj.deleted_at is not None:
+                _contribute(deltas, _previous(attrs.status.history, obj.status),
+                            _previous(attrs.document_type.history, obj.document_type),
+                            _previous(attrs.confidence_score.history, obj.confidence_score), -1)
+            continue
+        if obj.deleted_at is not None:
+            continue
+        status, doc_type, confidence = attrs.status.history, attrs.document_type.history, attrs.confidence_score.history
+        if not (status.has_changes() or doc_type.has_changes() or confidence.has_changes()):
+            continue
+        _contribute(deltas, _previous(status, obj.status), _previous(doc_type, obj.document_type),
+                    _previous(confidence, obj.confidence_score), -1)
+        _contribute(deltas, obj.status, obj.document_type, obj.confidence_score, 1)
+        if status.has_changes() and obj.status in ("completed", "failed"):
+            _add(daily, obj.status, 1)
+    
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    # Table-wide change version, used for list ETags
+    if changed:
+        deltas["version"] = 1
+    return deltas, ({today: daily} if daily else {})
+
+
+def _upsert(connection, table, key_column: str, key, increments: dict):
+    """INSERT ... ON CONFLICT DO UPDATE col = col + n, on dialects that support it"""
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table).values({key_column: key, **increments})
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[key_column],
+            set_={col: table.c[col] + stmt.excluded[col] for col in increments},
+        )
+        connection.execute(stmt)
+        return
+    result = connection.execute(
+        update(table).where(table.c[key_column] == key).values({col: table.c[col] + n for col, n in increments.items()})
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values({key_column: key, **increments}))
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_document_changes(session, flush_context, instances):
+    from app.models.document import Document
+    
+    # Deltas are taken before the flush, while deleted rows can still be loaded
+    session.info["document_counter_deltas"] = document_counter_deltas(session)
+    
+    # Per-row revision, used for detail ETags
+    for obj in session.dirty:
+        if isinstance(obj, Document) and session.is_modified(obj):
+            obj.revision = (obj.revision or 0) + 1
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_document_counters(session, flush_context):
+    # Runs inside the flush's transaction, so aggregates commit or roll back with the rows
+    deltas, daily = session.info.pop("document_counter_deltas", ({}, {}))
+    if not deltas and not daily:
+        return
+    connection = session.connection()
+    for name, delta in sorted(deltas.items()):
+        _upsert(connection, DocumentCounter.__table__, "name", name, {"value": delta})
+    for day, increments in daily.items():
+        _upsert(connection, DailyUploadStat.__table__, "day", day, increments)
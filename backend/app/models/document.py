@@ -3,12 +3,27 @@ Document model - represents a document in our database.
 Each uploaded document will create one of these records.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, Boolean, Index, event
+from sqlalchemy.orm import deferred, column_property, Session, with_loader_criteria
 from sqlalchemy.sql import func
 from app.models.database import Base
+from app.db.types import CompressedText
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # Keyset pagination walks (created_at, id) newest first
+        Index("ix_documents_created_at_id", "created_at", "id"),
+        # Filtered listings: equality filter first, then the default sort
+        Index("ix_documents_status_created_at", "status", "created_at"),
+        Index("ix_documents_document_type_created_at", "document_type", "created_at"),
+        Index("ix_documents_file_type_created_at", "file_type", "created_at"),
+        Index("ix_documents_user_id_created_at", "user_id", "created_at"),
+        Index("ix_documents_confidence_score", "confidence_score"),
+        # Delta exports: rows changed since a watermark
+        Index("ix_documents_updated_at", "updated_at"),
+        Index("ix_documents_deleted_at", "deleted_at"),
+    )
     
     # Primary key - unique identifier
     id = Column(Integer, primary_key=True, index=True)
@@ -19,21 +34,64 @@ class Document(Base):
     file_size = Column(Integer)  # in bytes
     
     # Processing status
-    status = Column(String, default="pending")  # pending, processing, completed, failed
+    # active_history loads the old value on assignment so the counter hooks see transitions
+    status = column_property(Column(String, default="pending"), active_history=True)  # pending, processing, completed, failed
     
     # Storage paths
     original_path = Column(String)
     processed_path = Column(String)
     
-    # Extracted content
-    extracted_text = Column(Text)
-    extracted_entities = Column(JSON)  # Store as JSON
-    document_type = Column(String)  # invoice, contract, resume, etc.
-    confidence_score = Column(Float)
+    # Content addressing - identical uploads share one blob
+    content_hash = Column(String(64), index=True)  # SHA-256 hex digest
+    duplicate_of = Column(Integer, nullable=True)  # document the results were reused from
+    
+    # Upload-time triage
+    mime_type = Column(String)  # sniffed from magic bytes, not the file name
+    page_count = Column(Integer)
+    is_encrypted = Column(Boolean)
+    triage_status = Column(String)  # ok, corrupt, encrypted, unsupported
+    text_layer_ratio = Column(Float)  # fraction of sampled pages with extractable text
+    
+    # Extracted content - deferred so list/metadata queries never pull the large bodies
+    extracted_text = deferred(Column(CompressedText), group="content")
+    # Own group: serving stored entities must not pull the text along with them
+    extracted_entities = deferred(Column(JSON), group="entities")
+    entities_version = Column(String)  # NER model version that produced extracted_entities
+    document_type = column_property(Column(String), active_history=True)  # invoice, contract, resume, etc.
+    confidence_score = column_property(Column(Float), active_history=True)  # OCR/extraction confidence, 0-100
+    classification_confidence = Column(Float)
+    
+    # Text statistics and timings, computed once when the document is processed
+    word_count = Column(Integer)
+    char_count = Column(Integer)
+    extraction_method = Column(String)  # text_layer, hybrid, tesseract, plain_text
+    processing_time = Column(Float)  # seconds, whole pipeline
+    stage_durations = Column(JSON)  # {"extract": 1.2, "classify": 0.1, ...} in seconds
+    
+    # Incremented on every update; detail ETags derive from it
+    revision = Column(Integer, default=1, server_default="1")
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Set by bulk delete; the row and its files are purged in the background
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    
     # User who uploaded (we'll add authentication later)
-    user_id = Column(Integer, nullable=True)
\ No newline at end of file
+    user_id = Column(Integer, nullable=True)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _hide_deleted_documents(state):
+    """Soft-deleted documents are invisible to ORM queries unless include_deleted=True is passed"""
+    if state.is_select and not state.execution_options.get("include_deleted", False):
+        state.statement = state.statement.options(
+            with_loader_criteria(Document, Document.deleted_at.is_(None), include_aliases=True)
+        )
+
+# Registers the flush hooks that keep aggregate counters, the entity index, reused pages and tombstones in step with this table
+import app.models.counter  # noqa: E402,F401
+import app.models.document_entity  # noqa: E402,F401
+import app.models.document_page  # noqa: E402,F401
+import app.models.document_tombstone  # noqa: E402,F401
@@ -0,0 +1,90 @@
+"""
+Entity index - one row per entity mention, kept in step with
+Document.extracted_entities, so "which documents mention X" is an index
+lookup instead of NER over the whole corpus.
+"""
+
+import re
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Index, event, inspect, insert, delete
+from sqlalchemy.orm import Session
+from app.models.database import Base
+
+class DocumentEntity(Base):
+    __tablename__ = "document_entities"
+    __table_args__ = (
+        # Exact and prefix (range) lookups, optionally narrowed to one label
+        Index("ix_document_entities_normalized_label", "normalized", "label", "document_id"),
+        # Top entities of one type
+        Index("ix_document_entities_label_normalized", "label", "normalized", "document_id"),
+        Index("ix_document_entities_document_id", "document_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    document_id = Column(Integer, nullable=False)
+    label = Column(String(32), nullable=False)  # PERSON, ORG, DATE, MONEY, EMAIL, INVOICE_NUMBER, ...
+    text = Column(String, nullable=False)  # as it appears in the document
+    normalized = Column(String(200), nullable=False)  # see normalize_entity
+
+    # Character offsets into Document.extracted_text
+    start_char = Column(Integer)
+    end_char = Column(Integer)
+
+
+_SPACES = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " .,;:!?\"'()[]{}"
+_DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%m-%d-%Y", "%m/%d/%y", "%m-%d-%y")
+
+
+def normalize_entity(text: str) -> str:
+    """Case-folded with whitespace collapsed; numeric dates become ISO so any spelling finds them"""
+    value = _SPACES.sub(" ", text).strip(_EDGE_PUNCTUATION).casefold()
+    if value[:1].isdigit():
+        for date_format in _DATE_FORMATS:
+            try:
+                return datetime.strptime(value, date_format).date().isoformat()
+            except ValueError:
+                pass
+    return value[:200]
+
+
+def entity_rows(document_id: int, entities) -> list:
+    rows = []
+    for entity in (entities or {}).get("all_entities", []):
+        normalized = normalize_entity(entity["text"])
+        if normalized:
+            rows.append({
+                "document_id": document_id,
+                "label": entity["label"][:32],
+                "text": entity["text"],
+                "normalized": normalized,
+                "start_char": entity.get("start"),
+                "end_char": entity.get("end"),
+            })
+    return rows
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_entity_changes(session, flush_context, instances):
+    from app.models.document import Document
+
+    # history never loads the deferred column, so untouched documents cost nothing here
+    changed = [obj for obj in session.new | session.dirty
+               if isinstance(obj, Document) and inspect(obj).attrs.extracted_entities.history.has_changes()]
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Document)]
+    if changed or deleted:
+        session.info["entity_index_changes"] = (changed, deleted)
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_entity_index(session, flush_context):
+    # Same transaction as the documents: the index commits or rolls back with them
+    changed, deleted = session.info.pop("entity_index_changes", ([], []))
+    stale_ids = [obj.id for obj in changed] + deleted
+    if not stale_ids:
+        return
+    connection = session.connection()
+    connection.execute(delete(DocumentEntity.__table__).where(DocumentEntity.document_id.in_(stale_ids)))
+    rows = [row for obj in changed for row in entity_rows(obj.id, obj.extracted_entities)]
+    if rows:
+        connection.execute(insert(DocumentEntity.__table__), rows)
@@ -0,0 +1,63 @@
+"""
+Document page model - the extracted text of one page.
+Pages let readers fetch a page or character range without loading the
+whole document text, and let a single page be reprocessed on its own.
+A document that reuses another's results gets its own copy of the pages.
+"""
+
+from sqlalchemy import Column, Integer, Float, String, Index, event, inspect, insert, delete, select, literal
+from sqlalchemy.orm import Session
+from app.models.database import Base
+from app.db.types import CompressedText
+
+class DocumentPage(Base):
+    __tablename__ = "document_pages"
+    __table_args__ = (
+        Index("ix_document_pages_document_page", "document_id", "page_number", unique=True),
+        # Character-range lookups find the pages overlapping an offset
+        Index("ix_document_pages_document_offset", "document_id", "char_offset"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    document_id = Column(Integer, nullable=False)
+    page_number = Column(Integer, nullable=False)  # 1-based
+    
+    text = Column(CompressedText)
+    confidence = Column(Float)  # OCR confidence for this page, 0-100
+    method = Column(String)  # text_layer or tesseract
+    
+    # Position of this page within Document.extracted_text (pages joined by PAGE_SEPARATOR)
+    char_offset = Column(Integer, nullable=False)
+    char_count = Column(Integer, nullable=False)
+    word_count = Column(Integer)
+
+
+PAGE_FIELDS = ("page_number", "text", "confidence", "method", "char_offset", "char_count", "word_count")
+
+
+def copy_pages(connection, document_id: int, source_id: int):
+    """Replace a document's pages with a copy of another document's, in SQL; returns how many were copied"""
+    pages = DocumentPage.__table__
+    connection.execute(delete(pages).where(pages.c.document_id == document_id))
+    return connection.execute(insert(pages).from_select(
+        ["document_id", *PAGE_FIELDS],
+        select(literal(document_id), *[pages.c[name] for name in PAGE_FIELDS]).where(pages.c.document_id == source_id),
+    )).rowcount
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_reused_pages(session, flush_context, instances):
+    from app.models.document import Document
+
+    reused = [obj for obj in session.new | session.dirty
+              if isinstance(obj, Document) and obj.duplicate_of is not None
+              and inspect(obj).attrs.duplicate_of.history.has_changes()]
+    if reused:
+        session.info["reused_pages"] = reused
+
+
+@event.listens_for(Session, "after_flush")
+def _copy_reused_pages(session, flush_context):
+    # Copied rather than shared, so deleting or reprocessing the source leaves the duplicate intact
+    for obj in session.info.pop("reused_pages", []):
+        copy_pages(session.connection(), obj.id, obj.duplicate_of)
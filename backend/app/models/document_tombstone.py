@@ -0,0 +1,46 @@
+"""
+Document tombstones - one row per deleted document, written when it is
+soft-deleted or hard-deleted and kept after the purge removes the row, so
+delta exports can report deletions since their watermark.
+"""
+
+from sqlalchemy import Column, Integer, DateTime, Index, event, inspect, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from app.models.database import Base
+
+class DocumentTombstone(Base):
+    __tablename__ = "document_tombstones"
+    __table_args__ = (
+        Index("ix_document_tombstones_deleted_at", "deleted_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    document_id = Column(Integer, nullable=False)  # ids can be reused, so not the key
+    # The database clock, like updated_at and export watermarks
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_deletions(session, flush_context, instances):
+    from app.models.document import Document
+
+    deleted = []
+    for obj in session.deleted:
+        # A soft-deleted document already has its tombstone
+        if isinstance(obj, Document) and obj.deleted_at is None:
+            deleted.append(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, Document):
+            history = inspect(obj).attrs.deleted_at.history
+            if history.added and history.added[0] is not None and not any(history.deleted):
+                deleted.append(obj.id)
+    if deleted:
+        session.info["document_tombstones"] = deleted
+
+
+@event.listens_for(Session, "after_flush")
+def _write_tombstones(session, flush_context):
+    deleted = session.info.pop("document_tombstones", [])
+    if deleted:
+        session.connection().execute(insert(DocumentTombstone.__table__), [{"document_id": i} for i in deleted])
@@ -0,0 +1,29 @@
+"""
+Export job model - a background export and the file it produced.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, JSON, Text
+from sqlalchemy.sql import func
+from app.models.database import Base
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    format = Column(String, nullable=False)  # csv, xlsx, parquet, arrow
+    params = Column(JSON)  # filters, fields and include_text, as requested
+    updated_since = Column(DateTime(timezone=True), nullable=True)  # delta exports only
+    
+    status = Column(String, default="pending")  # pending, running, completed, failed
+    row_count = Column(Integer)
+    file_path = Column(String)
+    file_size = Column(BigInteger)
+    error = Column(Text)
+    
+    # Taken just before the export query; pass it as the next updated_since to chain delta exports
+    watermark = Column(DateTime(timezone=True))
+    # Delta exports: documents deleted since updated_since, so a sync can remove them
+    deleted_ids = Column(JSON)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True))
@@ -0,0 +1,22 @@
+"""
+Purge job model - progress of a background purge of soft-deleted documents.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy.sql import func
+from app.models.database import Base
+
+class PurgeJob(Base):
+    __tablename__ = "purge_jobs"
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    status = Column(String, default="pending")  # pending, running, completed, failed
+    
+    requested = Column(Integer, default=0)  # documents soft-deleted by the request
+    total = Column(Integer, default=0)  # soft-deleted documents found when the purge started
+    purged = Column(Integer, default=0)
+    files_removed = Column(Integer, default=0)
+    errors = Column(JSON)  # [{"document_id": ..., "error": ...}], capped
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True))
@@ -0,0 +1,23 @@
+"""
+Upload session model - tracks a resumable upload while its chunks arrive.
+The chunks themselves live on disk; this row holds the session metadata.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger
+from sqlalchemy.sql import func
+from app.models.database import Base
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    filename = Column(String, nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    received_bytes = Column(BigInteger, default=0)
+    expected_sha256 = Column(String(64), nullable=True)
+    
+    status = Column(String, default="open")  # open, completing, completed, aborted
+    document_id = Column(Integer, nullable=True)  # set once finalized
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
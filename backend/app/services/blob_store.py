@@ -0,0 +1,63 @@
+"""
+Content-addressed blob store.
+Keeps exactly one physical copy of each uploaded file, keyed by SHA-256.
+"""
+
+import os
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Optional, Tuple
+from app.core.config import settings
+from app.services.upload_service import StoredUpload, get_upload_service
+
+
+class BlobStore:
+    def __init__(self, root: str = None):
+        self.root = Path(root or settings.BLOB_FOLDER or os.path.join(settings.UPLOAD_FOLDER, "blobs"))
+
+    def _shard(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4]
+
+    def staging_path(self) -> Path:
+        """Scratch location on the same filesystem, so commits are atomic renames"""
+        staging = self.root / "tmp"
+        staging.mkdir(parents=True, exist_ok=True)
+        return staging / uuid.uuid4().hex
+
+    def find(self, digest: str) -> Optional[Path]:
+        """Return the stored blob for a hash, whatever extension it was saved with"""
+        shard = self._shard(digest)
+        if shard.exists():
+            for path in shard.glob(f"{digest}*"):
+                return path
+        return None
+
+    def store_file(self, path: str, digest: str, size: int, extension: str = "") -> Tuple[StoredUpload, bool]:
+        """
+        Move an already-hashed file into the store.
+        Returns the stored blob and whether it was new; duplicates are discarded.
+        """
+        existing = self.find(digest)
+        if existing:
+            os.remove(path)
+            return StoredUpload(path=str(existing), size=size, sha256=digest), False
+
+        shard = self._shard(digest)
+        shard.mkdir(parents=True, exist_ok=True)
+        final_path = shard / f"{digest}{extension.lower()}"
+        os.replace(path, final_path)
+        return StoredUpload(path=str(final_path), size=size, sha256=digest), True
+
+    def put_stream(self, source: BinaryIO, extension: str = "", max_size: int = None) -> Tuple[StoredUpload, bool]:
+        """Stream an upload into the store, hashing it on the way in"""
+        staged = get_upload_service().save_stream(source, str(self.staging_path()), max_size)
+        return self.store_file(staged.path, staged.sha256, staged.size, extension)
+
+
+_blob_store = None
+
+def get_blob_store():
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = BlobStore()
+    return _blob_store
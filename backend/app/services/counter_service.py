@@ -0,0 +1,133 @@
+"""
+Aggregate reads.
+Aggregates are rebuilt from the documents table once (on first use, or on
+demand to repair drift); after that the flush hooks in models/counter.py
+keep them current, so every read here is O(number of statuses/types/days).
+"""
+
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.counter import DocumentCounter, DailyUploadStat, type_key, confidence_centi
+from app.models.document import Document
+
+logger = logging.getLogger(__name__)
+
+INITIALIZED = "initialized"
+
+
+def rebuild_aggregates(db: Session):
+    """Recompute every counter and the daily rollup from the documents table. Caller commits."""
+    counters = {"total": 0, "confidence_sum": 0, "confidence_count": 0}
+    rows = db.query(
+        Document.status, Document.document_type,
+        func.count(Document.id), func.sum(Document.confidence_score), func.count(Document.confidence_score)
+    ).group_by(Document.status, Document.document_type).all()
+    for status, document_type, count, confidence_sum, confidence_count in rows:
+        counters["total"] += count
+        counters[f"status:{status}"] = counters.get(f"status:{status}", 0) + count
+        counters[type_key(document_type)] = counters.get(type_key(document_type), 0) + count
+        counters["confidence_sum"] += confidence_centi(confidence_sum or 0)
+        counters["confidence_count"] += confidence_count
+    
+    daily = {}
+    for day, count in db.query(func.date(Document.created_at), func.count(Document.id)).group_by(func.date(Document.created_at)):
+        if day:
+            daily.setdefault(str(day), {"uploads": 0, "completed": 0, "failed": 0})["uploads"] = count
+    # The outcome day is approximated by the last update
+    outcome_day = func.date(func.coalesce(Document.updated_at, Document.created_at))
+    outcomes = db.query(outcome_day, Document.status, func.count(Document.id)).filter(
+        Document.status.in_(["completed", "failed"])
+    ).group_by(outcome_day, Document.status)
+    for day, status, count in outcomes:
+        if day:
+            daily.setdefault(str(day), {"uploads": 0, "completed": 0, "failed": 0})[status] = count
+    
+    version = db.get(DocumentCounter, "version")
+    db.query(DocumentCounter).filter(DocumentCounter.name != "version").delete(synchronize_session=False)
+    db.query(DailyUploadStat).delete(synchronize_session=False)
+    db.add_all([DocumentCounter(name=name, value=value) for name, value in counters.items()])
+    db.add_all([DailyUploadStat(day=datetime.strptime(day, "%Y-%m-%d").date(), **values) for day, values in daily.items()])
+    if version is None:
+        db.add(DocumentCounter(name="version", value=1))
+    db.add(DocumentCounter(name=INITIALIZED, value=1))
+    logger.info(f"Rebuilt document aggregates: {counters['total']} documents")
+
+
+def ensure_aggregates(db: Session):
+    """Build aggregates the first time they are needed"""
+    if db.get(DocumentCounter, INITIALIZED) is not None:
+        return
+    try:
+        rebuild_aggregates(db)
+        db.commit()
+    except IntegrityError:
+        # Another worker built them first
+        db.rollback()
+
+
+def get_total_documents(db: Session) -> int:
+    ensure_aggregates(db)
+    counter = db.get(DocumentCounter, "total")
+    return counter.value if counter else 0
+
+
+def get_documents_version(db: Session) -> int:
+    """Change version of the documents table - any insert, update or delete bumps it"""
+    counter = db.get(DocumentCounter, "version")
+    return counter.value if counter else 0
+
+
+def get_overview(db: Session, days: int = 7) -> dict:
+    """Dashboard statistics from the maintained aggregates"""
+    ensure_aggregates(db)
+    counters = {c.name: c.value for c in db.query(DocumentCounter)}
+    status_breakdown = {name.split(":", 1)[1]: value for name, value in counters.items()
+                        if name.startswith("status:") and value}
+    document_types = {name.split(":", 1)[1]: value for name, value in counters.items()
+                      if name.startswith("type:") and value}
+    
+    completed = status_breakdown.get("completed", 0)
+    failed = status_breakdown.get("failed", 0)
+    success_rate = (completed / (completed + failed) * 100) if (completed + failed) > 0 else 0
+    confidence_count = counters.get("confidence_count", 0)
+    average_confidence = counters.get("confidence_sum", 0) / 100 / confidence_count if confidence_count else 0
+    
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    daily_rows = db.query(DailyUploadStat).filter(DailyUploadStat.day >= since).order_by(DailyUploadStat.day).all()
+    daily = [{"day": row.day.isoformat(), "uploads": row.uploads, "completed": row.completed, "failed": row.failed}
+             for row in daily_rows]
+    today = datetime.utcnow().date().isoformat()
+    
+    return {
+        "total_documents": counters.get("total", 0),
+        "status_breakdown": status_breakdown,
+        "document_types": document_types,
+        "success_rate": round(success_rate, 2),
+        "average_confidence": round(average_confidence, 2),
+        "recent_uploads": sum(row["uploads"] for row in daily),
+        "uploads_today": next((row["uploads"] for row in daily if row["day"] == today), 0),
+        "processed_today": next((row["completed"] for row in daily if row["day"] == today), 0),
+        "daily": daily,
+    }
+
+
+def get_filtered_total(db: Session, filters) -> int:
+    """Total for a filtered listing: from counters when a single status/type filter allows it, else an indexed COUNT"""
+    from app.services.document_query import apply_filters, _split
+    
+    active = filters.active
+    if not active:
+        return get_total_documents(db)
+    if set(active) in ({"status"}, {"document_type"}):
+        ensure_aggregates(db)
+        if "status" in active:
+            names = [f"status:{s}" for s in _split(filters.status)]
+        else:
+            names = [type_key(t) for t in _split(filters.document_type)]
+        return db.query(func.coalesce(func.sum(DocumentCounter.value), 0)).filter(
+            DocumentCounter.name.in_(names)
+        ).scalar()
+    return apply_filters(db.query(func.count(Document.id)), filters).scalar()
@@ -0,0 +1,94 @@
+"""
+Upload deduplication.
+Documents with identical content share one blob, and a new upload of
+already-processed content reuses the earlier results instead of running
+OCR, classification and NER again.
+"""
+
+from typing import Dict, Iterable, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.document import Document
+
+# Columns copied from a completed document onto its duplicates
+REUSED_FIELDS = (
+    "extracted_text",
+    "extracted_entities",
+    "entities_version",
+    "document_type",
+    "confidence_score",
+    "classification_confidence",
+    "processed_path",
+    "word_count",
+    "char_count",
+    "extraction_method",
+)
+
+
+def find_completed_duplicate(db: Session, document: Document) -> Optional[Document]:
+    """Find an earlier completed document with the same content hash"""
+    if not document.content_hash:
+        return None
+    query = db.query(Document).filter(
+        Document.content_hash == document.content_hash,
+        Document.status == "completed",
+    )
+    if document.id is not None:
+        query = query.filter(Document.id != document.id)
+    return query.order_by(Document.id).first()
+
+
+def find_completed_duplicates(db: Session, hashes: Iterable[str]) -> Dict[str, Document]:
+    """Earliest completed document for each hash, looked up in one query"""
+    hashes = {h for h in hashes if h}
+    if not hashes:
+        return {}
+    sources = {}
+    rows = db.query(Document).filter(
+        Document.content_hash.in_(hashes),
+        Document.status == "completed",
+    ).order_by(Document.id.desc()).all()
+    for row in rows:
+        sources[row.content_hash] = row
+    return sources
+
+
+def copy_processed_results(document: Document, source: Document):
+    for field in REUSED_FIELDS:
+        setattr(document, field, getattr(source, field))
+    document.duplicate_of = source.id
+    document.status = "completed"
+
+
+def reuse_processed_results(db: Session, document: Document) -> bool:
+    """Copy results from a completed duplicate. Caller commits."""
+    source = find_completed_duplicate(db, document)
+    if source is None:
+        return False
+    copy_processed_results(document, source)
+    return True
+
+
+def is_blob_shared(db: Session, path: str, exclude_id: int) -> bool:
+    """True when another document still points at the same file"""
+    return db.query(Document.id).filter(
+        (Document.original_path == path) | (Document.processed_path == path),
+        Document.id != exclude_id,
+    ).first() is not None
+
+
+def get_dedup_stats(db: Session) -> Dict:
+    """Report how often uploads hit existing content"""
+    hashed_uploads = db.query(func.count(Document.id)).filter(Document.content_hash.isnot(None)).scalar() or 0
+    unique_blobs = db.query(func.count(func.distinct(Document.content_hash))).scalar() or 0
+    reused_results = db.query(func.count(Document.id)).filter(Document.duplicate_of.isnot(None)).scalar() or 0
+    duplicate_uploads = hashed_uploads - unique_blobs
+
+    return {
+        "hashed_uploads": hashed_uploads,
+        "unique_blobs": unique_blobs,
+        "duplicate_uploads": duplicate_uploads,
+        "reused_results": reused_results,
+        "dedup_hit_rate": round(duplicate_uploads / hashed_uploads * 100, 2) if hashed_uploads else 0.0,
+        "reuse_rate": round(reused_results / hashed_uploads * 100, 2) if hashed_uploads else 0.0,
+    }
@@ -1,17 +1,154 @@
 import time
 """Document Classification Service - Hybrid ML + Rule-based"""
+import fcntl
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+import joblib
+import sklearn
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import GradientBoostingClassifier
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import accuracy_score
 import logging
+from app.core.config import settings
 from app.services.mlflow_tracker import MLflowTracker
 from app.data.training_data import TRAINING_DOCUMENTS
 
 logger = logging.getLogger(__name__)
 
+# Part of the artifact key: changing any of these retrains the model
+HYPERPARAMETERS = {
+    'augmentations': ['original', 'lower', 'first_half', 'second_half'],
+    'tfidf': {'max_features': 1000, 'ngram_range': [1, 4], 'min_df': 1, 'max_df': 0.9},
+    'clf': {'n_estimators': 200, 'learning_rate': 0.1, 'max_depth': 5, 'random_state': 42},
+}
+
+_AUGMENTATIONS = {
+    'original': lambda doc: doc,
+    'lower': lambda doc: doc.lower(),
+    'first_half': lambda doc: doc[:len(doc)//2],
+    'second_half': lambda doc: doc[len(doc)//2:],
+}
+
+
+def training_examples(documents=None, hyperparameters=None):
+    documents = TRAINING_DOCUMENTS if documents is None else documents
+    hyperparameters = hyperparameters or HYPERPARAMETERS
+    train_data, train_labels = [], []
+    for category, category_documents in documents.items():
+        for doc in category_documents:
+            for augmentation in hyperparameters['augmentations']:
+                train_data.append(_AUGMENTATIONS[augmentation](doc))
+                train_labels.append(category)
+    return train_data, train_labels
+
+
+def artifact_key(documents=None, hyperparameters=None) -> str:
+    """Hash of the training data, hyperparameters and scikit-learn version (pickles are version-bound)"""
+    payload = json.dumps({
+        'documents': TRAINING_DOCUMENTS if documents is None else documents,
+        'hyperparameters': hyperparameters or HYPERPARAMETERS,
+        'sklearn': sklearn.__version__,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def classifier_folder() -> Path:
+    folder = Path(settings.CLASSIFIER_FOLDER or os.path.join(settings.UPLOAD_FOLDER, "classifiers"))
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder
+
+
+def artifact_path(key: str) -> Path:
+    return classifier_folder() / f"document_classifier-{key}.joblib"
+
+
+def train_pipeline(documents=None, hyperparameters=None) -> Pipeline:
+    hyperparameters = hyperparameters or HYPERPARAMETERS
+    train_data, train_labels = training_examples(documents, hyperparameters)
+    logger.info(f"Training with {len(train_data)} examples")
+    tfidf = dict(hyperparameters['tfidf'], ngram_range=tuple(hyperparameters['tfidf']['ngram_range']))
+    pipeline = Pipeline([
+        ('tfidf', TfidfVectorizer(**tfidf)),
+        ('clf', GradientBoostingClassifier(**hyperparameters['clf']))
+    ])
+    pipeline.fit(train_data, train_labels)
+    accuracy = accuracy_score(train_labels, pipeline.predict(train_data))
+    logger.info(f"Training accuracy: {accuracy:.2%}")
+    return pipeline
+
+
+def save_artifact(pipeline: Pipeline, key: str, hyperparameters: dict) -> Path:
+    """
+    Write the fitted pipeline next to a JSON description of how it was trained;
+    the rename makes it appear atomically. `hyperparameters` are the ones it was fitted with.
+    """
+    path = artifact_path(key)
+    partial = path.with_name(path.name + ".part")
+    joblib.dump(pipeline, partial)
+    os.replace(partial, path)
+    path.with_suffix(".json").write_text(json.dumps({
+        'key': key,
+        'hyperparameters': hyperparameters,
+        'sklearn': sklearn.__version__,
+        'classes': list(pipeline.classes_),
+        'trained_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }, indent=2))
+    return path
+
+
+def train_artifact(documents=None, hyperparameters=None) -> Path:
+    """Train and save an artifact; the key and the recorded metadata use the same effective parameters"""
+    hyperparameters = hyperparameters or HYPERPARAMETERS
+    key = artifact_key(documents, hyperparameters)
+    return save_artifact(train_pipeline(documents, hyperparameters), key, hyperparameters)
+
+
+def pinned_key() -> str:
+    """CLASSIFIER_ARTIFACT_KEY when set, otherwise the key of this code's training data and parameters"""
+    return settings.CLASSIFIER_ARTIFACT_KEY or artifact_key()
+
+
+@contextmanager
+def _training_lock():
+    """Exclusive across the workers sharing the classifier folder, so only one of them trains"""
+    with open(classifier_folder() / "training.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def load_pipeline(train_if_missing: bool = None) -> Pipeline:
+    """
+    The pinned artifact, memory-mapped. When this code's artifact is missing (a fresh deploy, or
+    changed training data or hyperparameters) one worker trains it under a lock and the others
+    wait for it; with training disabled, or for a pinned key, a missing artifact is an error.
+    """
+    key = pinned_key()
+    path = artifact_path(key)
+    if not path.exists():
+        if train_if_missing is None:
+            train_if_missing = settings.CLASSIFIER_TRAIN_IF_MISSING
+        if not train_if_missing:
+            raise FileNotFoundError(f"No classifier artifact for key {key} in {classifier_folder()}; "
+                                    f"run train_classifier.py")
+        if key != artifact_key():
+            raise FileNotFoundError(f"Pinned classifier artifact {key} is missing and can't be rebuilt here")
+        with _training_lock():
+            if not path.exists():
+                logger.warning(f"No classifier artifact for key {key}, training one")
+                train_artifact()
+    logger.info(f"Loading classifier artifact {path.name}")
+    return joblib.load(path, mmap_mode='r')
+
+
 class DocumentClassifier:
-    def __init__(self):
+    def __init__(self, pipeline: Pipeline = None):
         self.categories = list(TRAINING_DOCUMENTS.keys())
         self.keyword_signals = {
             'resume': ['resume', 'cv', 'work experience', 'education', 'skills', 'professional summary'],
@@ -20,22 +157,7 @@ class DocumentClassifier:
             'letter': ['dear', 'sincerely', 'regards', 'writing to', 'thank you', 'looking forward'],
             'report': ['report', 'analysis', 'findings', 'conclusion', 'executive summary', 'recommendations']
         }
-        
-        self.train_data = []
-        self.train_labels = []
-        for category, documents in TRAINING_DOCUMENTS.items():
-            for doc in documents:
-                self.train_data.extend([doc, doc.lower(), doc[:len(doc)//2], doc[len(doc)//2:]])
-                self.train_labels.extend([category] * 4)
-        
-        logger.info(f"Training with {len(self.train_data)} examples")
-        self.pipeline = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=1000, ngram_range=(1,4), min_df=1, max_df=0.9)),
-            ('clf', GradientBoostingClassifier(n_estimators=200, learning_rate=0.1, max_depth=5, random_state=42))
-        ])
-        self.pipeline.fit(self.train_data, self.train_labels)
-        accuracy = accuracy_score(self.train_labels, self.pipeline.predict(self.train_data))
-        logger.info(f"Training accuracy: {accuracy:.2%}")
+        self.pipeline = pipeline if pipeline is not None else load_pipeline()
         self.mlflow_tracker = MLflowTracker()
     
     def classify(self, text: str) -> dict:
@@ -0,0 +1,233 @@
+"""
+Document listing queries.
+Lists select only the columns they render - never the extracted text or
+entities - filter and sort in SQL, and page with a (sort key, id) keyset cursor.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from pydantic import BaseModel
+from sqlalchemy import and_, bindparam, func, or_, select
+from sqlalchemy.orm import Query, Session
+from app.models.document import Document
+from app.db.types import TimestampBound
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+# Response field -> (columns it needs, formatter over the projected row)
+LIST_FIELDS: Dict[str, Tuple[Tuple[str, ...], Callable]] = {
+    "id": (("id",), lambda r: r.id),
+    "filename": (("filename",), lambda r: r.filename),
+    "file_type": (("file_type",), lambda r: r.file_type),
+    "file_size": (("file_size",), lambda r: r.file_size),
+    "mime_type": (("mime_type",), lambda r: r.mime_type),
+    "status": (("status",), lambda r: r.status),
+    "document_type": (("document_type",), lambda r: r.document_type or "Unknown"),
+    "confidence": (("confidence_score",), lambda r: r.confidence_score),
+    "page_count": (("page_count",), lambda r: r.page_count),
+    "word_count": (("word_count",), lambda r: r.word_count),
+    "char_count": (("char_count",), lambda r: r.char_count),
+    "processing_time": (("processing_time",), lambda r: r.processing_time),
+    "triage_status": (("triage_status",), lambda r: r.triage_status),
+    "content_hash": (("content_hash",), lambda r: r.content_hash),
+    "duplicate_of": (("duplicate_of",), lambda r: r.duplicate_of),
+    "user_id": (("user_id",), lambda r: r.user_id),
+    "created_at": (("created_at",), lambda r: _iso(r.created_at)),
+    "uploaded_at": (("created_at",), lambda r: _iso(r.created_at)),
+    "updated_at": (("updated_at",), lambda r: _iso(r.updated_at)),
+}
+
+DEFAULT_LIST_FIELDS = [
+    "id", "filename", "file_type", "status", "document_type", "created_at", "uploaded_at", "confidence",
+]
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Parse a `fields=a,b,c` sparse fieldset; raises ValueError on unknown names"""
+    if not fields:
+        return list(DEFAULT_LIST_FIELDS)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(LIST_FIELDS)}")
+    return list(dict.fromkeys(requested))
+
+
+def projected_query(db: Session, fields: List[str], sort_key: str = "created_at") -> Query:
+    """Select just the columns the requested fields need (plus the keyset columns)"""
+    column_names = {"id", SORT_KEYS[sort_key][0].key}
+    for field in fields:
+        column_names.update(LIST_FIELDS[field][0])
+    return db.query(*[getattr(Document, name) for name in sorted(column_names)])
+
+
+def serialize_row(row, fields: List[str]) -> dict:
+    return {field: LIST_FIELDS[field][1](row) for field in fields}
+
+
+class DocumentFilters(NamedTuple):
+    """Server-side list filters; multi-valued fields take comma-separated values"""
+    status: Optional[str] = None
+    document_type: Optional[str] = None
+    file_type: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    min_confidence: Optional[float] = None
+    max_confidence: Optional[float] = None
+    user_id: Optional[int] = None
+    updated_since: Optional[datetime] = None
+    
+    @property
+    def active(self) -> Dict[str, object]:
+        return {name: value for name, value in self._asdict().items() if value not in (None, "")}
+
+
+def document_filters(status: Optional[str] = None, document_type: Optional[str] = None,
+                     file_type: Optional[str] = None, created_from: Optional[datetime] = None,
+                     created_to: Optional[datetime] = None, min_confidence: Optional[float] = None,
+                     max_confidence: Optional[float] = None, user_id: Optional[int] = None,
+                     updated_since: Optional[datetime] = None) -> DocumentFilters:
+    """FastAPI dependency - the same filter query parameters on every listing and export endpoint"""
+    return DocumentFilters(status, document_type, file_type, created_from, created_to,
+                           min_confidence, max_confidence, user_id, updated_since)
+
+
+class DocumentFilterBody(BaseModel):
+    """The list filters as fields of a JSON request body"""
+    status: Optional[str] = None
+    document_type: Optional[str] = None
+    file_type: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    min_confidence: Optional[float] = None
+    max_confidence: Optional[float] = None
+    user_id: Optional[int] = None
+    
+    def to_filters(self, updated_since: Optional[datetime] = None) -> DocumentFilters:
+        return DocumentFilters(self.status, self.document_type, self.file_type, self.created_from, self.created_to,
+                               self.min_confidence, self.max_confidence, self.user_id, updated_since)
+
+
+def _split(value: str) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def _at(value: datetime):
+    return bindparam(None, value, type_=TimestampBound)
+
+
+def apply_filters(query: Query, filters: DocumentFilters) -> Query:
+    """Each filter leads a composite (column, created_at) index declared on Document"""
+    if filters.status:
+        query = query.filter(Document.status.in_(_split(filters.status)))
+    if filters.document_type:
+        types = _split(filters.document_type)
+        condition = Document.document_type.in_(types)
+        # Lists render a missing type as "Unknown", so accept it as a filter value too
+        if "Unknown" in types:
+            condition = or_(condition, Document.document_type.is_(None))
+        query = query.filter(condition)
+    if filters.file_type:
+        query = query.filter(Document.file_type.in_([t.lower().lstrip(".") for t in _split(filters.file_type)]))
+    if filters.created_from is not None:
+        query = query.filter(Document.created_at >= _at(filters.created_from))
+    if filters.created_to is not None:
+        query = query.filter(Document.created_at < _at(filters.created_to))
+    if filters.min_confidence is not None:
+        query = query.filter(Document.confidence_score >= filters.min_confidence)
+    if filters.max_confidence is not None:
+        query = query.filter(Document.confidence_score <= filters.max_confidence)
+    if filters.user_id is not None:
+        query = query.filter(Document.user_id == filters.user_id)
+    if filters.updated_since is not None:
+        # Rows never updated have no updated_at; their creation is the change
+        query = query.filter(or_(
+            Document.updated_at >= _at(filters.updated_since),
+            and_(Document.updated_at.is_(None), Document.created_at >= _at(filters.updated_since))
+        ))
+    return query
+
+
+# Sort key -> (column, may contain NULLs). NULLs always sort last.
+SORT_KEYS = {
+    "created_at": (Document.created_at, False),
+    "updated_at": (Document.updated_at, True),
+    "confidence": (Document.confidence_score, True),
+    "filename": (Document.filename, False),
+    "file_size": (Document.file_size, True),
+    "id": (Document.id, False),
+}
+DEFAULT_SORT = "-created_at"
+
+
+def parse_sort(sort: Optional[str]) -> Tuple[str, bool]:
+    """`created_at` ascending, `-created_at` descending; raises ValueError on unknown keys"""
+    sort = sort or DEFAULT_SORT
+    key, descending = sort.lstrip("-"), sort.startswith("-")
+    if key not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {key}. Available: {', '.join(SORT_KEYS)}")
+    return key, descending
+
+
+def apply_sort(query: Query, key: str, descending: bool) -> Query:
+    column, nullable = SORT_KEYS[key]
+    ordered = column.desc() if descending else column.asc()
+    if nullable:
+        ordered = ordered.nulls_last()
+    if key == "id":
+        return query.order_by(ordered)
+    return query.order_by(ordered, Document.id.desc() if descending else Document.id.asc())
+
+
+def sort_value(row, key: str):
+    return getattr(row, SORT_KEYS[key][0].key)
+
+
+def encode_cursor(value, document_id: int, sort_key: str = "created_at") -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort_key, value, document_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, object, int]:
+    """Raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key, value, document_id = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if sort_key not in SORT_KEYS:
+            raise ValueError(sort_key)
+        if value is not None and sort_key in ("created_at", "updated_at"):
+            value = datetime.fromisoformat(value)
+        return sort_key, value, int(document_id)
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def apply_keyset(query: Query, cursor: str, sort_key: str = "created_at", descending: bool = True) -> Query:
+    """Rows strictly after the cursor in the (sort key, id) order of apply_sort"""
+    cursor_key, cursor_value, cursor_id = decode_cursor(cursor)
+    if cursor_key != sort_key:
+        raise ValueError("Cursor does not match the requested sort")
+    column, nullable = SORT_KEYS[sort_key]
+    after_id = Document.id < cursor_id if descending else Document.id > cursor_id
+    if sort_key == "id":
+        return query.filter(after_id)
+    if cursor_value is None:
+        # Already into the trailing NULLs
+        return query.filter(column.is_(None), after_id)
+    
+    # Compare against the stored value so timestamp formatting can't skew the boundary
+    boundary = func.coalesce(select(column).where(Document.id == cursor_id).scalar_subquery(), cursor_value)
+    condition = or_(
+        column < boundary if descending else column > boundary,
+        and_(column == boundary, after_id)
+    )
+    if nullable:
+        condition = or_(condition, column.is_(None))
+    return query.filter(condition)
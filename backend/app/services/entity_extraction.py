@@ -1,65 +1,114 @@
 """
 Named Entity Recognition (NER) service.
 Extracts important entities like dates, amounts, names, etc.
+
+All patterns are compiled into one alternation and the text is scanned once.
+Each pattern can only start where its token starts (lookbehinds) and every
+repetition is delimited, so a pattern fails after a bounded number of steps
+at any position and a scan is linear in the text length, digit runs included.
 """
 
 import re
-from typing import Dict, List, Any
-from datetime import datetime
+import time
+from typing import Dict, List, Any, NamedTuple, Optional
+
+# Alternation order decides overlaps: key/value fields before the generic patterns
+# they contain, and specific shapes (email, url, date) before bare numbers
+PATTERNS = [
+    ('invoice_number', r'\binvoice\s{0,3}(?:#|no\.?|number)?\s{0,3}:?\s{0,3}(?P<invoice_number_value>(?=[A-Z-]{0,39}\d)[A-Z0-9][A-Z0-9-]{0,39})(?![A-Z0-9-])'),
+    ('total_amount', r'\btotal\s{0,3}:?\s{0,3}(?P<total_amount_value>\$?\s?\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\$?\s?\d+(?:\.\d{1,2})?)(?![\d,])'),
+    ('due_date', r'\bdue\s+date\s{0,3}:?\s{0,3}(?P<due_date_value>\d{1,2}[-/]\d{1,2}[-/]\d{2,4})\b'),
+    ('email', r'(?<![\w.%+-])[A-Za-z0-9._%+-]+@(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,}\b'),
+    ('url', r'https?://[-\w.]+(?::\d+)?(?:/\S*)?'),
+    ('date', r'(?<![\w/-])(?:\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\d{4}[-/]\d{1,2}[-/]\d{1,2})\b'),
+    ('percentage', r'(?<![\d.])\d+(?:\.\d+)?%'),
+    ('money', r'[$€£]\s?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d{2})?(?![\d,])'),
+    # Digit groups are always separated, so a long digit run can't be split many ways
+    ('phone', r'(?<![\w+])(?:\+\d{1,3}[\s.-]?)?(?:\(\d{1,4}\)\s?|\d{2,4}[\s.-])\d{2,4}[\s.-]\d{2,9}(?![\d])'),
+]
+
+# Key/value fields also report their value as a generic entity
+FIELD_VALUE_TYPES = {'invoice_number': None, 'total_amount': 'money', 'due_date': 'date'}
+
+DEFAULT_TIME_BUDGET = 2.0  # seconds per document
+# The text is scanned in bounded chunks so the deadline is checked even where nothing matches;
+# each chunk's scan runs OVERLAP characters past it so matches straddling the cut are seen whole
+SCAN_CHUNK_CHARS = 64 * 1024
+SCAN_OVERLAP_CHARS = 1024
+
+
+class EntityMatch(NamedTuple):
+    type: str
+    text: str
+    start: int
+    end: int
+
+
+class ScanResult(NamedTuple):
+    matches: List[EntityMatch]
+    complete: bool  # False when the time budget ran out before the end of the text
+
 
 class EntityExtractor:
-    def __init__(self):
-        # Regex patterns for common entities
-        self.patterns = {
-            'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            'phone': r'[\+]?[(]?[0-9]{1,3}[)]?[-\s\.]?[(]?[0-9]{1,4}[)]?[-\s\.]?[0-9]{1,4}[-\s\.]?[0-9]{1,9}',
-            'money': r'\$?\d+(?:,\d{3})*(?:\.\d{2})?',
-            'date': r'\b(?:\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\d{4}[-/]\d{1,2}[-/]\d{1,2})\b',
-            'percentage': r'\d+(?:\.\d+)?%',
-            'url': r'https?://(?:[-\w.])+(?:\:\d+)?(?:/[^\s]*)?',
-        }
-    
+    def __init__(self, time_budget: float = DEFAULT_TIME_BUDGET):
+        self.time_budget = time_budget
+        self.scanner = re.compile(
+            '|'.join(f'(?P<{name}>{pattern})' for name, pattern in PATTERNS),
+            re.IGNORECASE,
+        )
+
+    def scan(self, text: str, time_budget: Optional[float] = None) -> ScanResult:
+        """One pass over the text; matches come back in text order with character offsets."""
+        budget = self.time_budget if time_budget is None else time_budget
+        deadline = time.perf_counter() + budget
+        text = text or ''
+        matches = []
+        pos = 0
+        while pos < len(text):
+            if time.perf_counter() > deadline:
+                return ScanResult(matches, False)
+            chunk_end = pos + SCAN_CHUNK_CHARS
+            scan_end = min(chunk_end + SCAN_OVERLAP_CHARS, len(text))
+            next_pos = chunk_end
+            for m in self.scanner.finditer(text, pos, scan_end):
+                if m.start() >= chunk_end:
+                    break
+                if m.end() == scan_end < len(text) and m.start() > pos:
+                    # May continue past the scanned range - rescan from its start
+                    next_pos = m.start()
+                    break
+                self._add_match(matches, m)
+                next_pos = max(next_pos, m.end())
+                if time.perf_counter() > deadline:
+                    return ScanResult(matches, False)
+            pos = next_pos
+        return ScanResult(matches, True)
+
+    def _add_match(self, matches: List[EntityMatch], m):
+        entity_type = m.lastgroup
+        if entity_type in FIELD_VALUE_TYPES:
+            value = f'{entity_type}_value'
+            matches.append(EntityMatch(entity_type, m.group(value), m.start(value), m.end(value)))
+            if FIELD_VALUE_TYPES[entity_type]:
+                matches.append(EntityMatch(FIELD_VALUE_TYPES[entity_type], m.group(value), m.start(value), m.end(value)))
+        else:
+            matches.append(EntityMatch(entity_type, m.group(), m.start(), m.end()))
+
     def extract_entities(self, text: str) -> Dict[str, List[str]]:
         """Extract various entities from text."""
         entities = {}
-        
-        for entity_type, pattern in self.patterns.items():
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                # Remove duplicates while preserving order
-                entities[entity_type] = list(dict.fromkeys(matches))
-        
-        # Extract invoice-specific entities
-        invoice_entities = self.extract_invoice_entities(text)
-        if invoice_entities:
-            entities.update(invoice_entities)
-        
-        return entities
-    
+        for match in self.scan(text).matches:
+            if match.type in FIELD_VALUE_TYPES:
+                # Invoice fields keep their first occurrence
+                entities.setdefault(match.type, match.text)
+            else:
+                entities.setdefault(match.type, {})[match.text] = None
+        # Remove duplicates while preserving order
+        return {key: list(value) if isinstance(value, dict) else value for key, value in entities.items()}
+
     def extract_invoice_entities(self, text: str) -> Dict[str, Any]:
         """Extract invoice-specific information."""
-        entities = {}
-        text_lower = text.lower()
-        
-        # Invoice number
-        invoice_pattern = r'invoice\s*#?\s*:?\s*([A-Z0-9-]+)'
-        invoice_match = re.search(invoice_pattern, text, re.IGNORECASE)
-        if invoice_match:
-            entities['invoice_number'] = invoice_match.group(1)
-        
-        # Total amount
-        total_pattern = r'total\s*:?\s*\$?([0-9,]+\.?\d*)'
-        total_match = re.search(total_pattern, text, re.IGNORECASE)
-        if total_match:
-            entities['total_amount'] = total_match.group(1)
-        
-        # Due date
-        due_pattern = r'due\s+date\s*:?\s*([0-9]{1,2}[-/][0-9]{1,2}[-/][0-9]{2,4})'
-        due_match = re.search(due_pattern, text, re.IGNORECASE)
-        if due_match:
-            entities['due_date'] = due_match.group(1)
-        
-        return entities
+        return {key: value for key, value in self.extract_entities(text).items() if key in FIELD_VALUE_TYPES}
 
 # Singleton instance
-entity_extractor = EntityExtractor()
\ No newline at end of file
+entity_extractor = EntityExtractor()
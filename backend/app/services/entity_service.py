@@ -0,0 +1,126 @@
+"""
+Stored named entities.
+Entities are extracted once when a document is processed and kept on the
+document with the NER model version that produced them; reads serve the
+stored copy and only re-run NER when that version is stale. Storing them
+also refreshes the DocumentEntity index that the lookups below read.
+"""
+
+from typing import Dict, List, Optional
+from sqlalchemy import distinct, func, or_
+from sqlalchemy.orm import Session, undefer
+from app.models.document import Document
+from app.models.document_entity import DocumentEntity, normalize_entity
+from app.services.ner_service import get_ner_service
+
+
+def store_entities(document: Document, entities: Dict, model_version: str):
+    document.extracted_entities = entities
+    document.entities_version = model_version
+
+
+def entities_are_current(document: Document, model_version: str) -> bool:
+    return document.entities_version == model_version and document.extracted_entities is not None
+
+
+def get_document_entities(db: Session, document: Document, refresh: bool = False) -> Dict:
+    """Stored entities, recomputed (and stored again) when missing, stale or refresh is asked for"""
+    ner_service = get_ner_service()
+    model_version = ner_service.model_version
+    if refresh or not entities_are_current(document, model_version):
+        store_entities(document, ner_service.extract_entities(document.extracted_text or ""), model_version)
+        db.commit()
+    return document.extracted_entities
+
+
+def refresh_stale_entities(db: Session, batch_size: int = 200, n_process: int = None, refresh_all: bool = False) -> int:
+    """
+    Re-run NER over completed documents whose stored entities are missing or from another model
+    version, a batch of texts per nlp.pipe call. Commits per batch; returns how many were updated.
+    """
+    ner_service = get_ner_service()
+    model_version = ner_service.model_version
+    query = db.query(Document).options(undefer(Document.extracted_text)).filter(Document.status == "completed")
+    if not refresh_all:
+        query = query.filter(or_(Document.entities_version.is_(None), Document.entities_version != model_version))
+
+    updated, last_id = 0, 0
+    while True:
+        batch = query.filter(Document.id > last_id).order_by(Document.id).limit(batch_size).all()
+        if not batch:
+            break
+        texts = [document.extracted_text or "" for document in batch]
+        for document, entities in zip(batch, ner_service.extract_entities_batch(texts, n_process=n_process)):
+            store_entities(document, entities, model_version)
+        last_id = batch[-1].id
+        db.commit()
+        db.expunge_all()
+        updated += len(batch)
+    return updated
+
+
+def _entity_condition(text: str, label: Optional[str], prefix: bool):
+    normalized = normalize_entity(text)
+    if prefix:
+        # A range rather than LIKE, so any database can answer it from the (normalized, ...) index
+        condition = DocumentEntity.normalized.between(normalized, normalized + "\U0010ffff")
+    else:
+        condition = DocumentEntity.normalized == normalized
+    if label:
+        condition = condition & (DocumentEntity.label == label.upper())
+    return condition
+
+
+def find_documents(db: Session, text: str, label: Optional[str] = None, prefix: bool = False,
+                   limit: int = 50, cursor: Optional[int] = None) -> List[Dict]:
+    """Documents mentioning an entity, newest id first; `cursor` is the last id of the previous page"""
+    query = db.query(
+        DocumentEntity.document_id,
+        func.count(DocumentEntity.id).label("mentions"),
+        func.min(DocumentEntity.start_char).label("first_offset"),
+    ).join(Document, Document.id == DocumentEntity.document_id).filter(_entity_condition(text, label, prefix))
+    if cursor is not None:
+        query = query.filter(DocumentEntity.document_id < cursor)
+    hits = query.group_by(DocumentEntity.document_id).order_by(DocumentEntity.document_id.desc()).limit(limit).all()
+    if not hits:
+        return []
+
+    documents = {row.id: row for row in db.query(
+        Document.id, Document.filename, Document.document_type, Document.status, Document.created_at
+    ).filter(Document.id.in_([hit.document_id for hit in hits]))}
+    results = []
+    for hit in hits:
+        document = documents[hit.document_id]
+        results.append({
+            "document_id": hit.document_id,
+            "filename": document.filename,
+            "document_type": document.document_type or "Unknown",
+            "status": document.status,
+            "created_at": document.created_at.isoformat() if document.created_at else None,
+            "mentions": hit.mentions,
+            "first_offset": hit.first_offset,
+        })
+    return results
+
+
+def top_entities(db: Session, label: Optional[str] = None, limit: int = 20) -> Dict[str, List[Dict]]:
+    """Most widespread entities per label, by the number of documents mentioning them"""
+    if label:
+        labels = [label.upper()]
+    else:
+        labels = [value for (value,) in db.query(distinct(DocumentEntity.label)).order_by(DocumentEntity.label)]
+
+    top = {}
+    for value in labels:
+        documents = func.count(distinct(DocumentEntity.document_id))
+        rows = db.query(
+            DocumentEntity.normalized,
+            func.min(DocumentEntity.text).label("text"),
+            documents.label("documents"),
+            func.count(DocumentEntity.id).label("mentions"),
+        ).join(Document, Document.id == DocumentEntity.document_id).filter(
+            DocumentEntity.label == value
+        ).group_by(DocumentEntity.normalized).order_by(documents.desc(), DocumentEntity.normalized).limit(limit).all()
+        top[value] = [{"text": row.text, "normalized": row.normalized, "documents": row.documents,
+                       "mentions": row.mentions} for row in rows]
+    return top
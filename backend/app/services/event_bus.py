@@ -0,0 +1,215 @@
+"""
+Document lifecycle event bus.
+Publishers (upload endpoints, the process router, Celery tasks) push
+events; the SSE endpoint fans them out to every connected client.
+Recent events are kept in a ring buffer so clients can resume from the
+last event ID they saw.
+
+SSE clients subscribe to the API process's in-memory bus. Celery workers
+run in other processes, so they publish to a Redis channel instead, and
+with EVENT_RELAY on the API republishes that channel on its own bus.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lifecycle event types
+UPLOADED = "uploaded"
+PROCESSING = "processing"
+PROGRESS = "progress"
+COMPLETED = "completed"
+FAILED = "failed"
+DELETED = "deleted"
+# Sent when a client's last event ID has fallen out of the buffer - it should refetch
+RESET = "reset"
+
+# Redis pub/sub channel carrying events from worker processes to the API
+RELAY_CHANNEL = "document-events"
+
+
+class InMemoryEventBus:
+    def __init__(self, buffer_size: int = None, queue_size: int = None):
+        self._lock = threading.Lock()
+        self._buffer = deque(maxlen=buffer_size or settings.EVENT_BUFFER_SIZE)
+        self._queue_size = queue_size or settings.EVENT_QUEUE_SIZE
+        self._next_id = 1
+        self._subscribers = set()
+
+    def publish(self, event_type: str, document_id: int = None, **data) -> dict:
+        """Record an event and hand it to every subscriber. Safe to call from any thread."""
+        with self._lock:
+            event = {
+                "id": self._next_id,
+                "type": event_type,
+                "document_id": document_id,
+                "data": data,
+                "timestamp": datetime.now().isoformat(),
+            }
+            self._next_id += 1
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                # Subscriber's loop has closed; it unregisters itself
+                pass
+        return event
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, event: dict):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer - drop the backlog and tell it to refetch
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"id": event["id"], "type": RESET, "document_id": None, "data": {}, "timestamp": event["timestamp"]})
+
+    def _backlog(self, last_event_id: Optional[int]):
+        """Buffered events after last_event_id, and whether the history is complete"""
+        if last_event_id is None:
+            return [], True
+        newest = self._buffer[-1]["id"] if self._buffer else self._next_id - 1
+        if last_event_id > newest:
+            # IDs from before a restart
+            return [], False
+        oldest = self._buffer[0]["id"] if self._buffer else self._next_id
+        if last_event_id < oldest - 1:
+            return [], False
+        return [e for e in self._buffer if e["id"] > last_event_id], True
+
+    async def subscribe(self, last_event_id: int = None, heartbeat: float = None) -> AsyncIterator[Optional[dict]]:
+        """
+        Yield events as they are published, replaying anything after last_event_id first.
+        Yields None every `heartbeat` seconds of silence so callers can send keep-alives.
+        """
+        queue = asyncio.Queue(maxsize=self._queue_size)
+        subscriber = (asyncio.get_running_loop(), queue)
+        # Register and snapshot under one lock so nothing falls between replay and live delivery
+        with self._lock:
+            self._subscribers.add(subscriber)
+            backlog, complete = self._backlog(last_event_id)
+            last_seen = self._next_id - 1 if not complete else (last_event_id or self._next_id - 1)
+
+        try:
+            if not complete:
+                yield {"id": last_seen, "type": RESET, "document_id": None, "data": {}, "timestamp": datetime.now().isoformat()}
+            for event in backlog:
+                last_seen = event["id"]
+                yield event
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event["id"] <= last_seen and event["type"] != RESET:
+                    continue
+                last_seen = event["id"]
+                yield event
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+def _redis_client():
+    import redis
+
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+class RedisEventPublisher:
+    """Bus for processes without SSE clients (Celery workers): events go to Redis for the API to relay"""
+
+    def __init__(self, client=None, channel: str = RELAY_CHANNEL):
+        self._client = client
+        self.channel = channel
+
+    def publish(self, event_type: str, document_id: int = None, **data) -> dict:
+        if self._client is None:
+            self._client = _redis_client()
+        message = {"type": event_type, "document_id": document_id, "data": data}
+        self._client.publish(self.channel, json.dumps(message))
+        return message
+
+
+class EventRelay:
+    """Republishes events from the Redis channel on a local bus, from a background thread"""
+
+    def __init__(self, bus, client=None, channel: str = RELAY_CHANNEL, retry_seconds: float = 5.0):
+        self.bus = bus
+        self.channel = channel
+        self.retry_seconds = retry_seconds
+        self._client = client
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="event-relay", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.retry_seconds)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._relay()
+            except Exception as e:
+                # Redis went away; events published meanwhile are lost, so clients are told to refetch
+                logger.warning(f"Event relay interrupted: {e}")
+                self._stop.wait(self.retry_seconds)
+                self.bus.publish(RESET)
+
+    def _relay(self):
+        if self._client is None:
+            self._client = _redis_client()
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        try:
+            while not self._stop.is_set():
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get("type") == "message":
+                    event = json.loads(message["data"])
+                    self.bus.publish(event["type"], event["document_id"], **event["data"])
+        finally:
+            pubsub.close()
+
+
+_event_bus = None
+
+def get_event_bus():
+    global _event_bus
+    if _event_bus is None:
+        _event_bus = InMemoryEventBus()
+    return _event_bus
+
+
+def set_event_bus(bus):
+    """Replace this process's bus - Celery workers install a RedisEventPublisher"""
+    global _event_bus
+    _event_bus = bus
+
+
+def publish_event(event_type: str, document_id: int = None, **data):
+    """Publish without ever letting a notification failure break the caller"""
+    try:
+        get_event_bus().publish(event_type, document_id, **data)
+    except Exception as e:
+        logger.warning(f"Failed to publish {event_type} event: {e}")
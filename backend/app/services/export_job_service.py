@@ -0,0 +1,153 @@
+"""
+Background export jobs.
+A job writes one export file into the managed exports folder; clients poll
+its status and download the file when it is done. Delta exports take
+`updated_since` and report a watermark to pass as the next `updated_since`.
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.export_job import ExportJob
+from app.models.document_tombstone import DocumentTombstone
+from app.services.document_query import DocumentFilters
+from app.db.types import TimestampBound
+from app.services import export_service
+
+logger = logging.getLogger(__name__)
+
+# format -> (file suffix, media type)
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "xlsx": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+def exports_folder() -> Path:
+    folder = Path(settings.EXPORT_FOLDER or os.path.join(settings.UPLOAD_FOLDER, "exports"))
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder
+
+
+class _Counted:
+    """Count items (or record batch rows) as a writer consumes them"""
+    def __init__(self, items: Iterable, rows_of: Callable = lambda item: 1):
+        self.items, self.rows_of, self.count = items, rows_of, 0
+
+    def __iter__(self) -> Iterator:
+        for item in self.items:
+            self.count += self.rows_of(item)
+            yield item
+
+
+def filters_to_params(filters: DocumentFilters) -> dict:
+    """JSON-safe form of the filters (updated_since is kept on its own column)"""
+    return {name: value.isoformat() if isinstance(value, datetime) else value
+            for name, value in filters.active.items() if name != "updated_since"}
+
+
+def filters_from_params(params: dict, updated_since: Optional[datetime] = None) -> DocumentFilters:
+    values = dict(params)
+    for name in ("created_from", "created_to"):
+        if values.get(name):
+            values[name] = datetime.fromisoformat(values[name])
+    return DocumentFilters(**values, updated_since=updated_since)
+
+
+def write_export(db: Session, export_format: str, path: Path, filters: DocumentFilters,
+                 fields: Optional[List[str]] = None, include_text: bool = True) -> int:
+    """Write one export file with the streaming writers; returns the number of rows"""
+    service = export_service.get_export_service()
+    if export_format in ("parquet", "arrow"):
+        if not export_service.PYARROW_AVAILABLE:
+            raise RuntimeError("Columnar export requires pyarrow")
+        fields = fields or list(export_service.DEFAULT_COLUMNAR_FIELDS)
+        schema = export_service.pa.schema([export_service.columnar_schema().field(f) for f in fields])
+        batches = _Counted(export_service.iter_record_batches(db, fields, filters), lambda batch: batch.num_rows)
+        write = service.write_parquet if export_format == "parquet" else service.write_arrow
+        write(batches, schema, path)
+        return batches.count
+    
+    rows = _Counted(export_service.iter_export_rows(db, filters, include_text))
+    if export_format == "xlsx":
+        service.write_excel(rows, path, include_text)
+    else:
+        with open(path, "wb") as f:
+            for chunk in service.iter_csv(rows, include_text):
+                f.write(chunk)
+    return rows.count
+
+
+def deleted_since(db: Session, since: datetime) -> List[int]:
+    """Ids of documents deleted at or after `since` - soft-deleted, purged or deleted outright"""
+    rows = db.query(DocumentTombstone.document_id).filter(DocumentTombstone.deleted_at >= bindparam(None, since, type_=TimestampBound))
+    return sorted({document_id for (document_id,) in rows})
+
+
+def run_export_job(job_id: str, session_factory: Callable[[], Session]):
+    """Run a pending job to completion. Uses its own session - it runs after the request has finished."""
+    db = session_factory()
+    try:
+        job = db.get(ExportJob, job_id)
+        if job is None or job.status != "pending":
+            return
+        job.status = "running"
+        # The database clock, so the watermark compares cleanly with updated_at
+        job.watermark = db.scalar(select(func.now()))
+        db.commit()
+        
+        params = job.params or {}
+        filters = filters_from_params(params.get("filters", {}), job.updated_since)
+        suffix = EXPORT_FORMATS[job.format][0]
+        path = exports_folder() / f"{job.id}{suffix}"
+        partial = path.with_name(path.name + ".part")
+        try:
+            row_count = write_export(db, job.format, partial, filters, params.get("fields"),
+                                     params.get("include_text", True))
+            os.replace(partial, path)
+        except Exception as e:
+            logger.exception(f"Export job {job_id} failed")
+            if partial.exists():
+                partial.unlink()
+            db.rollback()
+            job.status, job.error, job.completed_at = "failed", str(e), func.now()
+            db.commit()
+            return
+        
+        job.status = "completed"
+        job.row_count = row_count
+        if job.updated_since is not None:
+            job.deleted_ids = deleted_since(db, job.updated_since)
+        job.file_path = str(path)
+        job.file_size = path.stat().st_size
+        job.completed_at = func.now()
+        db.commit()
+    finally:
+        db.close()
+
+
+def delete_export_job(db: Session, job: ExportJob):
+    """Remove a job and its file. Caller commits."""
+    if job.file_path and os.path.exists(job.file_path):
+        os.remove(job.file_path)
+    db.delete(job)
+
+
+def purge_expired_exports(db: Session) -> int:
+    """Drop finished jobs older than EXPORT_RETENTION_HOURS, with their files"""
+    cutoff = datetime.utcnow() - timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+    expired = db.query(ExportJob).filter(
+        ExportJob.status.in_(["completed", "failed"]),
+        ExportJob.created_at < cutoff,
+    ).all()
+    for job in expired:
+        delete_export_job(db, job)
+    db.commit()
+    return len(expired)
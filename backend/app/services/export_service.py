@@ -1,49 +1,209 @@
 """Export Service - Generate Excel and CSV files with extracted text"""
-import pandas as pd
+import csv
 import io
-from typing import List, Dict
+import itertools
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter
+from sqlalchemy.orm import Session
+from app.models.document import Document
+from app.services.document_query import DocumentFilters, apply_filters
 
-class ExportService:
-    def export_to_excel(self, documents: List[Dict]) -> bytes:
-        df = pd.DataFrame(documents)
-        columns_map = {
-            'id': 'ID', 'filename': 'Filename', 'file_type': 'Type',
-            'status': 'Status', 'confidence': 'Confidence (%)',
-            'document_type': 'Document Type', 'created_at': 'Upload Date',
-            'word_count': 'Word Count', 'extracted_text': 'Extracted Text'
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+CSV_COLUMNS = {
+    'id': 'ID', 'filename': 'Filename', 'file_type': 'Type',
+    'status': 'Status', 'confidence': 'Confidence',
+    'document_type': 'Document Type', 'created_at': 'Upload Date',
+    'word_count': 'Word Count', 'char_count': 'Characters', 'page_count': 'Pages',
+    'extracted_text': 'Extracted Text'
+}
+EXCEL_COLUMNS = dict(CSV_COLUMNS, confidence='Confidence (%)')
+EXCEL_MAX_CELL_CHARS = 32000  # Excel's hard limit is 32767
+EXCEL_MAX_COLUMN_WIDTH = 50
+EXCEL_WIDTH_SAMPLE_ROWS = 200  # column widths come from the first rows only
+
+
+def iter_export_rows(db: Session, filters: Optional[DocumentFilters] = None, include_text: bool = True,
+                     batch_size: int = 500) -> Iterator[Dict]:
+    """
+    Export rows in id order, selecting only the exported columns.
+    yield_per streams from a server-side cursor, so only one batch is held in memory.
+    """
+    columns = [Document.id, Document.filename, Document.file_type, Document.status,
+               Document.confidence_score, Document.document_type, Document.created_at,
+               Document.word_count, Document.char_count, Document.page_count]
+    if include_text:
+        columns.append(Document.extracted_text)
+    
+    query = db.query(*columns)
+    if filters is not None:
+        query = apply_filters(query, filters)
+    for row in query.order_by(Document.id).yield_per(batch_size):
+        doc = {
+            "id": row.id,
+            "filename": row.filename,
+            "file_type": row.file_type,
+            "status": row.status,
+            "confidence": row.confidence_score,
+            "document_type": row.document_type or "Unknown",
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "word_count": row.word_count or 0,
+            "char_count": row.char_count or 0,
+            "page_count": row.page_count or 0,
         }
-        available_cols = [col for col in columns_map.keys() if col in df.columns]
-        df_export = df[available_cols].copy()
-        df_export.columns = [columns_map[col] for col in available_cols]
+        if include_text:
+            doc["extracted_text"] = row.extracted_text or ""
+        yield doc
+
+# Columnar export field -> Document attribute; types live in columnar_schema()
+COLUMNAR_FIELDS = {
+    "id": "id", "filename": "filename", "file_type": "file_type", "mime_type": "mime_type",
+    "status": "status", "document_type": "document_type", "confidence": "confidence_score",
+    "classification_confidence": "classification_confidence", "page_count": "page_count",
+    "word_count": "word_count", "char_count": "char_count", "extraction_method": "extraction_method",
+    "processing_time": "processing_time", "user_id": "user_id", "created_at": "created_at",
+    "updated_at": "updated_at", "entities": "extracted_entities", "extracted_text": "extracted_text",
+}
+# Text and entities are opt-in via fields=
+DEFAULT_COLUMNAR_FIELDS = [f for f in COLUMNAR_FIELDS if f not in ("entities", "extracted_text")]
+
+
+def columnar_schema() -> "pa.Schema":
+    label = pa.dictionary(pa.int32(), pa.string())  # low-cardinality strings
+    entity = pa.struct([("text", pa.string()), ("label", pa.string()), ("start", pa.int32()), ("end", pa.int32())])
+    timestamp = pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("id", pa.int64()), ("filename", pa.string()), ("file_type", label), ("mime_type", label),
+        ("status", label), ("document_type", label), ("confidence", pa.float64()),
+        ("classification_confidence", pa.float64()), ("page_count", pa.int32()), ("word_count", pa.int32()),
+        ("char_count", pa.int64()), ("extraction_method", label), ("processing_time", pa.float64()),
+        ("user_id", pa.int64()), ("created_at", timestamp), ("updated_at", timestamp),
+        ("entities", pa.list_(entity)), ("extracted_text", pa.large_string()),
+    ])
+
+
+def parse_columnar_fields(fields: Optional[str]) -> List[str]:
+    """Parse a `fields=a,b,c` column selection; raises ValueError on unknown names"""
+    if not fields:
+        return list(DEFAULT_COLUMNAR_FIELDS)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in COLUMNAR_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(COLUMNAR_FIELDS)}")
+    return list(dict.fromkeys(requested))
+
+
+def _entity_list(entities) -> Optional[List[Dict]]:
+    if not entities:
+        return None
+    return [{"text": e.get("text"), "label": e.get("label"), "start": e.get("start"), "end": e.get("end")}
+            for e in entities.get("all_entities", [])]
+
+
+def iter_record_batches(db: Session, fields: List[str], filters: Optional[DocumentFilters] = None,
+                        batch_size: int = 10000) -> Iterator["pa.RecordBatch"]:
+    """Typed record batches straight from a streaming cursor - each becomes one row group"""
+    schema = pa.schema([columnar_schema().field(f) for f in fields])
+    query = db.query(*[getattr(Document, COLUMNAR_FIELDS[f]) for f in fields])
+    if filters is not None:
+        query = apply_filters(query, filters)
+    
+    columns = {f: [] for f in fields}
+    for row in query.order_by(Document.id).yield_per(min(batch_size, 1000)):
+        for field, value in zip(fields, row):
+            columns[field].append(_entity_list(value) if field == "entities" else value)
+        if len(columns[fields[0]]) >= batch_size:
+            yield pa.RecordBatch.from_pydict(columns, schema=schema)
+            columns = {f: [] for f in fields}
+    if columns[fields[0]]:
+        yield pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+class ExportService:
+    def write_excel(self, documents: Iterable[Dict], path: Union[str, Path], include_text: bool = True) -> Path:
+        """
+        Write an XLSX file with a write-only workbook, which streams rows to disk as they are appended.
+        Column widths must be set before the first row, so they are sized from a bounded sample.
+        """
+        fields = [f for f in EXCEL_COLUMNS if include_text or f != 'extracted_text']
+        documents = iter(documents)
+        sample = list(itertools.islice(documents, EXCEL_WIDTH_SAMPLE_ROWS))
         
-        # Truncate long text for Excel
-        if 'Extracted Text' in df_export.columns:
-            df_export['Extracted Text'] = df_export['Extracted Text'].apply(
-                lambda x: str(x)[:32000] if pd.notna(x) else ''
-            )
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet('Documents')
+        for idx, field in enumerate(fields, start=1):
+            longest = max([len(EXCEL_COLUMNS[field])] + [len(str(doc.get(field) or '')) for doc in sample])
+            worksheet.column_dimensions[get_column_letter(idx)].width = min(longest + 2, EXCEL_MAX_COLUMN_WIDTH)
         
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df_export.to_excel(writer, index=False, sheet_name='Documents')
-            worksheet = writer.sheets['Documents']
-            for idx, col in enumerate(df_export.columns):
-                max_length = min(max(df_export[col].astype(str).str.len().max(), len(col)) + 2, 50)
-                worksheet.column_dimensions[chr(65 + idx)].width = max_length
-        output.seek(0)
-        return output.getvalue()
+        worksheet.append([EXCEL_COLUMNS[f] for f in fields])
+        for doc in itertools.chain(sample, documents):
+            worksheet.append([self._excel_value(doc.get(f)) for f in fields])
+        workbook.save(str(path))
+        return Path(path)
+    
+    @staticmethod
+    def _excel_value(value):
+        if isinstance(value, str):
+            # Control characters are invalid in XLSX; long text is truncated to fit a cell
+            return ILLEGAL_CHARACTERS_RE.sub('', value[:EXCEL_MAX_CELL_CHARS])
+        return value
+    
+    def export_to_excel(self, documents: List[Dict]) -> bytes:
+        include_text = bool(documents) and 'extracted_text' in documents[0]
+        fd, path = tempfile.mkstemp(suffix='.xlsx')
+        os.close(fd)
+        try:
+            return self.write_excel(documents, path, include_text).read_bytes()
+        finally:
+            os.remove(path)
+    
+    def iter_csv(self, documents: Iterable[Dict], include_text: bool = True,
+                 flush_bytes: int = 64 * 1024) -> Iterator[bytes]:
+        """CSV as a stream of ~64KB chunks; the header goes out before the first row is fetched"""
+        fields = [f for f in CSV_COLUMNS if include_text or f != 'extracted_text']
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([CSV_COLUMNS[f] for f in fields])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        for doc in documents:
+            writer.writerow([doc.get(f) for f in fields])
+            if buffer.tell() >= flush_bytes:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+    
+    def write_parquet(self, batches: Iterable["pa.RecordBatch"], schema: "pa.Schema", path: Union[str, Path]) -> Path:
+        """One row group per batch, zstd-compressed, with column statistics for predicate pushdown"""
+        with pq.ParquetWriter(str(path), schema, compression="zstd") as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+        return Path(path)
+    
+    def write_arrow(self, batches: Iterable["pa.RecordBatch"], schema: "pa.Schema", path: Union[str, Path]) -> Path:
+        """Arrow IPC file format (Feather v2)"""
+        options = pa.ipc.IpcWriteOptions(compression="zstd")
+        with pa.ipc.new_file(str(path), schema, options=options) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+        return Path(path)
     
     def export_to_csv(self, documents: List[Dict]) -> str:
-        df = pd.DataFrame(documents)
-        columns_map = {
-            'id': 'ID', 'filename': 'Filename', 'file_type': 'Type',
-            'status': 'Status', 'confidence': 'Confidence',
-            'document_type': 'Document Type', 'created_at': 'Upload Date',
-            'word_count': 'Word Count', 'extracted_text': 'Extracted Text'
-        }
-        available_cols = [col for col in columns_map.keys() if col in df.columns]
-        df_export = df[available_cols].copy()
-        df_export.columns = [columns_map[col] for col in available_cols]
-        return df_export.to_csv(index=False)
+        include_text = bool(documents) and 'extracted_text' in documents[0]
+        return b"".join(self.iter_csv(documents, include_text)).decode('utf-8')
 
 _export_service = None
 
@@ -0,0 +1,80 @@
+"""
+Text extraction routing.
+Picks the cheapest adequate path from the triage results: born-digital
+PDFs use their text layer, scanned pages go through Tesseract, and mixed
+PDFs only OCR the pages that have no text layer.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List
+from PIL import Image, ImageSequence
+from app.services.tesseract_ocr_service import get_tesseract_service
+from app.services.triage_service import IMAGE_MIME_TYPES, MULTI_PAGE_IMAGE_TYPES, has_text_layer, read_text_layer
+
+logger = logging.getLogger(__name__)
+
+TEXT_LAYER_CONFIDENCE = 100.0
+PAGE_SEPARATOR = "\n\n"  # between pages in the full text
+
+
+def _result(pages: List[str], confidences: List[float], method: str, page_methods: List[str] = None) -> Dict:
+    full_text = PAGE_SEPARATOR.join(pages)
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+    return {
+        "text": full_text,
+        "pages": pages,
+        "page_confidences": confidences,
+        "page_methods": page_methods or [method] * len(pages),
+        "page_count": len(pages),
+        "confidence": round(avg_confidence, 2),
+        "word_count": len(full_text.split()),
+        "char_count": len(full_text),
+        "method": method
+    }
+
+
+def _extract_pdf(path: Path) -> Dict:
+    pages = read_text_layer(path)
+    missing = [i for i, page_text in enumerate(pages) if not has_text_layer(page_text)]
+    confidences = [TEXT_LAYER_CONFIDENCE] * len(pages)
+    page_methods = ["text_layer"] * len(pages)
+
+    if not missing:
+        return _result(pages, confidences, "text_layer", page_methods)
+
+    # OCR only the pages without a usable text layer
+    ocr_service = get_tesseract_service()
+    for page_index, text, confidence in ocr_service.ocr_pdf_pages(path, [i + 1 for i in missing]):
+        pages[page_index - 1] = text
+        confidences[page_index - 1] = confidence
+        page_methods[page_index - 1] = "tesseract"
+
+    method = "tesseract" if len(missing) == len(pages) else "hybrid"
+    logger.info(f"{path.name}: OCR on {len(missing)}/{len(pages)} pages ({method})")
+    return _result(pages, confidences, method, page_methods)
+
+
+def _extract_image(path: Path, mime_type: str) -> Dict:
+    """OCR an image, one page per frame for multi-page formats, as triage counts them"""
+    ocr_service = get_tesseract_service()
+    pages, confidences = [], []
+    with Image.open(path) as image:
+        frames = ImageSequence.Iterator(image) if mime_type in MULTI_PAGE_IMAGE_TYPES else [image]
+        for frame in frames:
+            text, confidence = ocr_service.extract_text_from_image(frame)
+            pages.append(text)
+            confidences.append(round(confidence, 2))
+    return _result(pages, confidences, "tesseract")
+
+
+def extract_document(path: Path, mime_type: str) -> Dict:
+    """Extract text using the cheapest method that suits the file"""
+    if mime_type == "text/plain":
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return _result([f.read()], [TEXT_LAYER_CONFIDENCE], "plain_text")
+    if mime_type == "application/pdf":
+        return _extract_pdf(path)
+    if mime_type in IMAGE_MIME_TYPES:
+        return _extract_image(path, mime_type)
+    raise ValueError(f"Unsupported file type: {mime_type}")
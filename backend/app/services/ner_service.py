@@ -3,81 +3,219 @@ Named Entity Recognition Service using spaCy
 Extracts: Names, Organizations, Dates, Money, Locations, etc.
 """
 
+import re
 import spacy
-from typing import Dict, List
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Tuple
 import logging
+from app.core.config import settings
+from app.services.entity_extraction import FIELD_VALUE_TYPES, entity_extractor
 
 logger = logging.getLogger(__name__)
 
+# Bump when the post-processing below changes, so stored entities get recomputed
+ENTITY_SCHEMA_VERSION = 4
+
+
+def empty_entities() -> Dict:
+    return {
+        "persons": [],
+        "organizations": [],
+        "dates": [],
+        "money": [],
+        "locations": [],
+        "emails": [],
+        "phone_numbers": [],
+        "fields": {},
+        "all_entities": [],
+        "pattern_scan_complete": True  # False when the pattern scanner hit its time budget
+    }
+
+
+# Pattern scanner types -> entity labels (spaCy's where it has one)
+PATTERN_LABELS = {
+    "email": "EMAIL",
+    "phone": "PHONE",
+    "url": "URL",
+    "money": "MONEY",
+    "date": "DATE",
+    "percentage": "PERCENT",
+    "invoice_number": "INVOICE_NUMBER",
+    "total_amount": "TOTAL_AMOUNT",
+    "due_date": "DUE_DATE",
+}
+FIELD_LABELS = {PATTERN_LABELS[name]: name for name in FIELD_VALUE_TYPES}
+
+
+def merge_pattern_matches(entity_infos: List[Dict], matches) -> List[Dict]:
+    """
+    Add the deterministic scanner's matches to the model's entities, in text order.
+    A match is dropped when the model already found an overlapping entity with the same label.
+    """
+    model_spans = {}
+    for info in entity_infos:
+        starts, ends = model_spans.setdefault(info["label"], ([], []))
+        starts.append(info["start"])
+        ends.append(info["end"])
+    merged = [{**info, "source": "model"} for info in entity_infos]
+    for match in matches:
+        label = PATTERN_LABELS[match.type]
+        # Model entities are in text order: only the last one starting before the match can overlap it
+        starts, ends = model_spans.get(label, ((), ()))
+        i = bisect_left(starts, match.end) - 1
+        if i >= 0 and ends[i] > match.start:
+            continue
+        merged.append({"text": match.text, "label": label, "start": match.start, "end": match.end, "source": "pattern"})
+    merged.sort(key=lambda info: (info["start"], info["end"]))
+    return merged
+
+
+# Preferred window cut points, best first: page/paragraph breaks, line breaks, sentence ends, spaces
+_CUT_SEPARATORS = ("\n\n", "\n", ". ", "? ", "! ", " ")
+_WHITESPACE = re.compile(r"\s")
+
+
+def _cut_point(text: str, lo: int, hi: int) -> int:
+    for separator in _CUT_SEPARATORS:
+        i = text.rfind(separator, lo, hi)
+        if i != -1:
+            return i + len(separator)
+    return hi
+
+
+def text_windows(text: str, max_chars: int = None, overlap: int = None) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Split text into bounded, slightly overlapping windows cut at natural boundaries.
+    Yields (start, end, own_start, own_end): each window owns the entities that start in
+    [own_start, own_end), the owned ranges tile the text, so overlaps never report twice.
+    """
+    max_chars = max_chars or settings.NER_WINDOW_CHARS
+    overlap = min(settings.NER_WINDOW_OVERLAP if overlap is None else overlap, max_chars // 4)
+    start = own_start = 0
+    while len(text) - start > max_chars:
+        end = _cut_point(text, start + max_chars // 2, start + max_chars)
+        # Next window starts `overlap` back, on a word boundary
+        space = _WHITESPACE.search(text, end - overlap, end)
+        next_start = space.end() if space else end - overlap
+        own_end = (next_start + end) // 2
+        yield start, end, own_start, own_end
+        start, own_start = next_start, own_end
+    yield start, len(text), own_start, len(text)
+
+
+# Pipeline components NER does not read from; they are never loaded
+NON_NER_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer", "morphologizer", "senter"]
+
+
+def load_ner_pipeline(model: str):
+    """Load a spaCy pipeline with only the components that entity recognition uses"""
+    nlp = spacy.load(model, exclude=NON_NER_COMPONENTS)
+    # A shared tok2vec only feeds the excluded components unless ner listens to it
+    if "tok2vec" in nlp.pipe_names and not nlp.get_pipe("tok2vec").listening_components:
+        nlp.remove_pipe("tok2vec")
+    return nlp
+
+
 class NERService:
     """Extract named entities from text"""
     
-    def __init__(self):
+    def __init__(self, nlp=None):
+        if nlp is not None:
+            self.nlp = nlp
+            return
         try:
-            self.nlp = spacy.load("en_core_web_sm")
-            logger.info("spaCy NER model loaded successfully")
+            self.nlp = load_ner_pipeline(settings.NER_MODEL)
+            logger.info(f"spaCy NER model loaded successfully ({', '.join(self.nlp.pipe_names)})")
         except Exception as e:
             logger.error(f"Failed to load spaCy model: {e}")
             self.nlp = None
     
+    @property
+    def model_version(self) -> str:
+        """Identifies the model and post-processing that produced a set of entities"""
+        if not self.nlp:
+            return f"none/{ENTITY_SCHEMA_VERSION}"
+        meta = self.nlp.meta
+        return f"{meta.get('lang')}_{meta.get('name')}-{meta.get('version')}/{ENTITY_SCHEMA_VERSION}"
+    
     def extract_entities(self, text: str) -> Dict:
         """
         Extract named entities from text
         Returns: Dictionary with entity types and their values
         """
-        if not self.nlp or not text:
-            return {
-                "persons": [],
-                "organizations": [],
-                "dates": [],
-                "money": [],
-                "locations": [],
-                "emails": [],
-                "phone_numbers": [],
-                "all_entities": []
-            }
-        
-        # Limit text length for performance
-        text = text[:10000]
-        
-        doc = self.nlp(text)
-        
-        entities = {
-            "persons": [],
-            "organizations": [],
-            "dates": [],
-            "money": [],
-            "locations": [],
-            "emails": [],
-            "phone_numbers": [],
-            "all_entities": []
-        }
+        return self.extract_entities_batch([text])[0]
+    
+    def extract_entities_batch(self, texts: Iterable[str], batch_size: int = None,
+                               n_process: int = None) -> List[Dict]:
+        """
+        extract_entities for many texts at once. Every text is cut into bounded windows
+        and all windows stream through one nlp.pipe, so cost is linear in the total length
+        and memory stays bounded per batch. Results are in input order with global offsets.
+        """
+        texts = list(texts)
+        found = [[] for _ in texts]
+        if self.nlp:
+            windows = (
+                (text[start:end], (i, start, own_start, own_end))
+                for i, text in enumerate(texts) if text
+                for start, end, own_start, own_end in text_windows(text)
+            )
+            docs = self.nlp.pipe(windows, as_tuples=True,
+                                 batch_size=batch_size or settings.NER_BATCH_SIZE,
+                                 n_process=n_process or settings.NER_N_PROCESS)
+            for doc, (i, offset, own_start, own_end) in docs:
+                for ent in doc.ents:
+                    start = offset + ent.start_char
+                    if own_start <= start < own_end:
+                        found[i].append({
+                            "text": ent.text,
+                            "label": ent.label_,
+                            "start": start,
+                            "end": offset + ent.end_char
+                        })
+        # Emails, phone numbers, amounts and invoice fields from the pattern scanner
+        scan_complete = [True] * len(texts)
+        for i, text in enumerate(texts):
+            if text:
+                scan = entity_extractor.scan(text)
+                if not scan.complete:
+                    logger.warning(f"Pattern scan stopped at its time budget after {len(scan.matches)} matches "
+                                   f"in a {len(text)}-character text")
+                scan_complete[i] = scan.complete
+                found[i] = merge_pattern_matches(found[i], scan.matches)
+        results = [self._summarize(entity_infos) for entity_infos in found]
+        for entities, complete in zip(results, scan_complete):
+            entities["pattern_scan_complete"] = complete
+        return results
+    
+    def _summarize(self, entity_infos: List[Dict]) -> Dict:
+        entities = empty_entities()
         
-        # Extract entities by type
-        for ent in doc.ents:
-            entity_info = {
-                "text": ent.text,
-                "label": ent.label_,
-                "start": ent.start_char,
-                "end": ent.end_char
-            }
-            
+        # Group entities by type
+        for entity_info in entity_infos:
             entities["all_entities"].append(entity_info)
             
-            if ent.label_ == "PERSON":
-                entities["persons"].append(ent.text)
-            elif ent.label_ == "ORG":
-                entities["organizations"].append(ent.text)
-            elif ent.label_ in ["DATE", "TIME"]:
-                entities["dates"].append(ent.text)
-            elif ent.label_ == "MONEY":
-                entities["money"].append(ent.text)
-            elif ent.label_ in ["GPE", "LOC"]:
-                entities["locations"].append(ent.text)
+            label, text = entity_info["label"], entity_info["text"]
+            if label == "PERSON":
+                entities["persons"].append(text)
+            elif label == "ORG":
+                entities["organizations"].append(text)
+            elif label in ["DATE", "TIME"]:
+                entities["dates"].append(text)
+            elif label == "MONEY":
+                entities["money"].append(text)
+            elif label in ["GPE", "LOC"]:
+                entities["locations"].append(text)
+            elif label == "EMAIL":
+                entities["emails"].append(text)
+            elif label == "PHONE":
+                entities["phone_numbers"].append(text)
+            elif label in FIELD_LABELS:
+                entities["fields"].setdefault(FIELD_LABELS[label], text)
         
         # Remove duplicates and limit results
-        for key in ["persons", "organizations", "dates", "money", "locations"]:
-            entities[key] = list(set(entities[key]))[:10]
+        for key in ["persons", "organizations", "dates", "money", "locations", "emails", "phone_numbers"]:
+            entities[key] = list(dict.fromkeys(entities[key]))[:10]
         
         return entities
 
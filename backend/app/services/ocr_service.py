@@ -2,6 +2,8 @@ from pathlib import Path
 import PyPDF2
 from typing import NamedTuple, Dict, Any
 from enum import Enum
+from app.services.triage_service import sniff_mime
+from app.core.text_codec import get_text_codec
 
 class DocumentType(Enum):
     PDF = "pdf"
@@ -31,15 +33,16 @@ class OCRService:
                     document_type=DocumentType.UNKNOWN
                 )
             
+            # Route on the real content type, not the file suffix
+            mime_type = sniff_mime(path)
+            
             # Extract text from PDF
-            if path.suffix.lower() == '.pdf':
+            if mime_type == 'application/pdf':
                 text = self._extract_pdf_text(path)
                 word_count = len(text.split())
                 
-                # Save extracted text to a .txt file
-                txt_path = path.with_suffix('.txt')
-                with open(txt_path, 'w', encoding='utf-8') as f:
-                    f.write(text)
+                # Save extracted text next to the file, compressed per settings
+                txt_path = get_text_codec().write_text_file(path.with_suffix('.txt'), text)
                 
                 return OCRResult(
                     success=True,
@@ -55,7 +58,7 @@ class OCRService:
                 )
             
             # For text files, just read them
-            elif path.suffix.lower() == '.txt':
+            elif mime_type == 'text/plain':
                 with open(path, 'r', encoding='utf-8') as f:
                     text = f.read()
                 
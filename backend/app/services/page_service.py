@@ -0,0 +1,141 @@
+"""
+Per-page text storage and range reads.
+Pages are stored with their offset in the full text, so page ranges and
+character ranges are answered from the few rows that overlap them.
+Documents processed before pages existed fall back to the text column.
+"""
+
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.document import Document
+from app.models.document_page import DocumentPage
+from app.services.extraction_service import PAGE_SEPARATOR
+
+
+def build_pages(document_id: int, pages: List[str], confidences: List[float],
+                methods: Optional[List[str]] = None) -> List[DocumentPage]:
+    rows, offset = [], 0
+    for index, text in enumerate(pages):
+        rows.append(DocumentPage(
+            document_id=document_id,
+            page_number=index + 1,
+            text=text,
+            confidence=confidences[index] if index < len(confidences) else None,
+            method=methods[index] if methods else None,
+            char_offset=offset,
+            char_count=len(text),
+            word_count=len(text.split()),
+        ))
+        offset += len(text) + len(PAGE_SEPARATOR)
+    return rows
+
+
+def store_pages(db: Session, document_id: int, result: Dict):
+    """Replace a document's pages with an extraction result. Caller commits."""
+    delete_pages(db, document_id)
+    db.add_all(build_pages(document_id, result["pages"], result["page_confidences"], result.get("page_methods")))
+
+
+def delete_pages(db: Session, document_id: int):
+    db.query(DocumentPage).filter(DocumentPage.document_id == document_id).delete(synchronize_session=False)
+
+
+def page_source_id(db: Session, document: Document) -> Optional[int]:
+    """
+    Document whose pages to read - its own, or for a duplicate made before reused
+    pages were copied (see backfill_text_stats.py), those of its source.
+    """
+    for candidate in (document.id, document.duplicate_of):
+        if candidate is not None and db.query(DocumentPage.id).filter(DocumentPage.document_id == candidate).first():
+            return candidate
+    return None
+
+
+def count_pages(db: Session, document: Document) -> int:
+    source_id = page_source_id(db, document)
+    if source_id is None:
+        return 1 if total_chars(db, document) else 0
+    return db.query(func.count(DocumentPage.id)).filter(DocumentPage.document_id == source_id).scalar()
+
+
+def serialize_page(page) -> Dict:
+    return {
+        "page_number": page.page_number,
+        "text": page.text or "",
+        "confidence": page.confidence,
+        "method": page.method,
+        "char_offset": page.char_offset,
+        "char_count": page.char_count,
+        "word_count": page.word_count,
+    }
+
+
+def _load_text(db: Session, document: Document) -> Optional[str]:
+    return db.query(Document.extracted_text).filter(Document.id == document.id).scalar()
+
+
+def _legacy_page(db: Session, document: Document) -> Optional[DocumentPage]:
+    text = _load_text(db, document)
+    if not text:
+        return None
+    return DocumentPage(document_id=document.id, page_number=1, text=text, confidence=document.confidence_score,
+                        method=document.extraction_method, char_offset=0, char_count=len(text),
+                        word_count=len(text.split()))
+
+
+def iter_pages(db: Session, document: Document, start: int = 1, end: Optional[int] = None,
+               batch_size: int = 50) -> Iterator[DocumentPage]:
+    """Pages start..end (inclusive, 1-based), fetched in batches so long documents stream"""
+    source_id = page_source_id(db, document)
+    if source_id is None:
+        page = _legacy_page(db, document) if start <= 1 else None
+        if page is not None:
+            yield page
+        return
+    
+    next_page = start
+    while end is None or next_page <= end:
+        query = db.query(DocumentPage).filter(
+            DocumentPage.document_id == source_id,
+            DocumentPage.page_number >= next_page,
+        )
+        if end is not None:
+            query = query.filter(DocumentPage.page_number <= end)
+        batch = query.order_by(DocumentPage.page_number).limit(batch_size).all()
+        if not batch:
+            return
+        for page in batch:
+            yield page
+        next_page = batch[-1].page_number + 1
+
+
+def get_char_range(db: Session, document: Document, start: int, end: int) -> str:
+    """Characters [start, end) of the document's full text, reading only the overlapping pages"""
+    if end <= start:
+        return ""
+    source_id = page_source_id(db, document)
+    if source_id is None:
+        # Stored compressed, so the slice is taken after loading
+        return (_load_text(db, document) or "")[start:end]
+    
+    # A page "owns" the separator that follows it
+    pages = db.query(DocumentPage.char_offset, DocumentPage.text).filter(
+        DocumentPage.document_id == source_id,
+        DocumentPage.char_offset < end,
+        DocumentPage.char_offset + DocumentPage.char_count + len(PAGE_SEPARATOR) > start,
+    ).order_by(DocumentPage.page_number).all()
+    if not pages:
+        return ""
+    
+    base = pages[0].char_offset
+    covered = "".join((page.text or "") + PAGE_SEPARATOR for page in pages)
+    # Never return the separator after the last page
+    end = min(end, total_chars(db, document))
+    return covered[start - base:max(start, end) - base]
+
+
+def total_chars(db: Session, document: Document) -> int:
+    if document.char_count is not None:
+        return document.char_count
+    return len(_load_text(db, document) or "")
@@ -0,0 +1,144 @@
+"""
+Bulk deletion.
+A bulk delete soft-deletes the matching rows in one transaction so they
+disappear from every listing and count at once; a background purge then
+removes their files, pages and vector index entries in batches.
+"""
+
+import logging
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.text_codec import text_file_candidates
+from app.models.document import Document
+from app.models.document_page import DocumentPage
+from app.models.purge_job import PurgeJob
+from app.services.dedup_service import is_blob_shared
+from app.services.document_query import DocumentFilters, apply_filters
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = 100
+MAX_RECORDED_ERRORS = 50
+
+
+def soft_delete_documents(db: Session, ids: Optional[List[int]] = None,
+                          filters: Optional[DocumentFilters] = None, batch_size: int = 500) -> List[int]:
+    """Mark the matching live documents deleted; the caller commits. Returns their ids."""
+    query = db.query(Document.id)
+    if ids is not None:
+        query = query.filter(Document.id.in_(ids))
+    if filters is not None:
+        query = apply_filters(query, filters)
+    document_ids = [document_id for (document_id,) in query.order_by(Document.id)]
+
+    deleted_at = datetime.utcnow()
+    for start in range(0, len(document_ids), batch_size):
+        chunk = document_ids[start:start + batch_size]
+        # Loaded through the ORM so the counter hooks see each row leave its buckets
+        for document in db.query(Document).filter(Document.id.in_(chunk)):
+            document.deleted_at = deleted_at
+        db.flush()
+    return document_ids
+
+
+def document_files(document: Document) -> Dict[str, List[Path]]:
+    """
+    Every file a document may own, grouped under the stored path they derive from:
+    the upload and its text sidecars, the processed text and its metadata sidecar.
+    """
+    files = {}
+    for path in (document.original_path, document.processed_path):
+        if path:
+            files.setdefault(path, []).extend([Path(path), *text_file_candidates(path)])
+    if document.processed_path:
+        text_path = text_file_candidates(document.processed_path)[0]
+        files[document.processed_path].append(text_path.with_name(text_path.name[:-len(".txt")] + "_metadata.json"))
+    return {path: list(dict.fromkeys(paths)) for path, paths in files.items()}
+
+
+def remove_document_files(db: Session, document: Document) -> int:
+    """
+    Remove the files no other live document still uses; returns how many were removed.
+    Sidecars go only with their stored path, so a duplicate sharing it keeps them all.
+    """
+    removed = 0
+    for stored_path, paths in document_files(document).items():
+        if is_blob_shared(db, stored_path, document.id):
+            continue
+        for path in paths:
+            if path.exists():
+                path.unlink()
+                removed += 1
+    return removed
+
+
+def delete_vectors(document_ids: Iterable[int]):
+    """Drop vector index entries - only when the RAG service is loaded in this process"""
+    rag_module = sys.modules.get("app.services.rag_service")
+    if rag_module is not None:
+        rag_module.rag_service.delete_documents(list(document_ids))
+
+
+def _record_error(job: PurgeJob, document_id: int, error: Exception):
+    logger.warning(f"Purge of document {document_id} failed: {error}")
+    errors = list(job.errors or [])
+    if len(errors) < MAX_RECORDED_ERRORS:
+        errors.append({"document_id": document_id, "error": str(error)})
+        job.errors = errors
+
+
+def run_purge_job(job_id: str, session_factory: Callable[[], Session], batch_size: int = PURGE_BATCH_SIZE):
+    """
+    Physically remove every soft-deleted document, committing after each batch.
+    Sweeps all soft-deleted rows, not only this job's, so an interrupted purge is finished by the next one.
+    """
+    db = session_factory()
+    try:
+        job = db.get(PurgeJob, job_id)
+        if job is None:
+            return
+        pending = db.query(Document).execution_options(include_deleted=True).filter(Document.deleted_at.isnot(None))
+        job.status = "running"
+        job.total = pending.with_entities(func.count(Document.id)).scalar() or 0
+        job.purged = job.files_removed = 0
+        db.commit()
+
+        while True:
+            batch = pending.order_by(Document.id).limit(batch_size).all()
+            if not batch:
+                break
+            document_ids = [document.id for document in batch]
+            for document in batch:
+                try:
+                    job.files_removed += remove_document_files(db, document)
+                except OSError as e:
+                    _record_error(job, document.id, e)
+            try:
+                delete_vectors(document_ids)
+            except Exception as e:
+                _record_error(job, document_ids[0], e)
+
+            db.query(DocumentPage).filter(DocumentPage.document_id.in_(document_ids)).delete(synchronize_session=False)
+            for document in batch:
+                db.delete(document)
+            job.purged += len(batch)
+            db.commit()
+
+        job.status = "completed"
+        job.completed_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        logger.error(f"Purge job {job_id} failed: {e}")
+        db.rollback()
+        job = db.get(PurgeJob, job_id)
+        if job is not None:
+            job.status = "failed"
+            _record_error(job, None, e)
+            job.completed_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
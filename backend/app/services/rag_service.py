@@ -50,6 +50,11 @@ class RAGService:
                 ids=[f"doc_{document_id}_chunk_{i}"]
             )
     
+    def delete_documents(self, document_ids: List[int]):
+        """Remove every chunk of the given documents from the vector store."""
+        if document_ids:
+            self.collection.delete(where={"document_id": {"$in": document_ids}})
+    
     def query_documents(self, query: str, n_results: int = 5) -> List[Dict]:
         """Query documents using natural language."""
         # Generate query embedding
@@ -0,0 +1,158 @@
+"""
+Resumable upload service.
+Each chunk is written to its own file named by byte offset, so chunks can
+be retried or sent out of order. Every attempt streams into its own temp
+file off the event loop and is renamed into place only once complete. Finalizing streams the chunks once, in
+offset order, into the blob store while hashing them.
+"""
+
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, List, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.services.blob_store import get_blob_store
+from app.services.upload_service import StoredUpload
+
+
+class ChunkError(ValueError):
+    """Raised when a chunk or a finalize request doesn't fit the session"""
+
+
+class ResumableUploadService:
+    def __init__(self, root: str = None):
+        self.root = Path(root or settings.RESUMABLE_FOLDER or os.path.join(settings.UPLOAD_FOLDER, "resumable"))
+        self.copy_buffer = settings.UPLOAD_CHUNK_SIZE
+
+    def session_dir(self, session_id: str) -> Path:
+        return self.root / session_id
+
+    def create(self, session_id: str):
+        self.session_dir(session_id).mkdir(parents=True, exist_ok=True)
+
+    def list_chunks(self, session_id: str) -> List[Tuple[int, int]]:
+        """(offset, size) of every stored chunk, sorted by offset"""
+        session_dir = self.session_dir(session_id)
+        if not session_dir.exists():
+            return []
+        chunks = []
+        for path in session_dir.glob("*.chunk"):
+            chunks.append((int(path.stem), path.stat().st_size))
+        return sorted(chunks)
+
+    def received_ranges(self, session_id: str) -> List[List[int]]:
+        """Merge stored chunks into contiguous [start, end) ranges"""
+        ranges = []
+        for offset, size in self.list_chunks(session_id):
+            end = offset + size
+            if ranges and offset <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                ranges.append([offset, end])
+        return ranges
+
+    def received_bytes(self, session_id: str) -> int:
+        return sum(end - start for start, end in self.received_ranges(session_id))
+
+    async def write_chunk(self, session_id: str, offset: int, total_size: int, body: AsyncIterator[bytes]) -> int:
+        """
+        Stream one request body to disk as the chunk starting at offset.
+        The chunk only becomes visible once it has been fully received; concurrent
+        attempts at the same offset each write their own temp file and the last rename wins.
+        """
+        self._check_range(offset, 1, total_size)
+        session_dir = self.session_dir(session_id)
+        part_path = session_dir / f"{offset:020d}.{uuid.uuid4().hex}.part"
+        buffer = await run_in_threadpool(self._open_part, part_path)
+        size = 0
+        try:
+            async for data in body:
+                size += len(data)
+                if size > settings.MAX_CHUNK_SIZE:
+                    raise ChunkError(f"Chunk exceeds {settings.MAX_CHUNK_SIZE} bytes")
+                self._check_range(offset, size, total_size)
+                await run_in_threadpool(buffer.write, data)
+            if size == 0:
+                raise ChunkError("Empty chunk")
+            await run_in_threadpool(self._commit_part, buffer, part_path, offset, size, total_size)
+        finally:
+            await run_in_threadpool(self._discard_part, buffer, part_path)
+        return size
+
+    def _check_range(self, offset: int, size: int, total_size: int):
+        if offset < 0 or offset >= total_size:
+            raise ChunkError(f"Offset {offset} is outside the upload (0-{total_size - 1})")
+        if offset + size > total_size:
+            raise ChunkError("Chunk extends past the declared upload size")
+
+    def _open_part(self, part_path: Path) -> BinaryIO:
+        part_path.parent.mkdir(parents=True, exist_ok=True)
+        return open(part_path, "wb")
+
+    def _commit_part(self, buffer: BinaryIO, part_path: Path, offset: int, size: int, total_size: int):
+        """Make the finished temp file durable, re-check where it goes, then rename it into place"""
+        buffer.flush()
+        os.fsync(buffer.fileno())
+        buffer.close()
+        self._check_range(offset, size, total_size)
+        os.replace(part_path, part_path.parent / f"{offset:020d}.chunk")
+
+    def _discard_part(self, buffer: BinaryIO, part_path: Path):
+        buffer.close()
+        if part_path.exists():
+            os.remove(part_path)
+
+    def assemble(self, session_id: str, total_size: int, extension: str = "",
+                 expected_sha256: str = None) -> Tuple[StoredUpload, bool]:
+        """
+        Concatenate the chunks into the blob store in one pass.
+        Overlapping retries are trimmed; gaps are rejected.
+        """
+        chunks = self.list_chunks(session_id)
+        blob_store = get_blob_store()
+        staging_path = blob_store.staging_path()
+        digest = hashlib.sha256()
+        position = 0
+
+        try:
+            with open(staging_path, "wb") as out:
+                for offset, size in chunks:
+                    end = offset + size
+                    if end <= position:
+                        continue
+                    if offset > position:
+                        raise ChunkError(f"Missing bytes {position}-{offset - 1}")
+                    with open(self.session_dir(session_id) / f"{offset:020d}.chunk", "rb") as chunk:
+                        chunk.seek(position - offset)
+                        while True:
+                            data = chunk.read(self.copy_buffer)
+                            if not data:
+                                break
+                            digest.update(data)
+                            out.write(data)
+                    position = end
+            if position != total_size:
+                raise ChunkError(f"Missing bytes {position}-{total_size - 1}")
+            if expected_sha256 and digest.hexdigest() != expected_sha256.lower():
+                raise ChunkError("Assembled upload does not match the expected SHA-256")
+        except BaseException:
+            if staging_path.exists():
+                os.remove(staging_path)
+            raise
+
+        return blob_store.store_file(str(staging_path), digest.hexdigest(), total_size, extension)
+
+    def discard(self, session_id: str):
+        shutil.rmtree(self.session_dir(session_id), ignore_errors=True)
+
+
+_resumable_upload_service = None
+
+def get_resumable_upload_service():
+    global _resumable_upload_service
+    if _resumable_upload_service is None:
+        _resumable_upload_service = ResumableUploadService()
+    return _resumable_upload_service
@@ -7,7 +7,7 @@ from PIL import Image
 from pdf2image import convert_from_path
 from pathlib import Path
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +63,19 @@ class TesseractOCRService:
             logger.error(f"PDF OCR error: {e}")
             raise
     
+    def ocr_pdf_pages(self, pdf_path: Path, page_numbers: List[int], dpi: int = 300) -> Iterator[Tuple[int, str, float]]:
+        """
+        OCR selected pages (1-based), rasterizing one page at a time
+        so only a single 300 DPI bitmap is held in memory.
+        """
+        for page_number in page_numbers:
+            images = convert_from_path(str(pdf_path), dpi=dpi, first_page=page_number, last_page=page_number)
+            if not images:
+                yield page_number, "", 0.0
+                continue
+            text, confidence = self.extract_text_from_image(images[0])
+            yield page_number, text, round(confidence, 2)
+    
     def process_document(self, file_path: Path) -> Dict:
         """Process any document"""
         if file_path.suffix.lower() == '.pdf':
@@ -0,0 +1,166 @@
+"""
+Upload-time document triage.
+Cheap checks that run before any OCR: real MIME type from magic bytes,
+page count, encryption/corruption, and how many pages already carry an
+extractable text layer.
+"""
+
+import logging
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+import PyPDF2
+from PIL import Image
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (magic prefix, mime type) - checked in order
+MAGIC_SIGNATURES = [
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+    (b"BM", "image/bmp"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"PK\x03\x04", "application/zip"),
+]
+
+IMAGE_MIME_TYPES = {"image/png", "image/jpeg", "image/tiff", "image/bmp", "image/gif"}
+# Image formats whose frames are pages; other formats' extra frames (GIF animation) are not
+MULTI_PAGE_IMAGE_TYPES = {"image/tiff"}
+SUPPORTED_MIME_TYPES = IMAGE_MIME_TYPES | {"application/pdf", "text/plain"}
+
+
+class TriageResult(NamedTuple):
+    mime_type: str
+    page_count: int
+    is_encrypted: bool
+    status: str  # ok, corrupt, encrypted, unsupported
+    text_layer_ratio: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+def sniff_mime(path: Path) -> str:
+    """Identify a file from its leading bytes rather than its name"""
+    with open(path, "rb") as f:
+        head = f.read(4096)
+    # PDFs may carry a little junk before the header
+    if b"%PDF-" in head[:1024]:
+        return "application/pdf"
+    for magic, mime_type in MAGIC_SIGNATURES:
+        if head.startswith(magic):
+            return mime_type
+    try:
+        head.decode("utf-8")
+        return "text/plain"
+    except UnicodeDecodeError:
+        # A multi-byte character may straddle the read boundary
+        try:
+            head[:-3].decode("utf-8")
+            return "text/plain"
+        except UnicodeDecodeError:
+            return "application/octet-stream"
+
+
+def has_text_layer(page_text: Optional[str]) -> bool:
+    return bool(page_text) and len(page_text.strip()) >= settings.TEXT_LAYER_MIN_CHARS
+
+
+def open_pdf(path: Path) -> PyPDF2.PdfReader:
+    """Open a PDF, unlocking it if it only has an owner password"""
+    reader = PyPDF2.PdfReader(str(path), strict=False)
+    if reader.is_encrypted and not reader.decrypt(""):
+        raise PermissionError("PDF is password protected")
+    return reader
+
+
+def read_text_layer(path: Path) -> List[str]:
+    """Text layer of every page, empty string where a page has none"""
+    reader = open_pdf(path)
+    pages = []
+    for page in reader.pages:
+        try:
+            pages.append(page.extract_text() or "")
+        except Exception as e:
+            logger.warning(f"Text layer extraction failed on {path.name}: {e}")
+            pages.append("")
+    return pages
+
+
+def _sample_pages(page_count: int, sample_size: int) -> List[int]:
+    """Evenly spaced page indexes, so long documents are triaged in bounded time"""
+    if page_count <= sample_size:
+        return list(range(page_count))
+    step = page_count / sample_size
+    return sorted({int(i * step) for i in range(sample_size)})
+
+
+def _triage_pdf(path: Path) -> TriageResult:
+    try:
+        reader = PyPDF2.PdfReader(str(path), strict=False)
+    except Exception as e:
+        return TriageResult("application/pdf", 0, False, "corrupt", 0.0, str(e))
+
+    is_encrypted = reader.is_encrypted
+    if is_encrypted:
+        try:
+            unlocked = reader.decrypt("")
+        except Exception as e:
+            return TriageResult("application/pdf", 0, True, "encrypted", 0.0, str(e))
+        if not unlocked:
+            return TriageResult("application/pdf", 0, True, "encrypted", 0.0, "PDF is password protected")
+
+    try:
+        page_count = len(reader.pages)
+        if page_count == 0:
+            return TriageResult("application/pdf", 0, is_encrypted, "corrupt", 0.0, "PDF has no pages")
+        sample = _sample_pages(page_count, settings.TRIAGE_SAMPLE_PAGES)
+        with_text = sum(1 for i in sample if has_text_layer(reader.pages[i].extract_text()))
+    except Exception as e:
+        return TriageResult("application/pdf", 0, is_encrypted, "corrupt", 0.0, str(e))
+
+    return TriageResult("application/pdf", page_count, is_encrypted, "ok", round(with_text / len(sample), 3))
+
+
+def _triage_image(path: Path, mime_type: str) -> TriageResult:
+    try:
+        with Image.open(path) as image:
+            page_count = getattr(image, "n_frames", 1) if mime_type in MULTI_PAGE_IMAGE_TYPES else 1
+            image.verify()
+    except Exception as e:
+        return TriageResult(mime_type, 0, False, "corrupt", 0.0, str(e))
+    return TriageResult(mime_type, page_count, False, "ok", 0.0)
+
+
+def triage_file(path: str) -> TriageResult:
+    """Classify a stored upload. Never raises - problems are reported in the result."""
+    path = Path(path)
+    try:
+        mime_type = sniff_mime(path)
+    except OSError as e:
+        return TriageResult("application/octet-stream", 0, False, "corrupt", 0.0, str(e))
+
+    if mime_type == "application/pdf":
+        return _triage_pdf(path)
+    if mime_type in IMAGE_MIME_TYPES:
+        return _triage_image(path, mime_type)
+    if mime_type == "text/plain":
+        return TriageResult(mime_type, 1, False, "ok", 1.0)
+    return TriageResult(mime_type, 0, False, "unsupported", 0.0, f"Unsupported file type: {mime_type}")
+
+
+def apply_triage(document, triage: TriageResult):
+    """Record triage on a Document; files that can't be processed fail immediately"""
+    document.mime_type = triage.mime_type
+    document.page_count = triage.page_count
+    document.is_encrypted = triage.is_encrypted
+    document.triage_status = triage.status
+    document.text_layer_ratio = triage.text_layer_ratio
+    if not triage.ok and document.status != "completed":
+        document.status = "failed"
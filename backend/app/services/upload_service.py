@@ -0,0 +1,117 @@
+"""
+Upload storage service.
+Copies uploaded files to disk in fixed-size chunks so memory stays flat,
+enforcing the size limit and hashing the content in the same pass.
+"""
+
+import hashlib
+import os
+import zipfile
+from datetime import datetime
+from functools import partial
+from typing import BinaryIO, Callable, ContextManager, Dict, Iterator, NamedTuple, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+class StoredUpload(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+
+
+class UploadService:
+    def __init__(self, chunk_size: int = None, max_size: int = None):
+        self.chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+        self.max_size = max_size or settings.MAX_UPLOAD_SIZE
+
+    def save_stream(self, source: BinaryIO, dest_path: str, max_size: int = None) -> StoredUpload:
+        """
+        Stream source into dest_path chunk by chunk.
+        Writes to a .part file first and only moves it into place once the
+        whole stream fits under the size limit.
+        """
+        limit = max_size if max_size is not None else self.max_size
+        part_path = f"{dest_path}.part"
+        digest = hashlib.sha256()
+        size = 0
+
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        try:
+            with open(part_path, "wb") as buffer:
+                while True:
+                    chunk = source.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if limit and size > limit:
+                        raise UploadTooLargeError(f"Upload exceeds {limit} bytes")
+                    digest.update(chunk)
+                    buffer.write(chunk)
+            os.replace(part_path, dest_path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+        return StoredUpload(path=dest_path, size=size, sha256=digest.hexdigest())
+
+
+def iter_zip_entries(source: BinaryIO) -> Iterator[Tuple[str, Callable[[], ContextManager[BinaryIO]]]]:
+    """
+    Yield (filename, open_entry) for each file in a ZIP archive.
+    Entries are opened by the caller, so a broken one fails on its own, and
+    decompressed lazily as they are read - nothing is extracted to disk.
+    """
+    with zipfile.ZipFile(source) as archive:
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or not name or name.startswith(".") or info.filename.startswith("__MACOSX/"):
+                continue
+            yield name, partial(archive.open, info)
+
+
+def build_document(db: Session, original_filename: str, stored: StoredUpload,
+                   duplicates: Dict[str, "Document"] = None, triage=None) -> Tuple["Document", bool]:
+    """
+    Create (but don't add) the Document row for a stored upload.
+    Returns the document and whether it reused an earlier document's results.
+    Batch callers pass `duplicates` from find_completed_duplicates to skip the per-file lookup.
+    """
+    from app.models.document import Document
+    from app.services.dedup_service import reuse_processed_results, copy_processed_results
+    from app.services.triage_service import apply_triage
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    document = Document(
+        filename=f"{timestamp}_{original_filename}",
+        file_type=os.path.splitext(original_filename)[1].replace(".", ""),
+        file_size=stored.size,
+        status="uploaded",
+        original_path=stored.path,
+        content_hash=stored.sha256
+    )
+    # Identical content that was already processed needs no OCR/NER run
+    if duplicates is None:
+        deduplicated = reuse_processed_results(db, document)
+    else:
+        source = duplicates.get(stored.sha256)
+        deduplicated = source is not None
+        if deduplicated:
+            copy_processed_results(document, source)
+    if triage is not None:
+        apply_triage(document, triage)
+    return document, deduplicated
+
+
+_upload_service = None
+
+def get_upload_service():
+    global _upload_service
+    if _upload_service is None:
+        _upload_service = UploadService()
+    return _upload_service
@@ -8,7 +8,10 @@ from app.core.celery_app import celery_app
 from app.services.ocr_service import ocr_service
 from app.models.database import SessionLocal
 from app.models.document import Document
+from app.services import event_bus
+from app.services.event_bus import publish_event
 import os
+import time
 
 class CallbackTask(Task):
     """Base task with callbacks"""
@@ -30,6 +33,7 @@ def process_document_task(self, document_id: int, file_path: str):
         file_path: Path to the uploaded file
     """
     db = SessionLocal()
+    document = None
     
     try:
         # Get document from database
@@ -40,16 +44,24 @@ def process_document_task(self, document_id: int, file_path: str):
         # Update status to processing
         document.status = "processing"
         db.commit()
+        publish_event(event_bus.PROCESSING, document_id, task_id=self.request.id)
         
         # Extract text using OCR service
+        publish_event(event_bus.PROGRESS, document_id, stage="extracting_text")
+        started = time.perf_counter()
         result = ocr_service.process_document(file_path)
+        extract_seconds = round(time.perf_counter() - started, 3)
         
-        # Update document with results
-        document.extracted_text = result["text"]
-        document.status = "completed" if result["success"] else "failed"
+        # Update document with results; text statistics are stored so reads never recount them
+        document.extracted_text = result.text
+        document.status = "completed" if result.success else "failed"
+        document.confidence_score = result.confidence
+        document.word_count = len(result.text.split())
+        document.char_count = len(result.text)
         
         # Simple document classification based on keywords
-        text_lower = result["text"].lower()
+        publish_event(event_bus.PROGRESS, document_id, stage="classifying")
+        text_lower = result.text.lower()
         if "invoice" in text_lower or "total amount" in text_lower:
             document.document_type = "invoice"
         elif "contract" in text_lower or "agreement" in text_lower:
@@ -59,12 +71,17 @@ def process_document_task(self, document_id: int, file_path: str):
         else:
             document.document_type = "other"
         
+        total_seconds = round(time.perf_counter() - started, 3)
+        document.stage_durations = {"extract": extract_seconds, "classify": round(total_seconds - extract_seconds, 3)}
+        document.processing_time = total_seconds
         db.commit()
+        publish_event(event_bus.COMPLETED if result.success else event_bus.FAILED, document_id,
+                      document_type=document.document_type)
         
         return {
             "document_id": document_id,
             "status": document.status,
-            "text_length": len(result["text"]),
+            "text_length": len(result.text),
             "document_type": document.document_type
         }
         
@@ -73,6 +90,7 @@ def process_document_task(self, document_id: int, file_path: str):
         if document:
             document.status = "failed"
             db.commit()
+        publish_event(event_bus.FAILED, document_id, reason=str(e), retrying=True)
         
         # Retry the task
         raise self.retry(exc=e, countdown=60)
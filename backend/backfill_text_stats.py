@@ -0,0 +1,105 @@
+"""
+Fill word_count/char_count and page_count for documents processed before
+those were stored. New documents get them at processing time; this only
+touches rows where they are NULL (or, for page_count, 0).
+
+Page counts come from the stored page rows, else from the original file,
+else 1 for a legacy document with text. Duplicates that still read their
+source's pages get their own copy, so they survive the source's deletion.
+
+Usage: python backfill_text_stats.py
+"""
+
+import os
+from sqlalchemy import or_
+from sqlalchemy.orm import undefer
+from app.db.session import SessionLocal
+from app.db.migrations import run_migrations
+from app.models.document import Document
+from app.models.document_page import DocumentPage, copy_pages
+from app.services.page_service import count_pages, page_source_id
+from app.services.triage_service import triage_file
+
+BATCH_SIZE = 200
+
+
+def backfill():
+    run_migrations()
+    db = SessionLocal()
+    updated = 0
+    try:
+        while True:
+            # ORM updates, so revisions and the list version move and cached responses refresh
+            batch = db.query(Document).options(undefer(Document.extracted_text)).filter(
+                Document.word_count.is_(None), Document.extracted_text.isnot(None)
+            ).limit(BATCH_SIZE).all()
+            if not batch:
+                break
+            for document in batch:
+                document.word_count = len(document.extracted_text.split())
+                document.char_count = len(document.extracted_text)
+            db.commit()
+            db.expunge_all()
+            updated += len(batch)
+            print(f"  {updated} documents updated")
+    finally:
+        db.close()
+    print(f"✅ Backfilled text statistics for {updated} documents")
+    backfill_duplicate_pages()
+    backfill_page_counts()
+
+
+def backfill_duplicate_pages():
+    db = SessionLocal()
+    copied = 0
+    try:
+        own_pages = db.query(DocumentPage.id).filter(DocumentPage.document_id == Document.id).exists()
+        duplicates = db.query(Document.id, Document.duplicate_of).filter(
+            Document.duplicate_of.isnot(None), ~own_pages
+        ).all()
+        for document_id, source_id in duplicates:
+            if copy_pages(db.connection(), document_id, source_id):
+                copied += 1
+                if copied % BATCH_SIZE == 0:
+                    db.commit()
+        db.commit()
+    finally:
+        db.close()
+    print(f"✅ Copied reused pages for {copied} duplicates")
+
+
+def page_count_of(db, document: Document) -> int:
+    if page_source_id(db, document) is None and document.original_path and os.path.exists(document.original_path):
+        page_count = triage_file(document.original_path).page_count
+        if page_count:
+            return page_count
+    return count_pages(db, document)
+
+
+def backfill_page_counts():
+    db = SessionLocal()
+    updated, last_id = 0, 0
+    try:
+        while True:
+            # Keyset by id: documents with nothing to count stay at 0 and must not be picked up again
+            batch = db.query(Document).filter(
+                or_(Document.page_count.is_(None), Document.page_count == 0), Document.id > last_id
+            ).order_by(Document.id).limit(BATCH_SIZE).all()
+            if not batch:
+                break
+            for document in batch:
+                page_count = page_count_of(db, document)
+                if page_count:
+                    document.page_count = page_count
+                    updated += 1
+            last_id = batch[-1].id
+            db.commit()
+            db.expunge_all()
+            print(f"  {updated} page counts filled")
+    finally:
+        db.close()
+    print(f"✅ Backfilled page counts for {updated} documents")
+
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,96 @@
+"""
+Compressed text storage maintenance.
+
+  python compress_text.py backfill     Compress stored text written before compression was enabled
+                                       (document text, page text and .txt sidecars). Safe to re-run.
+  python compress_text.py train        Train a shared dictionary from stored text and print its id;
+                                       set TEXT_COMPRESSION_DICT_ID to use it for new values.
+"""
+
+import argparse
+import os
+from pathlib import Path
+from sqlalchemy import select, update, LargeBinary, type_coerce
+from app.core.config import settings
+from app.core.text_codec import get_text_codec, is_compressed, read_text_file
+from app.db.session import SessionLocal, engine
+from app.db.migrations import run_migrations
+from app.models.document import Document
+from app.models.document_page import DocumentPage
+
+
+def _compress_column(table, column_name: str, batch_size: int) -> int:
+    """Rewrite plain values of a CompressedText column; compressed ones are skipped"""
+    codec = get_text_codec()
+    column = table.c[column_name]
+    raw_column = type_coerce(column, LargeBinary)
+    rewritten, last_id = 0, 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, raw_column).where(table.c.id > last_id, column.isnot(None))
+                .order_by(table.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                return rewritten
+            for row_id, raw in rows:
+                value = raw.encode("utf-8") if isinstance(raw, str) else bytes(raw)
+                if is_compressed(value) or len(value) < codec.min_bytes:
+                    continue
+                # Core update: no ORM hooks, so revisions and ETags stay put - the text is unchanged
+                conn.execute(update(table).where(table.c.id == row_id).values({column_name: value.decode("utf-8")}))
+                rewritten += 1
+            last_id = rows[-1][0]
+        print(f"  {table.name}.{column_name}: {rewritten} values compressed (through id {last_id})")
+
+
+def _compress_sidecars() -> int:
+    """Replace plain .txt sidecars under PROCESSED_FOLDER with compressed ones and repoint documents"""
+    codec = get_text_codec()
+    if codec.codec == "none" or not os.path.isdir(settings.PROCESSED_FOLDER):
+        return 0
+    converted = 0
+    for txt_path in Path(settings.PROCESSED_FOLDER).glob("*.txt"):
+        new_path = codec.write_text_file(txt_path, read_text_file(txt_path))
+        with engine.begin() as conn:
+            conn.execute(update(Document.__table__).where(Document.__table__.c.processed_path == str(txt_path))
+                         .values(processed_path=str(new_path)))
+        txt_path.unlink()
+        converted += 1
+    return converted
+
+
+def backfill(batch_size: int):
+    run_migrations()
+    documents = _compress_column(Document.__table__, "extracted_text", batch_size)
+    pages = _compress_column(DocumentPage.__table__, "text", batch_size)
+    files = _compress_sidecars()
+    print(f"✅ Compressed {documents} document texts, {pages} page texts, {files} sidecar files")
+
+
+def train(samples: int, size: int):
+    db = SessionLocal()
+    try:
+        texts = [text for (text,) in db.query(Document.extracted_text)
+                 .filter(Document.extracted_text.isnot(None)).order_by(Document.id.desc()).limit(samples)]
+    finally:
+        db.close()
+    dict_id = get_text_codec().train_dictionary(texts, size)
+    print(f"✅ Trained {get_text_codec().codec} dictionary from {len(texts)} documents")
+    print(f"   Set TEXT_COMPRESSION_DICT_ID={dict_id} to compress new text with it")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compressed text storage maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = commands.add_parser("backfill")
+    backfill_parser.add_argument("--batch-size", type=int, default=200)
+    train_parser = commands.add_parser("train")
+    train_parser.add_argument("--samples", type=int, default=1000)
+    train_parser.add_argument("--size", type=int, default=110 * 1024)
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        backfill(args.batch_size)
+    else:
+        train(args.samples, args.size)
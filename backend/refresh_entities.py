@@ -0,0 +1,35 @@
+"""
+Re-run NER for documents whose stored entities are missing or were produced
+by a different model version. Texts go through spaCy in batches (nlp.pipe).
+Rewriting a document's entities also rebuilds its rows in the entity index,
+so `--all` fills the index for documents processed before it existed.
+
+Usage: python refresh_entities.py [--all] [--batch-size 200] [--n-process 1]
+"""
+
+import argparse
+from app.db.session import SessionLocal
+from app.db.migrations import run_migrations
+from app.services.entity_service import refresh_stale_entities
+from app.services.ner_service import get_ner_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="recompute every completed document")
+    parser.add_argument("--batch-size", type=int, default=200, help="documents per database batch")
+    parser.add_argument("--n-process", type=int, default=None, help="spaCy worker processes")
+    args = parser.parse_args()
+
+    run_migrations()
+    print(f"NER model: {get_ner_service().model_version}")
+    db = SessionLocal()
+    try:
+        updated = refresh_stale_entities(db, args.batch_size, args.n_process, refresh_all=args.all)
+    finally:
+        db.close()
+    print(f"✅ Refreshed entities for {updated} documents")
+
+
+if __name__ == "__main__":
+    main()
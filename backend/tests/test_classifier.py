@@ -0,0 +1,71 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.core.config import settings
+from app.services import document_classifier
+
+
+@pytest.fixture
+def small_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CLASSIFIER_FOLDER", str(tmp_path))
+    monkeypatch.setattr(document_classifier, "HYPERPARAMETERS", {
+        **document_classifier.HYPERPARAMETERS,
+        "clf": {"n_estimators": 5, "learning_rate": 0.1, "max_depth": 2, "random_state": 42},
+    })
+
+
+def test_missing_artifact_is_trained_once_unless_disabled(small_model, monkeypatch):
+    with pytest.raises(FileNotFoundError):
+        document_classifier.load_pipeline(train_if_missing=False)
+
+    pipeline = document_classifier.load_pipeline()
+    path = document_classifier.artifact_path(document_classifier.artifact_key())
+    assert path.exists() and path.with_suffix(".json").exists()
+
+    def no_training(*args, **kwargs):
+        raise AssertionError("retrained although the artifact exists")
+
+    monkeypatch.setattr(document_classifier, "train_pipeline", no_training)
+    reloaded = document_classifier.load_pipeline()
+    text = ["Invoice number 42, total amount due with tax"]
+    assert list(reloaded.predict_proba(text)[0]) == list(pipeline.predict_proba(text)[0])
+
+
+def test_concurrent_loads_train_the_missing_artifact_once(small_model, monkeypatch):
+    trainings = []
+    train_pipeline = document_classifier.train_pipeline
+
+    def counted(*args, **kwargs):
+        trainings.append(1)
+        return train_pipeline(*args, **kwargs)
+
+    monkeypatch.setattr(document_classifier, "train_pipeline", counted)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        pipelines = list(pool.map(lambda _: document_classifier.load_pipeline(), range(4)))
+    assert len(trainings) == 1 and all(p is not None for p in pipelines)
+
+
+def test_missing_pinned_artifact_is_an_error(small_model, monkeypatch):
+    monkeypatch.setattr(settings, "CLASSIFIER_ARTIFACT_KEY", "0123456789abcdef")
+    with pytest.raises(FileNotFoundError):
+        document_classifier.load_pipeline()
+
+
+def test_artifact_records_the_parameters_it_was_trained_with(small_model, monkeypatch):
+    overrides = {**document_classifier.HYPERPARAMETERS,
+                 "clf": {"n_estimators": 3, "learning_rate": 0.2, "max_depth": 2, "random_state": 1}}
+    path = document_classifier.train_artifact(hyperparameters=overrides)
+    metadata = json.loads(path.with_suffix(".json").read_text())
+    assert metadata["hyperparameters"]["clf"]["n_estimators"] == 3
+    assert metadata["key"] == document_classifier.artifact_key(hyperparameters=overrides)
+
+    # Served only when pinned
+    monkeypatch.setattr(settings, "CLASSIFIER_ARTIFACT_KEY", metadata["key"])
+    assert document_classifier.load_pipeline().named_steps["clf"].n_estimators == 3
+
+
+def test_key_changes_with_training_data_and_hyperparameters(small_model):
+    key = document_classifier.artifact_key()
+    documents = {**document_classifier.TRAINING_DOCUMENTS, "memo": ["Internal memo to all staff"]}
+    assert document_classifier.artifact_key(documents) != key
+    assert document_classifier.artifact_key(hyperparameters={**document_classifier.HYPERPARAMETERS, "tfidf": {}}) != key
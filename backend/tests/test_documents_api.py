@@ -0,0 +1,451 @@
+"""Test document listing endpoints against a throwaway database"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.core.config import settings
+from app.db.session import get_db
+from app.db.migrations import run_migrations
+from app.services import blob_store
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/test.db", connect_args={"check_same_thread": False})
+    run_migrations(engine)
+    TestingSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = TestingSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(settings, "UPLOAD_FOLDER", str(tmp_path / "uploads"))
+    monkeypatch.setattr(blob_store, "_blob_store", None)
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def upload(client, name, content):
+    response = client.post("/api/v1/upload", files={"file": (name, content, "text/plain")})
+    assert response.status_code == 200
+    return response.json()["document_id"]
+
+
+def test_keyset_pagination_walks_every_document_once(client):
+    """Following next_cursor visits each document exactly once, newest first"""
+    ids = [upload(client, f"doc{i}.txt", f"document number {i}".encode()) for i in range(7)]
+
+    seen = []
+    page = client.get("/api/v1/documents", params={"limit": 3}).json()
+    seen.extend(d["id"] for d in page["documents"])
+    while page["next_cursor"]:
+        page = client.get("/api/v1/documents", params={"limit": 3, "cursor": page["next_cursor"]}).json()
+        seen.extend(d["id"] for d in page["documents"])
+
+    assert seen == sorted(ids, reverse=True)
+    assert page["total"] == 7
+
+
+def test_total_tracks_uploads_and_deletes(client):
+    """The cached total follows inserts and deletes without recounting"""
+    first = upload(client, "a.txt", b"alpha")
+    upload(client, "b.txt", b"beta")
+    assert client.get("/api/v1/documents").json()["total"] == 2
+
+    client.delete(f"/api/v1/documents/{first}")
+    upload(client, "c.txt", b"gamma")
+    assert client.get("/api/v1/documents").json()["total"] == 2
+
+
+def test_sparse_fieldset(client):
+    """fields= returns exactly the requested keys and rejects unknown ones"""
+    upload(client, "a.txt", b"alpha")
+
+    documents = client.get("/api/v1/documents", params={"fields": "id,status,mime_type"}).json()["documents"]
+    assert documents == [{"id": documents[0]["id"], "status": "uploaded", "mime_type": "text/plain"}]
+
+    assert client.get("/api/v1/documents", params={"fields": "id,extracted_text"}).status_code == 400
+
+
+def test_conditional_get_returns_304_until_data_changes(client):
+    """List and detail ETags hold until the table or the row changes"""
+    document_id = upload(client, "a.txt", b"alpha")
+
+    listing = client.get("/api/v1/documents")
+    list_etag = listing.headers["etag"]
+    detail_etag = client.get(f"/api/v1/documents/{document_id}").headers["etag"]
+
+    assert client.get("/api/v1/documents", headers={"If-None-Match": list_etag}).status_code == 304
+    assert client.get("/api/v1/documents", headers={"If-None-Match": f"W/{list_etag}"}).status_code == 304
+    assert client.get(f"/api/v1/documents/{document_id}", headers={"If-None-Match": detail_etag}).status_code == 304
+
+    upload(client, "b.txt", b"beta")
+    assert client.get("/api/v1/documents", headers={"If-None-Match": list_etag}).status_code == 200
+
+
+def test_metrics_follow_status_transitions(client):
+    """Dashboard aggregates move with each write instead of being recounted"""
+    from app.models.document import Document
+
+    first = upload(client, "a.txt", b"alpha")
+    second = upload(client, "b.txt", b"beta")
+
+    db = next(app.dependency_overrides[get_db]())
+    document = db.get(Document, first)
+    document.status, document.document_type, document.confidence_score = "completed", "invoice", 90.0
+    db.commit()
+    document = db.get(Document, second)
+    document.status = "failed"
+    db.commit()
+    db.close()
+
+    metrics = client.get("/api/v1/metrics/overview").json()
+    assert metrics["total_documents"] == 2
+    assert metrics["status_breakdown"] == {"completed": 1, "failed": 1}
+    assert metrics["document_types"] == {"invoice": 1, "Unknown": 1}
+    assert metrics["success_rate"] == 50.0
+    assert metrics["average_confidence"] == 90.0
+    assert metrics["uploads_today"] == 2
+    assert metrics["daily"][-1]["completed"] == 1
+
+    client.delete(f"/api/v1/documents/{first}")
+    metrics = client.get("/api/v1/metrics/overview").json()
+    assert metrics["status_breakdown"] == {"failed": 1}
+    assert metrics["average_confidence"] == 0
+
+
+def test_filters_and_sorted_keyset(client):
+    """Filters narrow the list and its total; keyset paging follows any sort key, NULLs last"""
+    from app.models.document import Document
+
+    ids = [upload(client, f"doc{i}.txt", f"document number {i}".encode()) for i in range(6)]
+    db = next(app.dependency_overrides[get_db]())
+    for document_id, confidence in zip(ids, [70.0, 95.0, None, 80.0, 95.0, None]):
+        document = db.get(Document, document_id)
+        document.confidence_score = confidence
+        document.status = "completed" if confidence else "failed"
+    db.commit()
+    db.close()
+
+    completed = client.get("/api/v1/documents", params={"status": "completed"}).json()
+    assert completed["total"] == 4
+    assert {d["status"] for d in completed["documents"]} == {"completed"}
+    ranged = client.get("/api/v1/documents", params={"min_confidence": 75, "file_type": "txt"}).json()
+    assert ranged["total"] == 3
+
+    seen = []
+    page = client.get("/api/v1/documents", params={"sort": "-confidence", "limit": 2}).json()
+    seen.extend(d["id"] for d in page["documents"])
+    while page["next_cursor"]:
+        page = client.get("/api/v1/documents",
+                          params={"sort": "-confidence", "limit": 2, "cursor": page["next_cursor"]}).json()
+        seen.extend(d["id"] for d in page["documents"])
+    assert seen == [ids[4], ids[1], ids[3], ids[0], ids[5], ids[2]]
+
+    assert client.get("/api/v1/documents", params={"sort": "bogus"}).status_code == 400
+
+
+def test_csv_export_streams_filtered_rows(client):
+    """The CSV export honours the list filters and writes one line per document"""
+    import csv
+    import io
+    from app.models.document import Document
+
+    ids = [upload(client, f"doc{i}.txt", f"document number {i}".encode()) for i in range(3)]
+    db = next(app.dependency_overrides[get_db]())
+    document = db.get(Document, ids[1])
+    document.status, document.extracted_text, document.word_count = "completed", 'quoted "text",\nnewline', 3
+    db.commit()
+    db.close()
+
+    response = client.get("/api/v1/documents/export/csv", params={"status": "completed"})
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(int(r["ID"]), r["Word Count"], r["Extracted Text"]) for r in rows] == [
+        (ids[1], "3", 'quoted "text",\nnewline')
+    ]
+
+    rows = list(csv.DictReader(io.StringIO(client.get("/api/v1/documents/export/csv",
+                                                      params={"include_text": False}).text)))
+    assert len(rows) == 3 and "Extracted Text" not in rows[0]
+
+
+def test_excel_export_writes_every_row(client):
+    """The streamed workbook holds a header plus one row per filtered document"""
+    import io
+    from openpyxl import load_workbook
+
+    for i in range(3):
+        upload(client, f"doc{i}.txt", f"document number {i}".encode())
+
+    response = client.get("/api/v1/documents/export/excel", params={"file_type": "txt", "include_text": False})
+    assert response.status_code == 200
+    sheet = load_workbook(io.BytesIO(response.content)).active
+    rows = list(sheet.values)
+    assert rows[0][:2] == ("ID", "Filename") and "Extracted Text" not in rows[0]
+    assert len(rows) == 4
+    assert sheet.column_dimensions["B"].width > len("Filename")
+
+
+def test_parquet_and_arrow_exports_are_typed(client):
+    """Columnar exports keep numeric and timestamp types and honour fields and filters"""
+    pa = pytest.importorskip("pyarrow")
+    import io
+    import pyarrow.parquet as pq
+
+    for i in range(3):
+        upload(client, f"doc{i}.txt", f"document number {i}".encode())
+
+    response = client.get("/api/v1/documents/export/parquet",
+                          params={"fields": "id,created_at,confidence,extracted_text", "row_group_size": 100})
+    assert response.status_code == 200
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    table = parquet.read()
+    assert table.num_rows == 3
+    assert table.schema.field("id").type == pa.int64()
+    assert pa.types.is_timestamp(table.schema.field("created_at").type)
+    assert table.column_names == ["id", "created_at", "confidence", "extracted_text"]
+
+    response = client.get("/api/v1/documents/export/arrow", params={"status": "missing"})
+    assert pa.ipc.open_file(io.BytesIO(response.content)).read_all().num_rows == 0
+
+    assert client.get("/api/v1/documents/export/parquet", params={"fields": "bogus"}).status_code == 400
+
+
+def test_export_job_delta_since_watermark(client, tmp_path, monkeypatch):
+    """A job's watermark, passed back as updated_since, exports only what changed after it"""
+    import csv
+    import io
+    from sqlalchemy import text
+    from app.models.document import Document
+
+    monkeypatch.setattr(settings, "EXPORT_FOLDER", str(tmp_path / "exports"))
+    ids = [upload(client, f"doc{i}.txt", f"document number {i}".encode()) for i in range(2)]
+    db = next(app.dependency_overrides[get_db]())
+    db.execute(text("UPDATE documents SET created_at = '2020-01-01 00:00:00'"))
+    db.commit()
+
+    full = client.post("/api/v1/exports", json={"format": "csv", "include_text": False}).json()
+    full = client.get(f"/api/v1/exports/{full['job_id']}").json()
+    assert full["status"] == "completed" and full["row_count"] == 2
+
+    document = db.get(Document, ids[1])
+    document.status = "completed"
+    db.commit()
+    db.close()
+
+    delta = client.post("/api/v1/exports", json={"format": "csv", "updated_since": full["watermark"]}).json()
+    delta = client.get(f"/api/v1/exports/{delta['job_id']}").json()
+    assert delta["row_count"] == 1
+    rows = list(csv.DictReader(io.StringIO(client.get(delta["download_url"]).text)))
+    assert [int(r["ID"]) for r in rows] == [ids[1]] and delta["deleted_ids"] == []
+
+    # Deletions after the watermark come back as tombstones, whether soft-deleted or deleted outright
+    extra = upload(client, "doc9.txt", b"document number 9")
+    client.post("/api/v1/documents/bulk-delete", json={"ids": [ids[0]]})
+    client.delete(f"/api/v1/documents/{extra}")
+    delta = client.post("/api/v1/exports", json={"format": "csv", "updated_since": delta["watermark"]}).json()
+    delta = client.get(f"/api/v1/exports/{delta['job_id']}").json()
+    assert delta["deleted_ids"] == sorted([ids[0], extra])
+    rows = list(csv.DictReader(io.StringIO(client.get(delta["download_url"]).text)))
+    assert not {int(r["ID"]) for r in rows} & {ids[0], extra}
+
+    assert client.post("/api/v1/exports", json={"format": "csv", "fields": ["id"]}).status_code == 400
+
+
+def test_bulk_delete_hides_rows_then_purges_files(client, tmp_path):
+    """Soft-deleted documents leave lists and counts at once; the purge removes rows and files"""
+    from pathlib import Path
+    from app.models.document import Document
+
+    ids = [upload(client, f"doc{i}.txt", f"document number {i}".encode()) for i in range(4)]
+    db = next(app.dependency_overrides[get_db]())
+    processed = tmp_path / "doc0.txt"
+    processed.write_text("document number 0")
+    (tmp_path / "doc0_metadata.json").write_text("{}")
+    db.get(Document, ids[0]).processed_path = str(processed)
+    db.get(Document, ids[1]).status = "failed"
+    db.commit()
+    originals = [Path(db.get(Document, i).original_path) for i in ids]
+    db.close()
+
+    assert client.post("/api/v1/documents/bulk-delete", json={}).status_code == 400
+    job = client.post("/api/v1/documents/bulk-delete", json={"ids": [ids[0]]}).json()
+    assert job["deleted"] == 1
+    job = client.post("/api/v1/documents/bulk-delete", json={"status": "failed"}).json()
+    assert job["deleted"] == 1
+
+    listing = client.get("/api/v1/documents").json()
+    assert sorted(d["id"] for d in listing["documents"]) == ids[2:]
+    assert client.get("/api/v1/metrics/overview").json()["total_documents"] == 2
+    assert client.get(f"/api/v1/documents/{ids[0]}").status_code == 404
+
+    status = client.get(job["status_url"]).json()
+    assert status["status"] == "completed" and status["purged"] == status["total"]
+    assert not any(p.exists() for p in originals[:2]) and all(p.exists() for p in originals[2:])
+    assert not processed.exists() and not (tmp_path / "doc0_metadata.json").exists()
+    db = next(app.dependency_overrides[get_db]())
+    assert db.query(Document).execution_options(include_deleted=True).count() == 2
+
+
+def test_delete_keeps_sidecars_a_duplicate_still_uses(client, tmp_path):
+    """The text and metadata sidecars of a shared processed file go only with its last document"""
+    from app.models.document import Document
+
+    ids = [upload(client, f"copy{i}.txt", f"copy number {i}".encode()) for i in range(2)]
+    processed = tmp_path / "shared.txt"
+    processed.write_text("shared text")
+    metadata = tmp_path / "shared_metadata.json"
+    metadata.write_text("{}")
+    db = next(app.dependency_overrides[get_db]())
+    for document_id in ids:
+        db.get(Document, document_id).processed_path = str(processed)
+    db.commit()
+    db.close()
+
+    assert client.delete(f"/api/v1/documents/{ids[0]}").status_code == 200
+    assert processed.exists() and metadata.exists()
+    assert client.delete(f"/api/v1/documents/{ids[1]}").status_code == 200
+    assert not processed.exists() and not metadata.exists()
+
+
+def test_entities_are_served_from_the_stored_column(client, monkeypatch):
+    """NER runs once per model version; later reads return the stored entities"""
+    from app.services import ner_service
+
+    class FakeNER:
+        model_version = "fake-1"
+        calls = 0
+
+        def extract_entities(self, text):
+            FakeNER.calls += 1
+            return {**ner_service.empty_entities(), "persons": [text.split()[0]]}
+
+    from app.models.document import Document
+
+    monkeypatch.setattr(ner_service, "_ner_service", FakeNER())
+    document_id = upload(client, "letter.txt", b"Ada wrote this letter")
+    db = next(app.dependency_overrides[get_db]())
+    db.get(Document, document_id).extracted_text = "Ada wrote this letter"
+    db.commit()
+    db.close()
+
+    for _ in range(2):
+        body = client.get(f"/api/v1/documents/{document_id}/entities").json()
+        assert body["entities"]["persons"] == ["Ada"] and body["model_version"] == "fake-1"
+    assert FakeNER.calls == 1
+
+    client.get(f"/api/v1/documents/{document_id}/entities", params={"refresh": True})
+    FakeNER.model_version = "fake-2"
+    body = client.get(f"/api/v1/documents/{document_id}/entities").json()
+    assert FakeNER.calls == 3 and body["model_version"] == "fake-2"
+
+
+def test_entity_index_lookups(client):
+    """Stored entities are indexed for exact, prefix and top-N lookups; deleted documents drop out"""
+    from app.models.document import Document
+    from app.models.document_entity import DocumentEntity
+
+    def mention(text, label, start):
+        return {"text": text, "label": label, "start": start, "end": start + len(text)}
+
+    ids = [upload(client, f"doc{i}.txt", f"document number {i}".encode()) for i in range(3)]
+    db = next(app.dependency_overrides[get_db]())
+    for document_id, mentions in zip(ids, [
+        [mention("Acme Corp", "ORG", 0), mention("12/16/2024", "DUE_DATE", 20), mention("Acme Corp", "ORG", 40)],
+        [mention("ACME  corp.", "ORG", 5), mention("Acme Labs", "ORG", 30)],
+        [mention("Globex", "ORG", 0), mention("2024-12-16", "DUE_DATE", 9)],
+    ]):
+        db.get(Document, document_id).extracted_entities = {"all_entities": mentions}
+    db.commit()
+
+    def lookup(**params):
+        return client.get("/api/v1/entities/documents", params=params).json()["documents"]
+
+    exact = lookup(text="acme corp", label="org")
+    assert [(d["document_id"], d["mentions"], d["first_offset"]) for d in exact] == [(ids[1], 1, 5), (ids[0], 2, 0)]
+    assert [d["document_id"] for d in lookup(text="Acme", prefix=True)] == [ids[1], ids[0]]
+    assert [d["document_id"] for d in lookup(text="2024-12-16", label="DUE_DATE")] == [ids[2], ids[0]]
+    assert [d["document_id"] for d in lookup(text="acme corp", limit=1, cursor=ids[1])] == [ids[0]]
+
+    top = client.get("/api/v1/entities/top", params={"label": "ORG"}).json()["entities"]["ORG"]
+    assert top[0]["normalized"] == "acme corp" and top[0]["documents"] == 2 and top[0]["mentions"] == 3
+
+    db.get(Document, ids[0]).extracted_entities = {"all_entities": [mention("Initech", "ORG", 0)]}
+    db.commit()
+    assert [d["document_id"] for d in lookup(text="Acme Corp")] == [ids[1]]
+    client.post("/api/v1/documents/bulk-delete", json={"ids": [ids[1]]})
+    assert lookup(text="Acme Corp") == []
+    assert db.query(DocumentEntity).filter(DocumentEntity.document_id == ids[1]).count() == 0
+
+
+def test_processing_time_metrics_come_from_stored_timings(client):
+    from app.models.document import Document
+
+    ids = [upload(client, f"doc{i}.txt", f"document number {i}".encode()) for i in range(3)]
+    db = next(app.dependency_overrides[get_db]())
+    db.get(Document, ids[0]).processing_time = 1.5
+    db.get(Document, ids[1]).processing_time = 4.5
+    db.commit()
+    db.close()
+
+    stats = client.get("/api/v1/metrics/processing-time").json()
+    assert stats == {"documents": 2, "average_processing_time": 3.0, "min_processing_time": 1.5,
+                     "max_processing_time": 4.5}
+
+
+def test_archive_rejects_an_unreadable_entry_and_keeps_the_rest(client):
+    """An entry that can't be opened is reported as rejected instead of failing the archive"""
+    import io
+    import zipfile
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("good.txt", "a readable invoice")
+        archive.writestr("broken.txt", "a corrupted entry")
+    data = bytearray(buffer.getvalue())
+    # Break the local header of the second entry; the central directory still lists it
+    with zipfile.ZipFile(io.BytesIO(bytes(data))) as archive:
+        offset = archive.getinfo("broken.txt").header_offset
+    data[offset:offset + 4] = b"XXXX"
+
+    response = client.post("/api/v1/uploads/archive", files={"file": ("bundle.zip", bytes(data), "application/zip")})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["uploaded"] == 1 and result["rejected"] == 1
+    rejected = next(f for f in result["files"] if f["filename"] == "broken.txt")
+    assert rejected["status"] == "rejected"
+
+
+def test_resumable_session_is_completed_once(client, tmp_path, monkeypatch):
+    """A failed complete reopens the session; once completed, later completes are refused"""
+    from app.services import resumable_upload_service
+
+    monkeypatch.setattr(resumable_upload_service, "_resumable_upload_service",
+                        resumable_upload_service.ResumableUploadService(root=str(tmp_path / "sessions")))
+    payload = b"resumable invoice body"
+    session = client.post("/api/v1/uploads/sessions", json={"filename": "r.txt", "total_size": len(payload)}).json()
+    chunks_url = f"/api/v1/uploads/sessions/{session['session_id']}/chunks"
+    complete_url = f"/api/v1/uploads/sessions/{session['session_id']}/complete"
+
+    assert client.put(chunks_url, params={"offset": 0}, content=payload[:8]).status_code == 200
+    assert client.post(complete_url).status_code == 400
+    assert client.put(chunks_url, params={"offset": 8}, content=payload[8:]).status_code == 200
+
+    completed = client.post(complete_url)
+    assert completed.status_code == 200
+    assert client.post(complete_url).status_code == 409
+    assert client.delete(f"/api/v1/uploads/sessions/{session['session_id']}").status_code == 409
+    assert client.get("/api/v1/documents").json()["total"] == 1
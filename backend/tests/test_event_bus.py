@@ -0,0 +1,104 @@
+"""Test the in-process document event bus"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.event_bus import InMemoryEventBus, RESET
+
+
+async def take(iterator, count):
+    return [await asyncio.wait_for(iterator.__anext__(), timeout=1) for _ in range(count)]
+
+
+def test_live_events_fan_out_to_every_subscriber():
+    """Each subscriber receives events published after it joined"""
+    async def scenario():
+        bus = InMemoryEventBus(buffer_size=10)
+        first, second = bus.subscribe(), bus.subscribe()
+        # Subscriptions register on first iteration
+        first_task = asyncio.ensure_future(take(first, 2))
+        second_task = asyncio.ensure_future(take(second, 2))
+        await asyncio.sleep(0.05)
+        bus.publish("uploaded", 1)
+        bus.publish("completed", 1)
+        return await first_task, await second_task
+
+    first, second = asyncio.run(scenario())
+    assert [e["type"] for e in first] == ["uploaded", "completed"]
+    assert [e["id"] for e in second] == [e["id"] for e in first]
+
+
+def test_resume_from_last_event_id():
+    """Reconnecting with Last-Event-ID replays only what was missed"""
+    async def scenario():
+        bus = InMemoryEventBus(buffer_size=10)
+        events = [bus.publish("progress", 7, stage=str(i)) for i in range(5)]
+        return await take(bus.subscribe(last_event_id=events[2]["id"]), 2)
+
+    replayed = asyncio.run(scenario())
+    assert [e["data"]["stage"] for e in replayed] == ["3", "4"]
+
+
+def test_resume_past_buffer_sends_reset():
+    """A client too far behind is told to refetch instead of getting partial history"""
+    async def scenario():
+        bus = InMemoryEventBus(buffer_size=3)
+        for i in range(10):
+            bus.publish("progress", 1)
+        return await take(bus.subscribe(last_event_id=1), 1)
+
+    assert asyncio.run(scenario())[0]["type"] == RESET
+
+
+class FakeRedis:
+    """Just enough of redis-py's pub/sub for one process"""
+
+    def __init__(self):
+        import queue
+        self.messages = queue.Queue()
+
+    def publish(self, channel, data):
+        self.messages.put({"type": "message", "channel": channel, "data": data})
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return self
+
+    def subscribe(self, channel):
+        pass
+
+    def get_message(self, timeout=None):
+        import queue
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        pass
+
+
+def test_worker_events_are_relayed_to_api_subscribers():
+    """Events a Celery worker publishes to Redis reach the API process's SSE subscribers"""
+    from app.services.event_bus import EventRelay, RedisEventPublisher
+
+    redis = FakeRedis()
+
+    async def scenario():
+        bus = InMemoryEventBus(buffer_size=10)
+        relay = EventRelay(bus, client=redis)
+        relay.start()
+        try:
+            subscription = asyncio.ensure_future(take(bus.subscribe(), 2))
+            await asyncio.sleep(0.05)
+            worker = RedisEventPublisher(client=redis)
+            worker.publish("processing", 5, task_id="t1")
+            worker.publish("completed", 5, document_type="invoice")
+            return await subscription
+        finally:
+            relay.stop()
+
+    events = asyncio.run(scenario())
+    assert [(e["type"], e["document_id"]) for e in events] == [("processing", 5), ("completed", 5)]
+    assert events[1]["data"] == {"document_type": "invoice"}
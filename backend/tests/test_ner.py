@@ -0,0 +1,97 @@
+import spacy
+import pytest
+from app.services.ner_service import NERService, load_ner_pipeline
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    """A small saved pipeline: a rule-based recognizer plus a component NER does not need"""
+    nlp = spacy.blank("en")
+    nlp.add_pipe("attribute_ruler")
+    ruler = nlp.add_pipe("entity_ruler")
+    nlp.initialize()
+    ruler.add_patterns([{"label": "ORG", "pattern": "Acme"}, {"label": "PERSON", "pattern": "Ada"}])
+    nlp.to_disk(tmp_path / "model")
+    return tmp_path / "model"
+
+
+def test_only_ner_components_are_loaded(model_path):
+    assert load_ner_pipeline(str(model_path)).pipe_names == ["entity_ruler"]
+
+
+def test_batch_matches_single_document_extraction(model_path):
+    service = NERService(load_ner_pipeline(str(model_path)))
+    texts = ["Ada works at Acme", "", "Nothing here", "Acme hired Ada"]
+
+    batch = service.extract_entities_batch(texts, batch_size=2)
+
+    assert batch == [service.extract_entities(text) for text in texts]
+    assert batch[0]["persons"] == ["Ada"] and batch[0]["organizations"] == ["Acme"]
+    assert batch[1]["all_entities"] == []
+    assert batch[3]["all_entities"][1] == {"text": "Ada", "label": "PERSON", "start": 11, "end": 14, "source": "model"}
+
+
+def test_long_text_is_recognized_in_windows(model_path, monkeypatch):
+    """Windowed extraction finds every entity once, at its offset in the full text"""
+    from app.core.config import settings
+    from app.services.ner_service import text_windows
+
+    monkeypatch.setattr(settings, "NER_WINDOW_CHARS", 60)
+    monkeypatch.setattr(settings, "NER_WINDOW_OVERLAP", 15)
+    nlp = load_ner_pipeline(str(model_path))
+    text = " ".join(f"Sentence {i} mentions Ada and Acme." for i in range(40))
+
+    windows = list(text_windows(text))
+    assert len(windows) > 10 and all(end - start <= 60 for start, end, _, _ in windows)
+    assert windows[0][2] == 0 and windows[-1][3] == len(text)
+    assert all(a[3] == b[2] for a, b in zip(windows, windows[1:]))
+
+    entities = NERService(nlp).extract_entities(text)["all_entities"]
+    expected = [{"text": e.text, "label": e.label_, "start": e.start_char, "end": e.end_char, "source": "model"}
+                for e in nlp(text).ents]
+    assert entities == expected and len(entities) == 80
+    assert all(text[e["start"]:e["end"]] == e["text"] for e in entities)
+
+
+def test_pattern_matches_are_merged_with_model_entities(model_path):
+    """The scanner adds emails, phones and invoice fields; an amount the model found is kept once"""
+    nlp = load_ner_pipeline(str(model_path))
+    nlp.get_pipe("entity_ruler").add_patterns([{"label": "MONEY", "pattern": [{"TEXT": "$"}, {"LIKE_NUM": True}]}])
+    text = "Invoice #INV-42 from Acme. Total: $1,085.00. Contact ada@acme.com or 555-123-4567."
+
+    entities = NERService(nlp).extract_entities(text)
+
+    assert entities["emails"] == ["ada@acme.com"] and entities["phone_numbers"] == ["555-123-4567"]
+    assert entities["fields"] == {"invoice_number": "INV-42", "total_amount": "$1,085.00"}
+    money = [e for e in entities["all_entities"] if e["label"] == "MONEY"]
+    assert [(e["text"], e["source"]) for e in money] == [("$1,085.00", "model")]
+    assert [e["start"] for e in entities["all_entities"]] == sorted(e["start"] for e in entities["all_entities"])
+
+
+def test_scanner_is_linear_on_long_digit_runs():
+    from app.services.entity_extraction import EntityExtractor
+
+    result = EntityExtractor().scan("1" * 100000 + " 555-123-4567 " + "2-" * 50000, time_budget=5.0)
+    assert result.complete and [(m.type, m.start) for m in result.matches] == [("phone", 100001)]
+    assert not EntityExtractor().scan("ada@acme.com " * 10, time_budget=0).complete
+    # The budget also holds over long stretches without a single match
+    assert not EntityExtractor().scan("x" * 1000000, time_budget=0).complete
+
+
+def test_chunked_scan_matches_across_chunk_seams(monkeypatch):
+    from app.services import entity_extraction
+
+    text = " ".join(["ada@acme.com 555-123-4567 Total: $1,234.00 https://acme.com/pay"] * 200)
+    expected = entity_extraction.EntityExtractor().scan(text).matches
+    monkeypatch.setattr(entity_extraction, "SCAN_CHUNK_CHARS", 100)
+    monkeypatch.setattr(entity_extraction, "SCAN_OVERLAP_CHARS", 20)
+    assert entity_extraction.EntityExtractor().scan(text).matches == expected
+
+
+def test_truncated_pattern_scan_is_reported(model_path, monkeypatch):
+    from app.services import entity_extraction
+
+    service = NERService(load_ner_pipeline(str(model_path)))
+    assert service.extract_entities("Mail ada@acme.com")["pattern_scan_complete"] is True
+    monkeypatch.setattr(entity_extraction.entity_extractor, "time_budget", 0)
+    assert service.extract_entities("Mail ada@acme.com")["pattern_scan_complete"] is False
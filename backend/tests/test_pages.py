@@ -0,0 +1,82 @@
+"""Test per-page text storage and range reads"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.migrations import run_migrations
+from app.models.document import Document
+from app.services.extraction_service import _result
+from app.services.page_service import store_pages, iter_pages, get_char_range
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/test.db")
+    run_migrations(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def add_document(db, pages):
+    result = _result(pages, [90.0] * len(pages), "tesseract")
+    document = Document(filename="scan.pdf", status="completed", extracted_text=result["text"],
+                        char_count=result["char_count"])
+    db.add(document)
+    db.flush()
+    store_pages(db, document.id, result)
+    db.commit()
+    return document, result["text"]
+
+
+def test_char_ranges_match_full_text(db):
+    """Any character range read from the pages equals the same slice of the full text"""
+    document, full_text = add_document(db, ["first page", "", "third page text", "4"])
+
+    for start in range(len(full_text) + 2):
+        for end in range(start, len(full_text) + 3):
+            assert get_char_range(db, document, start, end) == full_text[start:end], (start, end)
+
+
+def test_page_range_and_duplicate_fallback(db):
+    """Page ranges read only the requested pages; duplicates read their source's pages"""
+    document, _ = add_document(db, [f"page {i}" for i in range(1, 8)])
+
+    pages = list(iter_pages(db, document, 3, 5, batch_size=2))
+    assert [p.page_number for p in pages] == [3, 4, 5]
+    assert pages[0].text == "page 3" and pages[0].confidence == 90.0
+
+    duplicate = Document(filename="copy.pdf", status="completed", duplicate_of=document.id)
+    db.add(duplicate)
+    db.commit()
+    assert [p.text for p in iter_pages(db, duplicate, 7)] == ["page 7"]
+
+    legacy = Document(filename="old.txt", status="completed", extracted_text="legacy body")
+    db.add(legacy)
+    db.commit()
+    assert [p.text for p in iter_pages(db, legacy)] == ["legacy body"]
+    assert get_char_range(db, legacy, 7, 11) == "body"
+
+
+def test_duplicate_keeps_its_pages_after_the_source_is_deleted(db):
+    """Reused results come with a copy of the pages, so the source can go"""
+    from app.models.document_page import DocumentPage
+    from app.services.page_service import delete_pages, count_pages
+
+    document, _ = add_document(db, ["first", "second", "third"])
+    duplicate = Document(filename="copy.pdf", status="completed", duplicate_of=document.id)
+    db.add(duplicate)
+    db.commit()
+    assert db.query(DocumentPage).filter(DocumentPage.document_id == duplicate.id).count() == 3
+
+    delete_pages(db, document.id)
+    db.delete(document)
+    db.commit()
+    assert count_pages(db, duplicate) == 3
+    assert [p.text for p in iter_pages(db, duplicate, 2)] == ["second", "third"]
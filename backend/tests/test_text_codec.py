@@ -0,0 +1,62 @@
+"""Test compressed text storage"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core import text_codec
+from app.core.text_codec import TextCodec, ZSTD_AVAILABLE, find_text_file, read_text_file
+from app.db.migrations import run_migrations
+from app.models.document import Document
+
+SAMPLE = "INVOICE\nTotal Amount: $500\nPayment Due: 30 days\n" * 200
+CODECS = ["zlib", "none"] + (["zstd"] if ZSTD_AVAILABLE else [])
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_round_trip_with_and_without_dictionary(tmp_path, codec):
+    """Values decode whatever codec and dictionary wrote them; plain values still read"""
+    writer = TextCodec(codec, dict_folder=str(tmp_path))
+    stored = writer.compress(SAMPLE)
+    assert writer.decompress(stored) == SAMPLE
+    if codec != "none":
+        assert len(stored) < len(SAMPLE) / 4
+
+    if codec != "none":
+        dict_id = writer.train_dictionary([SAMPLE[i:] + f"doc {i}" for i in range(0, 2000, 37)])
+        with_dict = TextCodec(codec, dict_id=dict_id, dict_folder=str(tmp_path))
+        # A reader configured without the dictionary still finds it by id
+        assert TextCodec(codec, dict_folder=str(tmp_path)).decompress(with_dict.compress(SAMPLE)) == SAMPLE
+
+    assert writer.decompress(SAMPLE.encode()) == SAMPLE
+    assert writer.decompress("short legacy text") == "short legacy text"
+
+
+def test_sidecar_files(tmp_path):
+    """Sidecars are written compressed and found from their .txt name"""
+    written = TextCodec("zlib").write_text_file(tmp_path / "scan.txt", SAMPLE)
+    assert written.name == "scan.txt.gz"
+    assert find_text_file(tmp_path / "scan.txt") == written
+    assert read_text_file(written) == SAMPLE
+
+
+def test_column_is_transparent(tmp_path, monkeypatch):
+    """The ORM reads and writes str while the row holds compressed bytes, next to legacy plain rows"""
+    monkeypatch.setattr(text_codec, "_text_codec", TextCodec("zlib"))
+    engine = create_engine(f"sqlite:///{tmp_path}/test.db")
+    run_migrations(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO documents (filename, extracted_text) VALUES ('old.txt', 'legacy text')"))
+    db = sessionmaker(bind=engine)()
+    db.add(Document(filename="new.txt", extracted_text=SAMPLE))
+    db.commit()
+
+    raw = db.execute(text("SELECT extracted_text FROM documents WHERE filename = 'new.txt'")).scalar()
+    assert isinstance(raw, bytes) and len(raw) < len(SAMPLE) / 4
+    assert [d.extracted_text for d in db.query(Document).order_by(Document.id)] == ["legacy text", SAMPLE]
+    db.close()
@@ -0,0 +1,117 @@
+"""Test upload-time triage and extraction routing"""
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import PyPDF2
+from PIL import Image
+
+from app.services.triage_service import sniff_mime, triage_file
+from app.services.extraction_service import extract_document
+
+
+def make_text_pdf(path, pages):
+    """Build a minimal PDF whose pages carry a real text layer"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode())
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    path.write_bytes(out.getvalue())
+
+
+def test_sniff_mime_ignores_extension(tmp_path):
+    """Magic bytes decide the type, not the suffix"""
+    png_path = tmp_path / "scan.pdf"
+    Image.new("RGB", (10, 10)).save(png_path, format="PNG")
+    text_path = tmp_path / "notes.bin"
+    text_path.write_text("plain words")
+
+    assert sniff_mime(png_path) == "image/png"
+    assert sniff_mime(text_path) == "text/plain"
+
+
+def test_triage_born_digital_pdf(tmp_path):
+    """A PDF with a text layer on every page skips OCR entirely"""
+    pdf_path = tmp_path / "report.pdf"
+    make_text_pdf(pdf_path, ["Quarterly report findings and recommendations"] * 3)
+
+    triage = triage_file(str(pdf_path))
+    assert triage.ok
+    assert triage.mime_type == "application/pdf"
+    assert triage.page_count == 3
+    assert triage.text_layer_ratio == 1.0
+
+    result = extract_document(pdf_path, triage.mime_type)
+    assert result["method"] == "text_layer"
+    assert result["page_count"] == 3
+    assert "Quarterly report" in result["text"]
+
+
+def test_triage_scanned_pdf_has_no_text_layer(tmp_path):
+    """Blank (image-only) pages report no text layer"""
+    writer = PyPDF2.PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    pdf_path = tmp_path / "scan.pdf"
+    with open(pdf_path, "wb") as f:
+        writer.write(f)
+
+    triage = triage_file(str(pdf_path))
+    assert triage.ok
+    assert triage.page_count == 1
+    assert triage.text_layer_ratio == 0.0
+
+
+def test_triage_flags_corrupt_and_unsupported(tmp_path):
+    """Broken or unknown files are reported, not raised"""
+    corrupt = tmp_path / "broken.pdf"
+    corrupt.write_bytes(b"%PDF-1.4\nthis is not really a pdf")
+    archive = tmp_path / "bundle.zip"
+    archive.write_bytes(b"PK\x03\x04" + b"\x00" * 100)
+
+    assert triage_file(str(corrupt)).status == "corrupt"
+    assert triage_file(str(archive)).status == "unsupported"
+
+
+def test_multi_page_tiff_is_ocrd_frame_by_frame(tmp_path, monkeypatch):
+    """Every TIFF frame becomes a page, matching the page count triage records"""
+    from app.services import extraction_service
+
+    class FakeTesseract:
+        def extract_text_from_image(self, image):
+            return f"frame of width {image.size[0]}", 80.0
+
+    monkeypatch.setattr(extraction_service, "get_tesseract_service", lambda: FakeTesseract())
+    frames = [Image.new("L", (100 + i, 50), color=255) for i in range(3)]
+    tiff_path = tmp_path / "scan.tiff"
+    frames[0].save(tiff_path, save_all=True, append_images=frames[1:])
+
+    triage = triage_file(str(tiff_path))
+    assert triage.mime_type == "image/tiff" and triage.page_count == 3
+    result = extract_document(tiff_path, triage.mime_type)
+    assert result["page_count"] == 3
+    assert result["pages"] == ["frame of width 100", "frame of width 101", "frame of width 102"]
+
+    gif_path = tmp_path / "animated.gif"
+    frames[0].save(gif_path, save_all=True, append_images=frames[1:])
+    assert triage_file(str(gif_path)).page_count == 1
+    assert extract_document(gif_path, "image/gif")["page_count"] == 1
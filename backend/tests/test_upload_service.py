@@ -0,0 +1,101 @@
+"""Test streaming upload storage"""
+import hashlib
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.upload_service import UploadService, UploadTooLargeError
+
+
+def test_save_stream_hashes_and_sizes(tmp_path):
+    """Chunked copy produces the same bytes, size and hash as the source"""
+    payload = os.urandom(10_000)
+    service = UploadService(chunk_size=1024, max_size=1024 * 1024)
+    dest = tmp_path / "upload.bin"
+
+    stored = service.save_stream(io.BytesIO(payload), str(dest))
+
+    assert stored.size == len(payload)
+    assert stored.sha256 == hashlib.sha256(payload).hexdigest()
+    assert dest.read_bytes() == payload
+
+
+def test_save_stream_rejects_oversized(tmp_path):
+    """Oversized uploads stop early and leave nothing behind"""
+    service = UploadService(chunk_size=1024, max_size=4096)
+    dest = tmp_path / "big.bin"
+
+    with pytest.raises(UploadTooLargeError):
+        service.save_stream(io.BytesIO(b"x" * 10_000), str(dest))
+
+    assert not dest.exists()
+    assert not (tmp_path / "big.bin.part").exists()
+
+
+def test_blob_store_keeps_one_copy_per_hash(tmp_path):
+    """Identical uploads resolve to the same blob and the second copy is discarded"""
+    from app.services.blob_store import BlobStore
+
+    store = BlobStore(root=str(tmp_path / "blobs"))
+    first, first_new = store.put_stream(io.BytesIO(b"same invoice"), ".pdf")
+    second, second_new = store.put_stream(io.BytesIO(b"same invoice"), ".PDF")
+
+    assert first_new and not second_new
+    assert first.path == second.path
+    assert first.sha256 == second.sha256
+    assert len([p for p in (tmp_path / "blobs").rglob("*") if p.is_file()]) == 1
+
+
+def test_resumable_chunks_assemble_out_of_order(tmp_path, monkeypatch):
+    """Chunks sent out of order, with an overlapping retry, assemble to the original file"""
+    import asyncio
+    from app.services import blob_store
+    from app.services.resumable_upload_service import ResumableUploadService, ChunkError
+
+    monkeypatch.setattr(blob_store, "_blob_store", blob_store.BlobStore(root=str(tmp_path / "blobs")))
+    service = ResumableUploadService(root=str(tmp_path / "sessions"))
+    payload = os.urandom(5000)
+
+    async def body(data):
+        yield data
+
+    def send(offset, end):
+        return asyncio.run(service.write_chunk("s1", offset, len(payload), body(payload[offset:end])))
+
+    send(3000, 5000)
+    with pytest.raises(ChunkError):
+        service.assemble("s1", len(payload))
+    send(0, 2000)
+    send(1500, 3000)
+
+    assert service.received_ranges("s1") == [[0, 5000]]
+    stored, _ = service.assemble("s1", len(payload), ".pdf", hashlib.sha256(payload).hexdigest())
+    with open(stored.path, "rb") as f:
+        assert f.read() == payload
+
+
+def test_concurrent_attempts_at_one_offset_do_not_mix(tmp_path):
+    """Two interleaved PUTs of the same chunk each write their own temp file; one wins whole"""
+    import asyncio
+    from app.services.resumable_upload_service import ResumableUploadService
+
+    service = ResumableUploadService(root=str(tmp_path / "sessions"))
+    first, second = b"a" * 3000, b"b" * 3000
+
+    async def body(data):
+        for start in range(0, len(data), 500):
+            yield data[start:start + 500]
+            await asyncio.sleep(0)
+
+    async def both():
+        return await asyncio.gather(service.write_chunk("s1", 0, 3000, body(first)),
+                                    service.write_chunk("s1", 0, 3000, body(second)))
+
+    assert asyncio.run(both()) == [3000, 3000]
+    session_dir = service.session_dir("s1")
+    assert [p.name for p in session_dir.iterdir()] == [f"{0:020d}.chunk"]
+    assert (session_dir / f"{0:020d}.chunk").read_bytes() in (first, second)
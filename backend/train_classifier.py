@@ -0,0 +1,58 @@
+"""
+Train the document classifier offline and write its versioned artifact.
+The artifact is keyed by a hash of the training data, hyperparameters and
+scikit-learn version; the API loads the pinned artifact at startup and only
+trains one itself when it is missing (unless CLASSIFIER_TRAIN_IF_MISSING is off).
+
+Usage: python train_classifier.py [--force] [--set clf.n_estimators=300 ...]
+
+Artifacts trained with --set overrides get their own key; pin it with
+CLASSIFIER_ARTIFACT_KEY to serve them.
+"""
+
+import argparse
+import copy
+import json
+from app.services.document_classifier import HYPERPARAMETERS, artifact_key, artifact_path, train_artifact
+
+
+def apply_overrides(overrides):
+    """`section.name=value` pairs over HYPERPARAMETERS; values are parsed as JSON when they can be"""
+    hyperparameters = copy.deepcopy(HYPERPARAMETERS)
+    for override in overrides:
+        name, _, raw = override.partition("=")
+        section, _, param = name.partition(".")
+        if section not in hyperparameters or not raw:
+            raise SystemExit(f"Bad override {override!r}; expected e.g. clf.n_estimators=300")
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        if param:
+            hyperparameters[section][param] = value
+        else:
+            hyperparameters[section] = value
+    return hyperparameters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="retrain even if the artifact exists")
+    parser.add_argument("--set", action="append", default=[], metavar="SECTION.PARAM=VALUE",
+                        help="override a hyperparameter")
+    args = parser.parse_args()
+
+    hyperparameters = apply_overrides(args.set)
+    key = artifact_key(hyperparameters=hyperparameters)
+    path = artifact_path(key)
+    if path.exists() and not args.force:
+        print(f"✅ Classifier artifact for key {key} already exists: {path}")
+    else:
+        path = train_artifact(hyperparameters=hyperparameters)
+        print(f"✅ Wrote classifier artifact {path}")
+    if key != artifact_key():
+        print(f"   Trained with overrides - set CLASSIFIER_ARTIFACT_KEY={key} to serve it")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,22 +15,14 @@ export const Dashboard: React.FC = () => {
   useEffect(() => {
     const fetchStats = async () => {
       try {
-        const response = await axios.get(`${API_URL}/api/v1/documents?limit=1000`);
-        const docs = response.data.documents;
-        
-        const today = new Date().toDateString();
-        const processedToday = docs.filter((d: any) => 
-          new Date(d.uploaded_at).toDateString() === today
-        ).length;
-        
-        const avgConf = docs.length > 0 
-          ? (docs.reduce((sum: number, d: any) => sum + (d.confidence || 0), 0) / docs.length)
-          : 0;
+        // Aggregates are maintained server-side; no need to pull the document list
+        const response = await axios.get(`${API_URL}/api/v1/metrics/overview`);
+        const metrics = response.data;
         
         setStats({
-          totalDocuments: docs.length,
-          processedToday: processedToday,
-          averageConfidence: parseFloat(avgConf.toFixed(1)),
+          totalDocuments: metrics.total_documents,
+          processedToday: metrics.processed_today,
+          averageConfidence: parseFloat(metrics.average_confidence.toFixed(1)),
         });
       } catch (error) {
         console.error('Failed to fetch stats:', error);
@@ -42,13 +42,25 @@ export const DocumentList: React.FC = () => {
   useEffect(() => {
     fetchDocuments();
     
-    let interval: NodeJS.Timeout | undefined;
+    // Refetch when the server pushes a lifecycle event instead of polling.
+    // EventSource reconnects on its own and resumes from the last event ID.
+    let events: EventSource | undefined;
+    let pending: NodeJS.Timeout | undefined;
     if (autoRefresh) {
-      interval = setInterval(fetchDocuments, 5000);
+      events = new EventSource(`${API_URL}/api/v1/events`);
+      const refresh = () => {
+        // Coalesce bursts (batch uploads, per-stage progress) into one fetch
+        if (pending) clearTimeout(pending);
+        pending = setTimeout(fetchDocuments, 300);
+      };
+      ['uploaded', 'processing', 'completed', 'failed', 'deleted', 'reset'].forEach(type =>
+        events!.addEventListener(type, refresh)
+      );
     }
     
     return () => {
-      if (interval) clearInterval(interval);
+      if (events) events.close();
+      if (pending) clearTimeout(pending);
     };
   }, [autoRefresh]);
 